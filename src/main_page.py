@@ -22,6 +22,8 @@ st.markdown("- EPSG:2231 - Colorado South (ftUS)")
 st.header("The scour plotting application requires the following files:")
 
 st.markdown("- scour_data (.csv)")
+st.header("The results store application:")
+st.markdown("- Compares the DxV and scour results saved from the other applications, by bridge, scenario and run date.")
 
 
 st.sidebar.markdown("# Home")
\ No newline at end of file
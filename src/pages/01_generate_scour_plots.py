@@ -1,14 +1,18 @@
-import pandas as pd 
-import io
-from io import BytesIO
 import warnings
 warnings.simplefilter(action='ignore', category=FutureWarning)
-import matplotlib.pyplot as plt
-import matplotlib.ticker as plticker
-import numpy as np
 import streamlit as st
 
-from utils.plotting_utils.scour_plotting_utils import recurrence_txt,generate_pier_scour_df, generate_figure, generate_summary_figure
+from utils.startup_utils.lazy_import import lazy_import
+
+from utils.plotting_utils.scour_plotting_utils import recurrence_txt, generate_figure, generate_summary_figure, summarize_scour_profile, build_static_layers
+from utils.plotting_utils.bridge_section import parse_bridge_section, BridgeDataError
+from utils.plotting_utils.incremental_utils import section_digests, diff_sections, describe_changes, static_layers_digest, profile_digest, render_figure, reuse_or_compute
+from utils.plotting_utils.uncertainty_utils import scour_envelope, DISTRIBUTIONS, UNCERTAIN_PARAMETERS
+from utils.plotting_utils.profile_viewer_utils import build_profile_layers, profile_chart
+from utils.store_utils.results_store import open_results_store, save_scour_summary
+
+
+pd = lazy_import("pandas")
 
 
 if __name__ == "__main__":
@@ -27,30 +31,44 @@ if __name__ == "__main__":
         st.subheader("Please upload the scour data file.")
         bridge_data = st.file_uploader("Choose a file")
         st.write("To make changes to the data being plotted, please modifiy the information in the scour worksheet and re-upload the data.")
+        st.header("Results Store")
+        bridge_name = st.text_input("Bridge name", help="Used to save and compare results in the results store page.")
+        scenario_name = st.text_input("Scenario", value="Proposed")
+        st.header("Uncertainty")
+        show_uncertainty = st.checkbox("Show scour uncertainty bands", help="Samples the scour depths from the distributions below and shades the range of the total scour line on the figures.")
+        uncertainty_parameters = {}
+        if show_uncertainty:
+            n_samples = st.number_input("Number of samples", min_value=100, max_value=100000, value=10000, step=1000)
+            band_percentiles = st.slider("Percentile band", min_value=0, max_value=100, value=(5, 95))
+            for parameter, (distribution, spread) in UNCERTAIN_PARAMETERS.items():
+                distribution = st.selectbox(f"{parameter} distribution", DISTRIBUTIONS, index=DISTRIBUTIONS.index(distribution))
+                spread = st.number_input(f"{parameter} spread [%]", min_value=0.0, max_value=100.0, value=spread*100, step=5.0,
+                                         help="Coefficient of variation for Normal and Lognormal, half width for Uniform and Triangular.")
+                uncertainty_parameters[parameter] = (distribution, spread/100)
   
     recurrence_data = recurrence_txt()  
 
     # Generate scour data based on the flags
     if bridge_data is not None:
         bridge_data = pd.read_csv(bridge_data) 
-        structure_data = generate_pier_scour_df(bridge_data)
-
-        # Unpack the structure data
-        pier_data_dict = structure_data[0]
-        individual_pier_ids = structure_data[1]
-        bridge_low_chord = structure_data[2]
-        bridge_high_chord = structure_data[3]
-        ground_line = structure_data[4]
-        scour_data_df = structure_data[5]
-        bank_stations = structure_data[6]
-        lateral_stability = structure_data[7]
-        lt_deg = structure_data[8]
-        abt_scour_elev = structure_data[9]
-        abut_stat = structure_data[10]
-        wse_data = structure_data[11]
+        try:
+            bridge_section = parse_bridge_section(bridge_data)
+        except BridgeDataError as error:
+            st.error(str(error))
+            st.stop()
+
+        # Compare with the previous upload of this session so unchanged outputs are served from the previous results
+        digests = section_digests(bridge_section)
+        previous_digests = st.session_state.get("scour_section_digests")
+        reuploaded = previous_digests is not None and previous_digests != digests
+        if reuploaded:
+            st.info("Changes since the previous upload: " + describe_changes(diff_sections(previous_digests, digests)) + ".")
+        st.session_state["scour_section_digests"] = digests
+        previous_results = st.session_state.get("scour_results", {})
+        results = {}
 
         # Display the structure data in a table
-        pierdata_df = pd.DataFrame(pier_data_dict).T
+        pierdata_df = bridge_section.pier_table()
         st.divider()
         st.subheader("Structure and Scour Data")
         st.write("The table below shows the structure and scour data that will be used to generate the scour plots. To modify the data, please do so from the scour workbook and re-upload. Data can not be modified within this table.")
@@ -59,52 +77,66 @@ if __name__ == "__main__":
         st.header("Scour Figures by Recurrence Interval")
         st.write("The figures below show the scour data for each recurrence interval. You can download each figure by clicking the download button below each plot.")
         
-        # Generate scour plots for each recurrence interval
-        for year in recurrence_data:
-            figure = generate_figure(pier_data_dict, 
-                                individual_pier_ids,
-                                bridge_low_chord, 
-                                bridge_high_chord, 
-                                ground_line,
-                                scour_data_df,
-                                bank_stations, 
-                                lateral_stability,
-                                lt_deg, 
-                                abt_scour_elev, 
-                                abut_stat, wse_data, 
-                                year)
-            st.pyplot(figure)
+        # The ground line, chords and pier outlines are the same in every figure, build them once
+        static_layers, _ = reuse_or_compute(previous_results, results, static_layers_digest(bridge_section),
+                                            lambda: build_static_layers(bridge_section))
+
+        # Sample the uncertainty bands of each recurrence interval, the settings are part of the keys of the reused results
+        uncertainty_settings = (int(n_samples), tuple(band_percentiles), tuple(sorted(uncertainty_parameters.items()))) if show_uncertainty else None
+        envelopes = None
+        if show_uncertainty:
+            envelopes = [reuse_or_compute(previous_results, results, ("envelope", profile_digest(bridge_section, [year]), uncertainty_settings),
+                                          lambda: scour_envelope(bridge_section, year, uncertainty_parameters, int(n_samples), tuple(band_percentiles)))[0]
+                         for year in recurrence_data]
+
+        # Generate scour plots for each recurrence interval, figures whose inputs have not changed are reused
+        reused_figures = 0
+        for index, year in enumerate(recurrence_data):
+            figure, reused = reuse_or_compute(previous_results, results, ("figure", profile_digest(bridge_section, [year]), uncertainty_settings),
+                                              lambda: render_figure(generate_figure(bridge_section, year, static_layers,
+                                                                                    envelopes[index] if envelopes else None)))
+            reused_figures += reused
+            st.image(figure["display"], use_container_width=True)
             
             #allow user to download the figure
-            buf = io.BytesIO()
-            figure.savefig(buf, format="png")
-            buf.seek(0)
-            figure = buf.getvalue()
-            st.download_button(label=f"Download {year[-1]} Figure", data=figure, file_name=f"scour_plot_{year[-1]}.png")
+            st.download_button(label=f"Download {year[-1]} Figure", data=figure["download"], file_name=f"scour_plot_{year[-1]}.png")
         st.divider()
         st.header("Scour Summary Figure")
         st.write("The figure below shows the scour data for all recurrence intervals in a single plot. You can download this figure by clicking the download button below the plot.")
         # Generate the summary figure for all recurrence intervals
-        summary_figure = generate_summary_figure(pier_data_dict, 
-                            individual_pier_ids,
-                            bridge_low_chord, 
-                            bridge_high_chord, 
-                            ground_line,
-                            scour_data_df,
-                            bank_stations, 
-                            lateral_stability,
-                            lt_deg, 
-                            abt_scour_elev, 
-                            abut_stat, wse_data, 
-                            recurrence_data)
-        st.pyplot(summary_figure)
+        summary_figure, reused = reuse_or_compute(previous_results, results, ("summary", profile_digest(bridge_section, recurrence_data), uncertainty_settings),
+                                                  lambda: render_figure(generate_summary_figure(bridge_section, recurrence_data, static_layers, envelopes)))
+        reused_figures += reused
+        st.image(summary_figure["display"], use_container_width=True)
         
         #allow user to download the summary figure
-        summary_figure_buf = io.BytesIO()
-        summary_figure.savefig(summary_figure_buf, format="png")
-        summary_figure_buf.seek(0)
-        summary_figure = summary_figure_buf.getvalue()
-        st.download_button(label="Download Summary Figure", data=summary_figure, file_name="scour_summary_plot.png")
+        st.download_button(label="Download Summary Figure", data=summary_figure["download"], file_name="scour_summary_plot.png")
+        if reuploaded:
+            st.caption(f"{reused_figures} of {len(recurrence_data) + 1} figures were unchanged and reused from the previous upload.")
+        st.divider()
+        st.header("Interactive Scour Profile")
+        st.write("Zoom and pan the profile below, or narrow the station range to redraw the lines at full detail within the range. Long profiles are downsampled to keep their shape while staying responsive.")
+        profile_title = st.selectbox("Recurrence interval", [year[-1] for year in recurrence_data])
+        profile_year = next(year for year in recurrence_data if year[-1] == profile_title)
+        min_station = float(bridge_section.ground_station.min())
+        max_station = float(bridge_section.ground_station.max())
+        station_range = st.slider("Station range [ft]", min_value=min_station, max_value=max_station, value=(min_station, max_station))
+        max_points = st.number_input("Maximum points per line", min_value=100, max_value=20000, value=2000, step=100)
+        profile_layers = build_profile_layers(bridge_section, profile_year, static_layers, station_range, int(max_points))
+        st.altair_chart(profile_chart(profile_layers, profile_year[-1]), use_container_width=True)
+        st.divider()
+        st.header("Scour Summary at Piers")
+        st.write("The table below summarizes the scour elevation at each pier. Enter a bridge name in the side bar to save the summary to the results store.")
+        scour_summary = pd.concat([reuse_or_compute(previous_results, results, ("summary table", profile_digest(bridge_section, [year])),
+                                                    lambda: summarize_scour_profile(bridge_section, year))[0]
+                                   for year in recurrence_data], ignore_index=True)
+        st.session_state["scour_results"] = results
+        st.dataframe(scour_summary, use_container_width=True)
+        if st.button("Save summary to the results store", disabled=not bridge_name or not scenario_name):
+            connection = open_results_store()
+            run_date = save_scour_summary(connection, scour_summary, bridge_name, scenario_name)
+            connection.close()
+            st.success(f"Saved the scour summary for {bridge_name} ({scenario_name}) on {run_date}.")
         
                             
 
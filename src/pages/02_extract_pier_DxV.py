@@ -1,10 +1,22 @@
 
 import streamlit as st
-import pandas as pd
+import io
 import numpy as np
-from pyproj import Proj, transform, Transformer
 
-from utils.dxv_utils.find_pier_nodes import read_map_file, read_geom_file, find_mesh_points
+from utils.startup_utils.lazy_import import lazy_import
+
+from utils.dxv_utils.find_pier_nodes import read_map_file, read_geom_file, read_geom_elements, find_mesh_points, sweep_search_radius
+from utils.dxv_utils.dxv_hotspots import HOTSPOT_FORMATS, dxv_hotspot_grid, write_hotspot_grid
+from utils.dxv_utils.export_mesh_fields import EXPORT_FORMATS, nodes_near_piers, build_mesh_fields_table, write_mesh_fields
+from utils.dxv_utils.scenario_comparison import pair_scenario_files, compare_scenarios, dxv_matrix
+from utils.dxv_utils.pier_face_sampling import sample_pier_faces, pier_face_maxima
+from utils.dxv_utils.map_layers import MAP_LAYERS, DEFAULT_FEATURE_BUDGET, build_map_index, view_window, select_mesh_features, mesh_map_deck
+from utils.store_utils.results_store import open_results_store, mesh_hash, save_dxv_results
+
+
+pd = lazy_import("pandas")
+plt = lazy_import("matplotlib.pyplot")
+pyproj = lazy_import("pyproj")
 
 
 
@@ -31,7 +43,7 @@ from utils.dxv_utils.find_pier_nodes import read_map_file, read_geom_file, find_
 # water_depth_h5_file: Path to the HDF5 file containing water depth data.
 #- water_velocity_h5_file: Path to the HDF5 file containing water velocity data.
 #- output_path: Path to the output CSV file.
-#- search_radius: max distance from the pier centerline nodes to search for max DxV
+#- search_radius: max distance from the pier centerline nodes to search for max DxV, or a range of radii for the sensitivity sweep
 
 #Functions:
 #- read_map_file: Reads the SRH-2D map file and returns pier data and arc-node mapping.
@@ -58,45 +70,88 @@ if __name__ == "__main__":
         crs = st.selectbox("Select Coordinate Reference System (CRS)", ["EPSG:2233","EPSG:2232", "EPSG:2231", "EPSG:26910", "EPSG:26911", "EPSG:26912", "EPSG:26913", "EPSG:26914", "EPSG:26915"])
         if water_depth_h5_file is not None:
             depth_file_name = water_depth_h5_file.name
-        
-        
-        
+        #specify the search radius in feet around the pier centerline nodes
+        # The search radius is used to find the maximum water depth and velocity within this radius.
+        search_radius = st.number_input("Search radius (ft)", min_value=1.0, value=15.0, step=1.0)
+        radius_sweep = st.checkbox("Search radius sensitivity sweep", help="Calculates the maximum DxV at each pier for a range of search radii from a single extraction.")
+        if radius_sweep:
+            sweep_max_radius = st.number_input("Maximum sweep radius (ft)", min_value=1.0, value=50.0, step=1.0)
+            sweep_step = st.number_input("Sweep radius step (ft)", min_value=0.1, value=1.0, step=0.5)
+        st.header("Scenario Comparison")
+        scenario_files = st.file_uploader("Select the Water_Depth_ft.h5 and Vel_Mag_ft_p_s.h5 files of the scenarios to compare",
+                                          accept_multiple_files=True,
+                                          help="Depth and velocity files are paired by the part of the file name before the result name, e.g. 100yr.")
+        st.header("Results Store")
+        bridge_name = st.text_input("Bridge name", help="Used to save and compare results in the results store page.")
+        scenario_name = st.text_input("Scenario", value=depth_file_name.split("_")[0] if water_depth_h5_file is not None else "")
 
-    #specify the search radius in feet around the pier centerline nodes
-    # The search radius is used to find the maximum water depth and velocity within this radius.
-    search_radius = 15
 
 
-    if srh2d_map_file is not None and srh2d_srhgeom_file is not None and water_depth_h5_file is not None and water_velocity_h5_file is not None:
-        pier_data, arc_node_mapping = read_map_file(srh2d_map_file, "Bridge Scour")
-        model_nodes = read_geom_file(srh2d_srhgeom_file)
-        
-        max_nodes = find_mesh_points(pier_data, model_nodes,arc_node_mapping,water_depth_h5_file,depth_file_name,water_velocity_h5_file,search_radius )
-        max_nodes = pd.DataFrame(max_nodes)
-        lat = [model_nodes.loc[model_nodes["Node"] == node, "lat"].values[0] for node in max_nodes["Model Node"]]
-        long = [model_nodes.loc[model_nodes["Node"] == node, "long"].values[0] for node in max_nodes["Model Node"]]
+    # The map and geometry are read once and shared by the single scenario results and the scenario comparison.
+    # The parsed mesh is kept for the reruns of the session and only read again when other files are uploaded.
+    mesh_uploaded = srh2d_map_file is not None and srh2d_srhgeom_file is not None
+    if mesh_uploaded:
+        mesh_key = (srh2d_map_file.file_id, srh2d_srhgeom_file.file_id)
+        if st.session_state.get("mesh_key") != mesh_key:
+            pier_data, arc_node_mapping = read_map_file(srh2d_map_file, "Bridge Scour")
+            model_nodes = read_geom_file(srh2d_srhgeom_file)
+            st.session_state["mesh"] = (pier_data, arc_node_mapping, model_nodes, mesh_hash(model_nodes))
+            st.session_state["mesh_key"] = mesh_key
+        pier_data, arc_node_mapping, model_nodes, model_hash = st.session_state["mesh"]
+        pier_locations = pier_data[["Pier Node", "lat", "long"]]
 
-        max_nodes["size"] = max_nodes["DxV"] / 20  # Scale size for better visibility on the map
-        
-        transformer = Transformer.from_crs(crs,"EPSG:4326")
+    if mesh_uploaded and water_depth_h5_file is not None and water_velocity_h5_file is not None:
+        # the extraction is only repeated when the files, the search radius or the CRS change, so changing the map view
+        # or any other input below does not read the results again
+        extraction_key = (mesh_key, water_depth_h5_file.file_id, water_velocity_h5_file.file_id, search_radius, crs)
+        if st.session_state.get("extraction_key") != extraction_key:
+            max_nodes = find_mesh_points(pier_data, model_nodes,arc_node_mapping,water_depth_h5_file,depth_file_name,water_velocity_h5_file,search_radius )
+            max_nodes = pd.DataFrame(max_nodes)
+            lat = [model_nodes.loc[model_nodes["Node"] == node, "lat"].values[0] for node in max_nodes["Model Node"]]
+            long = [model_nodes.loc[model_nodes["Node"] == node, "long"].values[0] for node in max_nodes["Model Node"]]
 
-        lat, long =  transformer.transform(lat,long)
-        max_nodes["lat"] = lat
-        max_nodes["long"] = long
-        
-        pier_data = pd.merge(max_nodes, pier_data, on="Pier Node", how='outer')
-        
-        
-        
+            max_nodes["size"] = max_nodes["DxV"] / 20  # Scale size for better visibility on the map
+            
+            transformer = pyproj.Transformer.from_crs(crs,"EPSG:4326")
 
-        max_nodes = max_nodes.sort_values("DxV", ascending=False).drop_duplicates("Pier Arc ID").sort_index()
-        max_nodes["color"] = np.random.rand(len(max_nodes["DxV"]),3 ).tolist()  # Random color for each point
+            lat, long =  transformer.transform(lat,long)
+            max_nodes["lat"] = lat
+            max_nodes["long"] = long
+            
+            pier_data = pd.merge(max_nodes, pier_data, on="Pier Node", how='outer')
+            
+            
+            
+
+            max_nodes = max_nodes.sort_values("DxV", ascending=False).drop_duplicates("Pier Arc ID").sort_index()
+            max_nodes["color"] = np.random.rand(len(max_nodes["DxV"]),3 ).tolist()  # Random color for each point
+            st.session_state["extraction"] = (max_nodes, pier_data)
+            st.session_state["extraction_key"] = extraction_key
+        max_nodes, pier_data = st.session_state["extraction"]
         st.divider()
         st.subheader("Maximum Depth x Velocity (DxV) at Piers")
         st.dataframe(max_nodes, use_container_width=True)
+        if st.button("Save results to the results store", disabled=not bridge_name or not scenario_name):
+            connection = open_results_store()
+            run_date = save_dxv_results(connection, max_nodes, bridge_name, scenario_name, model_hash)
+            connection.close()
+            st.success(f"Saved {len(max_nodes)} piers for {bridge_name} ({scenario_name}) on {run_date}.")
         st.divider()
         st.subheader("Maximum Depth x Velocity (DxV) at Piers - Summary Statistics")
         st.bar_chart(data=max_nodes, x="Model Node", y="DxV", use_container_width=True)
+        if radius_sweep:
+            st.divider()
+            st.subheader("Maximum Depth x Velocity (DxV) at Piers - Search Radius Sensitivity")
+            radii = np.arange(sweep_step, sweep_max_radius + sweep_step / 2, sweep_step)
+            sweep_key = (extraction_key, sweep_max_radius, sweep_step)
+            if st.session_state.get("radius_sweep_key") != sweep_key:
+                st.session_state["radius_sweep"] = sweep_search_radius(pier_locations, model_nodes, arc_node_mapping, water_depth_h5_file, depth_file_name, water_velocity_h5_file, radii)
+                st.session_state["radius_sweep_key"] = sweep_key
+            radius_sweep_df = st.session_state["radius_sweep"]
+            # the DxV of each pier is the larger of its two arc end nodes, as in the table above
+            sweep_curves = radius_sweep_df.groupby(["Search Radius", "Pier Arc ID"])["DxV"].max().unstack("Pier Arc ID")
+            st.line_chart(sweep_curves, x_label="Search Radius (ft)", y_label="DxV", use_container_width=True)
+            st.dataframe(radius_sweep_df, use_container_width=True)
         st.divider()
         st.subheader("Maximum Depth at Piers") 
         st.bar_chart(data=max_nodes, x="Model Node", y="Depth", use_container_width=True)
@@ -126,4 +181,117 @@ if __name__ == "__main__":
         #st_folium(folium_map, height=450, use_container_width=True)
         st.divider()
         st.map(data=max_nodes, latitude="lat", longitude="long",size = "size",color = "color", use_container_width=True)
+        st.divider()
+        st.subheader("Mesh, Search Zones and Pier Arcs Around the Bridge")
+        st.write("Shows the mesh around the bridge for QA. Only the nodes and elements in view are drawn, and they are thinned evenly when there are more than the feature limit, so zoom in to see the full mesh.")
+        # the spatial index is built once per mesh and kept for the reruns of the session
+        map_key = ("map index", model_hash)
+        if st.session_state.get("map_index_key") != map_key:
+            st.session_state["map_index"] = build_map_index(model_nodes, read_geom_elements(srh2d_srhgeom_file))
+            st.session_state["map_index_key"] = map_key
+        map_index = st.session_state["map_index"]
+        map_center = st.selectbox("Center the map on", ["All piers"] + list(arc_node_mapping["arcID"].unique()))
+        center_nodes = pier_locations if map_center == "All piers" else pier_locations[pier_locations["Pier Node"].isin(
+            arc_node_mapping.loc[arc_node_mapping["arcID"] == map_center, "Node"])]
+        map_zoom = st.slider("Zoom level", min_value=10.0, max_value=22.0, value=18.0, step=0.5)
+        feature_budget = st.number_input("Maximum nodes and elements drawn", min_value=1000, max_value=200000, value=DEFAULT_FEATURE_BUDGET, step=1000)
+        map_layers = st.multiselect("Map layers", MAP_LAYERS, default=MAP_LAYERS)
+        window, view_center = view_window((center_nodes["lat"].mean(), center_nodes["long"].mean()), map_zoom, crs)
+        selection = select_mesh_features(map_index, window, int(feature_budget))
+        st.pydeck_chart(mesh_map_deck(map_index, selection, crs, view_center, map_zoom, pier_locations, arc_node_mapping,
+                                      search_radius, max_nodes, map_layers), use_container_width=True)
+        st.caption(f"Drawing {len(selection['nodes'])} of {selection['nodes_in_view']} nodes and "
+                   f"{len(selection['elements'])} of {selection['elements_in_view']} elements in view.")
+        st.divider()
+        st.subheader("Export Peak Depth, Velocity and DxV at Mesh Nodes")
+        st.write("Exports the peak depth, velocity and DxV with the node coordinates as a compressed columnar file that can be loaded by GIS and analytics tools.")
+        export_scope = st.radio("Nodes to export", ["Nodes around the piers", "Whole mesh"], horizontal=True)
+        export_buffer = st.number_input("Distance around the pier nodes to export (ft)", min_value=1.0, value=100.0, disabled=export_scope == "Whole mesh")
+        export_format = st.selectbox("Export format", list(EXPORT_FORMATS))
+        if st.button("Prepare export"):
+            export_nodes = None if export_scope == "Whole mesh" else nodes_near_piers(pier_locations, model_nodes, export_buffer)
+            mesh_fields = build_mesh_fields_table(model_nodes, water_depth_h5_file, depth_file_name, water_velocity_h5_file, export_nodes)
+            export_buf = io.BytesIO()
+            write_mesh_fields(mesh_fields, export_buf, export_format)
+            st.download_button(label=f"Download {mesh_fields.num_rows} nodes",
+                               data=export_buf.getvalue(),
+                               file_name=f"{depth_file_name.split('_')[0]}_mesh_fields{EXPORT_FORMATS[export_format]}")
+        st.divider()
+        st.subheader("DxV Hotspots Around the Bridge")
+        st.write("Calculates the peak DxV at every mesh node and interpolates it onto a regular grid around the bridge opening to show where DxV peaks beyond the pier nodes.")
+        hotspot_margin = st.number_input("Distance beyond the outermost piers to include (ft)", min_value=1.0, value=200.0)
+        hotspot_cell_size = st.number_input("Grid cell size (ft)", min_value=0.1, value=2.0)
+        hotspot_count = st.number_input("Number of hotspots to flag", min_value=1, value=10, step=1)
+        hotspot_separation = st.number_input("Minimum distance between hotspots (ft)", min_value=0.0, value=10.0)
+        if st.button("Calculate DxV hotspot field"):
+            hotspot_grid = dxv_hotspot_grid(model_nodes, read_geom_elements(srh2d_srhgeom_file), pier_locations,
+                                            water_depth_h5_file, depth_file_name, water_velocity_h5_file,
+                                            hotspot_margin, hotspot_cell_size, int(hotspot_count), hotspot_separation)
+            origin = hotspot_grid["origin"]
+            rows, columns = hotspot_grid["dxv"].shape
+            hotspot_figure, hotspot_ax = plt.subplots()
+            image = hotspot_ax.imshow(hotspot_grid["dxv"], origin="lower", cmap="viridis",
+                                      extent=[origin[0], origin[0] + columns * hotspot_cell_size,
+                                              origin[1], origin[1] + rows * hotspot_cell_size])
+            hotspot_ax.scatter(pier_locations["lat"], pier_locations["long"], color="black", marker="s", s=12, label="Pier Nodes")
+            hotspot_ax.scatter(hotspot_grid["hotspots"]["x"], hotspot_grid["hotspots"]["y"], facecolors="none", edgecolors="red", s=80, label="Hotspots")
+            for _, hotspot in hotspot_grid["hotspots"].iterrows():
+                hotspot_ax.annotate(str(hotspot["Rank"]), (hotspot["x"], hotspot["y"]), color="red", xytext=(4, 4), textcoords="offset points")
+            hotspot_figure.colorbar(image, ax=hotspot_ax, label="DxV")
+            hotspot_ax.set_aspect("equal")
+            hotspot_ax.legend()
+            st.pyplot(hotspot_figure)
+            st.dataframe(hotspot_grid["hotspots"], use_container_width=True)
+            for hotspot_format, extension in HOTSPOT_FORMATS.items():
+                hotspot_buf = io.BytesIO()
+                write_hotspot_grid(hotspot_grid, hotspot_buf, hotspot_format)
+                st.download_button(label=f"Download DxV grid ({hotspot_format})", data=hotspot_buf.getvalue(),
+                                   file_name=f"{depth_file_name.split('_')[0]}_dxv_grid{extension}")
+        st.divider()
+        st.subheader("Interpolated DxV Along Pier Faces")
+        st.write("Interpolates the depth and velocity inside the mesh elements at points along each pier arc and on lines offset to either side of it, so the maximum DxV does not depend on where the mesh nodes are around the pier.")
+        face_spacing = st.number_input("Distance between sample points (ft)", min_value=0.1, value=1.0)
+        face_offsets = st.text_input("Offsets of the sample lines from the pier arcs (ft)", value="5, 10", help="Comma separated distances, each is sampled on both sides of the arc.")
+        if st.button("Sample pier faces"):
+            try:
+                face_offsets = [float(offset) for offset in face_offsets.split(",") if offset.strip()]
+            except ValueError:
+                st.error("The offsets must be numbers separated by commas.")
+                st.stop()
+            face_samples = sample_pier_faces(pier_locations, arc_node_mapping, model_nodes, read_geom_elements(srh2d_srhgeom_file),
+                                             water_depth_h5_file, depth_file_name, water_velocity_h5_file, face_spacing, face_offsets)
+            face_maxima = pier_face_maxima(face_samples)
+            # compare with the maximum at the mesh nodes within the search radius of either end node of the arc
+            face_maxima["Max Node DxV of Arc"] = face_maxima["Pier Arc ID"].map(max_nodes.groupby("Pier Arc ID")["DxV"].max())
+            st.dataframe(face_maxima, use_container_width=True)
+            face_samples["Face"] = face_samples["Pier Arc ID"] + " offset " + face_samples["Offset"].astype(str) + " ft"
+            st.line_chart(face_samples, x="Station", y="DxV", color="Face", x_label="Station along the pier arc (ft)", use_container_width=True)
+            st.download_button(label="Download pier face samples", data=face_samples.to_csv(index=False).encode(),
+                               file_name=f"{depth_file_name.split('_')[0]}_pier_face_samples.csv")
 
+    if mesh_uploaded and scenario_files:
+        st.divider()
+        st.subheader("Maximum Depth x Velocity (DxV) at Piers - Scenario Comparison")
+        scenarios, unpaired = pair_scenario_files(scenario_files)
+        if unpaired:
+            st.warning(f"No matching depth or velocity file was found for: {', '.join(unpaired)}.")
+        if scenarios:
+            # the comparison is only repeated when the uploaded files or the search radius change
+            comparison_key = (mesh_key, tuple(file.file_id for file in scenario_files), search_radius)
+            if st.session_state.get("scenario_results_key") != comparison_key:
+                st.session_state["scenario_results"] = compare_scenarios(scenarios, pier_locations, model_nodes, arc_node_mapping, search_radius)
+                st.session_state["scenario_results_key"] = comparison_key
+            scenario_results = st.session_state["scenario_results"]
+            scenario_matrix = dxv_matrix(scenario_results)
+            st.dataframe(scenario_matrix, use_container_width=True)
+            comparison = scenario_matrix.reset_index().melt(id_vars="Scenario", var_name="Pier Arc ID", value_name="DxV")
+            st.bar_chart(comparison, x="Pier Arc ID", y="DxV", color="Scenario", stack=False, use_container_width=True)
+            st.download_button(label="Download scenario DxV matrix", data=scenario_matrix.to_csv().encode(), file_name="scenario_dxv_matrix.csv")
+            if st.button("Save scenario results to the results store", disabled=not bridge_name):
+                connection = open_results_store()
+                for scenario, results in scenario_results.groupby("Scenario", sort=False):
+                    # one row per pier, as saved for a single scenario above
+                    results = results.drop(columns="Scenario").sort_values("DxV", ascending=False).drop_duplicates("Pier Arc ID").sort_index()
+                    run_date = save_dxv_results(connection, results, bridge_name, scenario, model_hash)
+                connection.close()
+                st.success(f"Saved {len(scenarios)} scenarios for {bridge_name} on {run_date}.")
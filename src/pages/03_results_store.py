@@ -0,0 +1,69 @@
+import streamlit as st
+
+from utils.store_utils.results_store import open_results_store, list_store_keys, query_dxv_results, query_scour_summary
+
+
+#This script displays the DxV and scour results saved to the local results store by the other pages.
+
+#The results store is a SQLite database indexed on bridge, scenario, mesh hash and run date, so results
+#for a whole corridor can be compared without re-running the extraction or the scour plots.
+
+
+@st.cache_resource
+def get_connection():
+    return open_results_store()
+
+
+if __name__ == "__main__":
+
+    st.title("Results Store")
+    st.subheader("This application compares the DxV and scour results saved from the other applications.")
+    st.write("Results are saved with the 'Save to the results store' buttons on the extract pier DxV and scour plotting pages.")
+
+    connection = get_connection()
+    dxv_keys = list_store_keys(connection, "dxv_results")
+    scour_keys = list_store_keys(connection, "scour_summary")
+
+    with st.sidebar:
+        st.header("Filter Results")
+        bridges = sorted(set(dxv_keys["Bridge"]) | set(scour_keys["Bridge"]))
+        selected_bridges = st.multiselect("Bridges", bridges, default=bridges)
+        scenarios = sorted(set(dxv_keys.loc[dxv_keys["Bridge"].isin(selected_bridges), "Scenario"]) |
+                           set(scour_keys.loc[scour_keys["Bridge"].isin(selected_bridges), "Scenario"]))
+        selected_scenarios = st.multiselect("Scenarios", scenarios, default=scenarios)
+        latest_only = st.checkbox("Only show the latest run for each bridge and scenario", value=True)
+
+    if not bridges:
+        st.info("No results have been saved to the results store yet.")
+    else:
+        dxv_results = query_dxv_results(connection, bridge=selected_bridges, scenario=selected_scenarios)
+        scour_summary = query_scour_summary(connection, bridge=selected_bridges, scenario=selected_scenarios)
+        if latest_only:
+            # keep only the rows from the most recent run date for each bridge and scenario
+            dxv_results = dxv_results[dxv_results["Run Date"] == dxv_results.groupby(["Bridge", "Scenario"])["Run Date"].transform("max")]
+            scour_summary = scour_summary[scour_summary["Run Date"] == scour_summary.groupby(["Bridge", "Scenario"])["Run Date"].transform("max")]
+
+        st.divider()
+        st.header("Stored Runs")
+        st.dataframe(dxv_keys[dxv_keys["Bridge"].isin(selected_bridges)], use_container_width=True)
+        st.dataframe(scour_keys[scour_keys["Bridge"].isin(selected_bridges)], use_container_width=True)
+
+        st.divider()
+        st.header("Maximum Depth x Velocity (DxV) at Piers")
+        if dxv_results.empty:
+            st.info("No DxV results match the selected filters.")
+        else:
+            max_dxv = dxv_results.groupby(["Bridge", "Scenario", "Pier Arc ID"], as_index=False)["DxV"].max()
+            max_dxv["Pier"] = max_dxv["Bridge"] + " - " + max_dxv["Pier Arc ID"]
+            st.bar_chart(data=max_dxv, x="Pier", y="DxV", color="Scenario", stack=False, use_container_width=True)
+            st.dataframe(dxv_results, use_container_width=True)
+
+        st.divider()
+        st.header("Scour Elevation at Piers")
+        if scour_summary.empty:
+            st.info("No scour summaries match the selected filters.")
+        else:
+            scour_summary["Exposure Below Footing"] = scour_summary["Bottom of Footing Elev"] - scour_summary["Scour Elev"]
+            scour_summary["Pier"] = scour_summary["Bridge"] + " - " + scour_summary["Bent ID"]
+            st.bar_chart(data=scour_summary, x="Pier", y="Exposure Below Footing", color="Recurrence", stack=False, use_container_width=True)
+            st.dataframe(scour_summary, use_container_width=True)
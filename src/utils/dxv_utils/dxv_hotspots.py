@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import numpy as np
+
+from .read_srh_results import extract_peak_fields
+from .mesh_utils import triangulate_elements, triangles_in_window, rasterize_node_values
+from ..startup_utils.lazy_import import lazy_import
+
+
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+pq = lazy_import("pyarrow.parquet")
+
+
+HOTSPOT_FORMATS = {"npz": ".npz", "parquet": ".parquet"}
+
+
+def peak_dxv_field(depth_file:str, depth_file_name:str, velocity_file:str) -> tuple:
+    """
+    Calculates the peak depth, velocity and DxV at every node of the mesh in a blocked pass over both result files.
+    Args:
+        depth_file (str): Path to the HDF5 file containing water depth data.
+        depth_file_name (str): Name of the depth file, used to find the result group in both files.
+        velocity_file (str): Path to the HDF5 file containing velocity magnitude data.
+    Returns:
+        tuple: Three float32 arrays with the peak depth, peak velocity and DxV of each node. Dry nodes have a DxV of zero.
+    """
+    depth, velocity = extract_peak_fields(depth_file, depth_file_name, velocity_file)
+    if depth is None or velocity is None:
+        raise ValueError(f"No depth or velocity results found for {depth_file_name}.")
+    depth = depth.astype(np.float32)
+    velocity = velocity.astype(np.float32)
+    dxv = np.where((depth > 0) & (velocity > 0), depth * velocity, np.float32(0))
+    return depth, velocity, dxv
+
+
+def bridge_window(pier_data, margin:float) -> tuple:
+    """
+    Calculates a rectangular window around the bridge opening from the pier node coordinates.
+    Args:
+        pier_data (DataFrame): DataFrame with the pier node coordinates returned by read_map_file.
+        margin (float): Distance in feet to extend the window beyond the outermost pier nodes.
+    Returns:
+        tuple: The (xmin, ymin, xmax, ymax) extent of the window.
+    """
+    return (pier_data["lat"].min() - margin, pier_data["long"].min() - margin,
+            pier_data["lat"].max() + margin, pier_data["long"].max() + margin)
+
+
+def find_hotspots(model_nodes, dxv, depth, velocity, window, top_n:int = 10, min_separation:float = 0.0) -> pd.DataFrame:
+    """
+    Flags the nodes with the highest DxV inside a window.
+    Args:
+        model_nodes (DataFrame): DataFrame with the model node coordinates returned by read_geom_file.
+        dxv (ndarray): The DxV at each node.
+        depth (ndarray): The peak depth at each node.
+        velocity (ndarray): The peak velocity at each node.
+        window (tuple): The (xmin, ymin, xmax, ymax) extent to search.
+        top_n (int): Number of hotspots to return.
+        min_separation (float): Minimum distance in feet between hotspots, so neighbouring nodes of
+            the same peak are not all reported.
+    Returns:
+        DataFrame: The hotspots ranked by DxV with their node, coordinates, DxV, depth and velocity.
+    """
+    x = model_nodes["lat"].to_numpy()
+    y = model_nodes["long"].to_numpy()
+    xmin, ymin, xmax, ymax = window
+    candidates = np.flatnonzero((x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax) & (dxv > 0))
+    candidates = candidates[np.argsort(-dxv[candidates], kind="stable")]
+
+    selected = []
+    for index in candidates:
+        if len(selected) == top_n:
+            break
+        if selected and min_separation > 0:
+            if np.min(np.hypot(x[selected] - x[index], y[selected] - y[index])) < min_separation:
+                continue
+        selected.append(index)
+
+    selected = np.asarray(selected, dtype=np.int64)
+    return pd.DataFrame({"Rank": np.arange(1, len(selected) + 1),
+                         "Model Node": model_nodes["Node"].to_numpy()[selected],
+                         "x": x[selected],
+                         "y": y[selected],
+                         "DxV": np.round(dxv[selected], 2),
+                         "Depth": np.round(depth[selected], 4),
+                         "Velocity": np.round(velocity[selected], 4)})
+
+
+def dxv_hotspot_grid(model_nodes, elements, pier_data, depth_file:str, depth_file_name:str, velocity_file:str,
+                     margin:float = 200.0, cell_size:float = 2.0, top_n:int = 10, min_separation:float = 10.0) -> dict:
+    """
+    Calculates the peak DxV over the whole mesh and rasterizes it onto a regular grid around the bridge opening.
+    Args:
+        model_nodes (DataFrame): DataFrame with the model node coordinates returned by read_geom_file.
+        elements (ndarray): The element connectivity returned by read_geom_elements.
+        pier_data (DataFrame): DataFrame with the pier node coordinates returned by read_map_file.
+        depth_file (str): Path to the HDF5 file containing water depth data.
+        depth_file_name (str): Name of the depth file, used to find the result group in both files.
+        velocity_file (str): Path to the HDF5 file containing velocity magnitude data.
+        margin (float): Distance in feet to extend the grid beyond the outermost pier nodes.
+        cell_size (float): Grid cell size in feet.
+        top_n (int): Number of hotspots to flag.
+        min_separation (float): Minimum distance in feet between flagged hotspots.
+    Returns:
+        dict: The gridded field with keys
+            - 'dxv': float32 (rows x columns) grid of DxV, row 0 at the bottom, NaN outside the mesh.
+            - 'origin': (x, y) of the lower left grid corner.
+            - 'cell_size': grid cell size.
+            - 'hotspots': DataFrame returned by find_hotspots.
+    """
+    depth, velocity, dxv = peak_dxv_field(depth_file, depth_file_name, velocity_file)
+    window = bridge_window(pier_data, margin)
+    columns = int(np.ceil((window[2] - window[0]) / cell_size))
+    rows = int(np.ceil((window[3] - window[1]) / cell_size))
+
+    x = model_nodes["lat"].to_numpy()
+    y = model_nodes["long"].to_numpy()
+    triangles = triangles_in_window(x, y, triangulate_elements(elements), window)
+    grid = rasterize_node_values(x, y, triangles, dxv, (window[0], window[1]), cell_size, (rows, columns))
+    hotspots = find_hotspots(model_nodes, dxv, depth, velocity, window, top_n, min_separation)
+    return {"dxv": grid, "origin": (window[0], window[1]), "cell_size": cell_size, "hotspots": hotspots}
+
+
+def write_hotspot_grid(hotspot_grid:dict, destination, file_format:str = "npz"):
+    """
+    Writes the gridded DxV field and its hotspots to a compressed NumPy or Parquet file.
+    The NumPy archive holds the grid itself with its origin and cell size. The Parquet file holds one row
+    per wet grid cell with the cell center coordinates and a flag for the cells containing a hotspot.
+    Args:
+        hotspot_grid (dict): The field returned by dxv_hotspot_grid.
+        destination (str or file-like): Path or writable binary buffer to write to.
+        file_format (str): Either "npz" or "parquet".
+    """
+    grid = hotspot_grid["dxv"]
+    origin = hotspot_grid["origin"]
+    cell_size = hotspot_grid["cell_size"]
+    hotspots = hotspot_grid["hotspots"]
+    if file_format == "npz":
+        np.savez_compressed(destination,
+                            dxv=grid,
+                            origin=np.asarray(origin),
+                            cell_size=np.asarray(cell_size),
+                            hotspot_nodes=hotspots["Model Node"].to_numpy(),
+                            hotspot_xy=hotspots[["x", "y"]].to_numpy(),
+                            hotspot_dxv=hotspots["DxV"].to_numpy())
+    elif file_format == "parquet":
+        rows, columns = np.nonzero(~np.isnan(grid))
+        hotspot_columns = np.floor((hotspots["x"].to_numpy() - origin[0]) / cell_size).astype(np.int64)
+        hotspot_rows = np.floor((hotspots["y"].to_numpy() - origin[1]) / cell_size).astype(np.int64)
+        is_hotspot = np.isin(rows * grid.shape[1] + columns, hotspot_rows * grid.shape[1] + hotspot_columns)
+        table = pa.table({"x": pa.array(origin[0] + (columns + 0.5) * cell_size, type=pa.float64()),
+                          "y": pa.array(origin[1] + (rows + 0.5) * cell_size, type=pa.float64()),
+                          "DxV": pa.array(grid[rows, columns]),
+                          "Hotspot": pa.array(is_hotspot)})
+        pq.write_table(table, destination, compression="zstd")
+    else:
+        raise ValueError(f"Unknown hotspot format '{file_format}', expected one of {list(HOTSPOT_FORMATS)}.")
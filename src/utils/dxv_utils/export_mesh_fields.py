@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from functools import cache
+
+import numpy as np
+
+from .read_srh_results import extract_peak_fields
+from ..startup_utils.lazy_import import lazy_import
+
+
+pa = lazy_import("pyarrow")
+pq = lazy_import("pyarrow.parquet")
+ipc = lazy_import("pyarrow.ipc")
+
+
+@cache
+def mesh_fields_schema() -> pa.Schema:
+    """
+    Returns the typed columns of the exported mesh fields. Node ids and results are stored in 32 bits,
+    the state plane coordinates need full double precision.
+    """
+    return pa.schema([
+        pa.field("Node", pa.int32()),
+        pa.field("x", pa.float64()),
+        pa.field("y", pa.float64()),
+        pa.field("Depth", pa.float32()),
+        pa.field("Velocity", pa.float32()),
+        pa.field("DxV", pa.float32()),
+    ])
+
+EXPORT_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def nodes_near_piers(pier_data, model_nodes, buffer_distance:float) -> np.ndarray:
+    """
+    Finds the model nodes within a buffer distance of any pier node.
+    Args:
+        pier_data (DataFrame): DataFrame with the pier node coordinates returned by read_map_file.
+        model_nodes (DataFrame): DataFrame with the model node coordinates returned by read_geom_file.
+        buffer_distance (float): Distance in feet around each pier node to include.
+    Returns:
+        ndarray: The ids of the model nodes within the buffer distance, in mesh order.
+    """
+    node_x = model_nodes["lat"].to_numpy()
+    node_y = model_nodes["long"].to_numpy()
+    selected = np.zeros(len(model_nodes), dtype=bool)
+    for pier_x, pier_y in zip(pier_data["lat"].to_numpy(), pier_data["long"].to_numpy()):
+        selected |= (node_x - pier_x)**2 + (node_y - pier_y)**2 <= buffer_distance**2
+    return model_nodes["Node"].to_numpy()[selected]
+
+
+def build_mesh_fields_table(model_nodes, depth_file:str, depth_file_name:str, velocity_file:str, nodes=None) -> pa.Table:
+    """
+    Builds a columnar table of the peak depth, velocity and DxV at each node with its coordinates.
+    Args:
+        model_nodes (DataFrame): DataFrame with the model node coordinates returned by read_geom_file.
+        depth_file (str): Path to the HDF5 file containing water depth data.
+        depth_file_name (str): Name of the depth file, used to find the result group in both files.
+        velocity_file (str): Path to the HDF5 file containing velocity magnitude data.
+        nodes (array): Node ids to export. The whole mesh is exported if None.
+    Returns:
+        Table: A pyarrow table with the columns of mesh_fields_schema.
+    """
+    if nodes is None:
+        node_ids = model_nodes["Node"].to_numpy()
+        x = model_nodes["lat"].to_numpy()
+        y = model_nodes["long"].to_numpy()
+        depth, velocity = extract_peak_fields(depth_file, depth_file_name, velocity_file)
+    else:
+        subset = model_nodes[model_nodes["Node"].isin(nodes)]
+        node_ids = subset["Node"].to_numpy()
+        x = subset["lat"].to_numpy()
+        y = subset["long"].to_numpy()
+        depth, velocity = extract_peak_fields(depth_file, depth_file_name, velocity_file, node_ids)
+    if depth is None or velocity is None:
+        raise ValueError(f"No depth or velocity results found for {depth_file_name}.")
+
+    depth = depth.astype(np.float32)
+    velocity = velocity.astype(np.float32)
+    # dry nodes are written with a negative depth by SRH-2D, their DxV is zero
+    dxv = np.where((depth > 0) & (velocity > 0), depth * velocity, np.float32(0))
+    return pa.Table.from_arrays([pa.array(node_ids.astype(np.int32)),
+                                 pa.array(x, type=pa.float64()),
+                                 pa.array(y, type=pa.float64()),
+                                 pa.array(depth),
+                                 pa.array(velocity),
+                                 pa.array(dxv)], schema=mesh_fields_schema())
+
+
+def write_mesh_fields(table:pa.Table, destination, file_format:str = "parquet", compression:str = "zstd"):
+    """
+    Writes the mesh fields table to a Parquet or Arrow IPC file.
+    Args:
+        table (Table): The table returned by build_mesh_fields_table.
+        destination (str or file-like): Path or writable binary buffer to write to.
+        file_format (str): Either "parquet" or "arrow".
+        compression (str): Compression codec, e.g. "zstd", "lz4" or None.
+    """
+    if file_format == "parquet":
+        pq.write_table(table, destination, compression=compression)
+    elif file_format == "arrow":
+        options = ipc.IpcWriteOptions(compression=compression)
+        with ipc.new_file(destination, table.schema, options=options) as writer:
+            writer.write_table(table)
+    else:
+        raise ValueError(f"Unknown export format '{file_format}', expected one of {list(EXPORT_FORMATS)}.")
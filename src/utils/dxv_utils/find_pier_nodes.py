@@ -1,17 +1,42 @@
-import pandas as pd 
+from __future__ import annotations
+
+import os
 import re
-import math
+from array import array
+from collections import deque
+from typing import Iterator
 import numpy as np
-from pyproj import Proj, transform, Transformer
-import streamlit as st
-from .read_srh_results import extract_data
+from .read_srh_results import extract_data, extract_peak_fields
+from ..startup_utils.lazy_import import lazy_import
+
+
+pd = lazy_import("pandas")
+st = lazy_import("streamlit")
+
+
+def _iter_lines(source) -> Iterator[bytes]:
+    """
+    Yields the raw lines of an uploaded file or a local file one at a time.
+    Args:
+        source (file-like or str): An uploaded file object or the path to a file on disk.
+    Yields:
+        bytes: Each line of the file, undecoded, including the line terminator.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as file:
+            yield from file
+    else:
+        # uploaded files are binary buffers, iterating them reads one line at a time
+        # rather than decoding the whole upload into a single string
+        source.seek(0)
+        yield from source
 
 
 def read_map_file(map_file_path:str, scour_run:str) -> tuple:
     """
     Reads a map file and extracts information about pier nodes and arc nodes.
     Args:
-        map_file_path (str): The path to the map file.
+        map_file_path (str): The path to the map file or the uploaded map file.
         scour_run (str): The identifier for the scour run to search for in the file.
     Returns:
         tuple: A tuple containing two pandas DataFrames:
@@ -19,52 +44,46 @@ def read_map_file(map_file_path:str, scour_run:str) -> tuple:
             - arc_nodes: DataFrame with columns ['Node', 'arcID'] containing information about arc nodes.
 
     """
-    #with open(map_file_path, 'r') as file:
-    file = map_file_path.read().decode("utf-8").splitlines()
-    
-    # Read each line in the file
-    i=0
-    arc_pier_index = []
-    
-    node_index = []
-    scour_data_index = []
-    
-    for line in file:
-        
-        if scour_run in line:
-            scour_data_index.append(i)
-        if "arcType 5" in line:
-            arc_pier_index.append(i)
-            
-        try:
-            if "ID" in line and i > scour_data_index[0]:
-                node_index.append(i)
-        except:
-            pass
-            
-        i+=1
-  
-    lines = [line.rstrip() for line in file]
-    st.write(f"Found {len(arc_pier_index)} arc pier nodes and {len(node_index)} potential nodes surrounding the piers.")
+    # Only the last three lines are kept while streaming through the file. The arc and node
+    # records are identified by looking back from the "arcType 5" and "ID" lines.
+    previous_lines = deque(maxlen=3)
+    after_scour_run = False
+    arc_pier_count = 0
+    node_count = 0
     arc_nodes = []
-    
-    for i in arc_pier_index:
-        n = re.split(r'\s+', lines[i-1])[1]
-        p = re.split(r'\s+', lines[i-1])[2]
-        arc_id = re.split(r'\s+', lines[i-3])[1]
-        arc_nodes.append([f"ID {n}", f"ArcID {arc_id}"])
-        arc_nodes.append([f"ID {p}", f"ArcID {arc_id}"])
-    nodes = []
-    pier_nodes = []
+    candidate_nodes = []
+
+    for raw_line in _iter_lines(map_file_path):
+        line = raw_line.decode("utf-8").rstrip()
+
+        if "arcType 5" in line and len(previous_lines) == 3:
+            arc_pier_count += 1
+            n = re.split(r'\s+', previous_lines[-1])[1]
+            p = re.split(r'\s+', previous_lines[-1])[2]
+            arc_id = re.split(r'\s+', previous_lines[-3])[1]
+            arc_nodes.append([f"ID {n}", f"ArcID {arc_id}"])
+            arc_nodes.append([f"ID {p}", f"ArcID {arc_id}"])
+
+        if "ID" in line and after_scour_run:
+            node_count += 1
+            if len(previous_lines) >= 2 and previous_lines[-2] == "NODE":
+                candidate_nodes.append([line, previous_lines[-1]])
+
+        if scour_run in line:
+            after_scour_run = True
+        previous_lines.append(line)
+
+    st.write(f"Found {arc_pier_count} arc pier nodes and {node_count} potential nodes surrounding the piers.")
+
     arc_nodes = pd.DataFrame(arc_nodes, columns=["Node", "arcID"])
-    for j in node_index:
-        if lines[j-2] == "NODE" and lines[j] in arc_nodes["Node"].values:
-            nodes.append(j)
-            elements = re.split(r'\s+', lines[j-1].rstrip())
-            arc = re.split(r'\s+', lines[j].rstrip())[1]
+    arc_node_ids = set(arc_nodes["Node"].values)
+    pier_nodes = []
+    for node_line, xy_line in candidate_nodes:
+        if node_line in arc_node_ids:
+            elements = re.split(r'\s+', xy_line)
+            arc = re.split(r'\s+', node_line)[1]
             arc_id = f"ID {arc}"
             pier_nodes.append([arc_id,elements[1], elements[2]])
-            #xy[lines[j]] = re.split(r'\s+', lines[j-1])
     pier_nodes = pd.DataFrame(pier_nodes, columns=["Pier Node", 'lat', 'long'])
    
     pier_nodes['lat'] = pd.to_numeric(pier_nodes['lat'])
@@ -75,26 +94,63 @@ def read_geom_file(srhgeom_file_path:str) -> dict:
     """
     Reads a geometry file and extracts node information.
     Args:
-        srhgeom_file_path (str): The path to the geometry file.
+        srhgeom_file_path (str): The path to the geometry file or the uploaded geometry file.
     Returns:
         DataFrame: A pandas DataFrame with columns ['Node', 'lat', 'long'] containing information about nodes.
     
     """
-    #with open(srhgeom_file_path, 'r') as file:
-    file = srhgeom_file_path.read().decode("utf-8").splitlines()
-    # Read each line in the file
-    node_rows = []
-    for line in file:
-        if "Node" in line.split():
-            data_rows = re.split(r'\s+', line.rstrip())
-            node_rows.append([data_rows[1], data_rows[2], data_rows[3]])
-    node_xy = pd.DataFrame(node_rows, columns=["Node", 'lat', 'long'])
-    node_xy['lat'] = pd.to_numeric(node_xy['lat'])
-    node_xy['long'] = pd.to_numeric(node_xy['long'])
+    # The file is parsed line by line as bytes and the values are packed straight into typed
+    # arrays, so no decoded copy of the file or per-node Python strings are held in memory.
+    node_ids = array('q')
+    node_x = array('d')
+    node_y = array('d')
+    for raw_line in _iter_lines(srhgeom_file_path):
+        data_rows = raw_line.split()
+        if data_rows and data_rows[0] == b"Node":
+            node_ids.append(int(data_rows[1]))
+            node_x.append(float(data_rows[2]))
+            node_y.append(float(data_rows[3]))
+    node_xy = pd.DataFrame({"Node": np.frombuffer(node_ids, dtype=np.int64),
+                            'lat': np.frombuffer(node_x, dtype=np.float64),
+                            'long': np.frombuffer(node_y, dtype=np.float64)})
        
     return node_xy
 
 
+def read_geom_elements(srhgeom_file_path:str) -> np.ndarray:
+    """
+    Reads a geometry file and extracts the element connectivity.
+    Args:
+        srhgeom_file_path (str): The path to the geometry file or the uploaded geometry file.
+    Returns:
+        ndarray: An (elements x 4) integer array with the node ids of each triangle or quadrilateral element.
+            Triangles have a 0 in the last column.
+    """
+    element_nodes = array('q')
+    for raw_line in _iter_lines(srhgeom_file_path):
+        data_rows = raw_line.split()
+        if data_rows and data_rows[0] == b"Elem":
+            nodes = [int(node) for node in data_rows[2:6]]
+            element_nodes.extend(nodes + [0] * (4 - len(nodes)))
+    return np.frombuffer(element_nodes, dtype=np.int64).reshape(-1, 4)
+
+
+def nodes_within_radius(x:float, y:float, model_nodes, search_radius:float) -> tuple:
+    """
+    Finds the model nodes within a search radius of a point.
+    Args:
+        x (float): The x coordinate of the point.
+        y (float): The y coordinate of the point.
+        model_nodes (DataFrame): DataFrame with columns ['Node', 'lat', 'long'] returned by read_geom_file.
+        search_radius (float): max distance from the point to search.
+    Returns:
+        tuple: Two arrays with the ids of the nodes within the search radius, in mesh order, and their distances from the point.
+    """
+    distance = np.hypot(model_nodes["lat"].to_numpy() - x, model_nodes["long"].to_numpy() - y)
+    within = distance <= search_radius
+    return model_nodes["Node"].to_numpy()[within], distance[within]
+
+
 def find_mesh_points(pier_data:dict, model_nodes:dict,arc_node_mapping:dict, depth_file:str,depth_file_name, velocity_file:str, search_radius = 8) -> None:
     """
     Finds the mesh points around piers and calculates the Depth x Velocity (DxV) product for each pier.
@@ -118,11 +174,7 @@ def find_mesh_points(pier_data:dict, model_nodes:dict,arc_node_mapping:dict, dep
     
     for index, row in pier_data.iterrows():
         my_bar.progress(index, text=f"Processing Pier {row["Pier Node"]}...")
-        temp_nodes = []
-        for idx, model_row in model_nodes.iterrows():
-            distance = math.dist([row["lat"], row["long"]], [model_row["lat"], model_row["long"]])
-            if distance <= search_radius:
-                temp_nodes.append(model_row["Node"])
+        temp_nodes = nodes_within_radius(row["lat"], row["long"], model_nodes, search_radius)[0].tolist()
         depth, velocity = extract_data(depth_file,depth_file_name, velocity_file, temp_nodes)
         if depth.empty or velocity.empty:
             st.warning(f"No depth or velocity data found for pier {row["Pier Node"]}. Skipping.")
@@ -159,4 +211,59 @@ def find_mesh_points(pier_data:dict, model_nodes:dict,arc_node_mapping:dict, dep
     return max_nodes
 
 
+def sweep_search_radius(pier_data, model_nodes, arc_node_mapping, depth_file:str, depth_file_name:str, velocity_file:str, radii) -> pd.DataFrame:
+    """
+    Calculates the maximum DxV at each pier for a range of search radii in a single extraction.
+    The candidate nodes of each pier are sorted by distance once and the running maximum DxV is taken
+    as the radius grows, so every radius is evaluated from the same depth and velocity read.
+
+    Parameters:
+        pier_data (DataFrame): DataFrame with the pier node coordinates returned by read_map_file.
+        model_nodes (DataFrame): DataFrame with the model node coordinates returned by read_geom_file.
+        arc_node_mapping (DataFrame): DataFrame mapping pier nodes to arc IDs returned by read_map_file.
+        depth_file (str): Path to the file containing depth data.
+        depth_file_name (str): Name of the depth file, used to find the result group in both files.
+        velocity_file (str): Path to the file containing velocity data.
+        radii (list): Search radii in feet to evaluate.
+
+    Returns:
+        DataFrame: One row per pier node and radius with the node, DxV, depth and velocity at the maximum DxV.
+            Radii with no wet nodes inside them are NaN.
+    """
+    radii = np.sort(np.asarray(radii, dtype=np.float64))
+    candidates = []
+    for x, y in zip(pier_data["lat"].to_numpy(), pier_data["long"].to_numpy()):
+        node_ids, distance = nodes_within_radius(x, y, model_nodes, radii[-1])
+        order = np.argsort(distance, kind="stable")
+        candidates.append((node_ids[order], distance[order]))
+
+    # read the peak depth and velocity once for every node inside the largest radius of any pier
+    all_nodes = np.unique(np.concatenate([node_ids for node_ids, _ in candidates]))
+    depth, velocity = extract_peak_fields(depth_file, depth_file_name, velocity_file, all_nodes)
+    if depth is None or velocity is None:
+        depth = np.full(len(all_nodes), np.nan)
+        velocity = np.full(len(all_nodes), np.nan)
+
+    sweep = []
+    for pier_node, (node_ids, distance) in zip(pier_data["Pier Node"], candidates):
+        arc_id = arc_node_mapping.loc[arc_node_mapping["Node"] == pier_node, "arcID"].values[0]
+        position = np.searchsorted(all_nodes, node_ids)
+        pier_depth = depth[position].astype(np.float64)
+        pier_velocity = velocity[position].astype(np.float64)
+        dxv = np.where((pier_depth > 0) & (pier_velocity > 0), np.round(pier_depth * pier_velocity, 2), -np.inf)
+
+        # running maximum DxV and the position of the node it came from as the radius grows
+        running_max = np.maximum.accumulate(dxv) if len(dxv) else dxv
+        previous_max = np.concatenate(([-np.inf], running_max[:-1]))
+        best = np.maximum.accumulate(np.where(dxv > previous_max, np.arange(len(dxv)), 0)) if len(dxv) else dxv
+
+        node_count = np.searchsorted(distance, radii, side="right")
+        for radius, count in zip(radii, node_count):
+            if count == 0 or running_max[count - 1] == -np.inf:
+                sweep.append([arc_id, pier_node, radius, np.nan, np.nan, np.nan, np.nan])
+                continue
+            i = best[count - 1]
+            sweep.append([arc_id, pier_node, radius, node_ids[i], dxv[i],
+                          np.round(pier_depth[i], 4), np.round(pier_velocity[i], 4)])
 
+    return pd.DataFrame(sweep, columns=["Pier Arc ID", "Pier Node", "Search Radius", "Model Node", "DxV", "Depth", "Velocity"])
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import numpy as np
+
+from .mesh_utils import build_node_grid, grid_indices_in_window
+from ..startup_utils.lazy_import import lazy_import
+
+
+pd = lazy_import("pandas")
+pdk = lazy_import("pydeck")
+pyproj = lazy_import("pyproj")
+
+
+# Web mercator ground resolution at the equator for zoom level 0, in meters per pixel
+METERS_PER_PIXEL_ZOOM_0 = 156543.03392
+
+# Approximate width and height in pixels of the map on the page, used to size the viewport window
+MAP_SIZE_PX = (1200, 600)
+
+# Most nodes or elements of each layer drawn at once
+DEFAULT_FEATURE_BUDGET = 20000
+
+MAP_LAYERS = ["Mesh elements", "Mesh nodes", "Search zones", "Pier arcs", "Maximum DxV nodes"]
+
+
+def build_map_index(model_nodes, elements) -> dict:
+    """
+    Builds the spatial index of the mesh nodes and elements used to pick the features shown in a map viewport.
+    Args:
+        model_nodes (DataFrame): DataFrame with the model node coordinates returned by read_geom_file.
+        elements (ndarray): The (elements x 4) node id array returned by read_geom_elements.
+    Returns:
+        dict: The index with keys
+            - 'x', 'y': the node coordinates.
+            - 'elements': (elements x 4) zero based node indices, -1 for the missing corner of triangles.
+            - 'node_grid', 'element_grid': grids of the nodes and element centroids returned by build_node_grid.
+    """
+    x = model_nodes["lat"].to_numpy(dtype=np.float64)
+    y = model_nodes["long"].to_numpy(dtype=np.float64)
+    elements = np.asarray(elements, dtype=np.int64) - 1
+    corners = elements >= 0
+    corner_count = corners.sum(axis=1)
+    centroid_x = np.where(corners, x[elements], 0.0).sum(axis=1) / corner_count
+    centroid_y = np.where(corners, y[elements], 0.0).sum(axis=1) / corner_count
+
+    # cells of about four nodes each, so a window query touches few nodes outside the window
+    extent = max((x.max() - x.min()) * (y.max() - y.min()), 1.0) if len(x) else 1.0
+    cell_size = max(np.sqrt(4 * extent / max(len(x), 1)), 1e-6)
+    return {"x": x, "y": y, "elements": elements,
+            "node_grid": build_node_grid(x, y, cell_size),
+            "element_grid": build_node_grid(centroid_x, centroid_y, cell_size)}
+
+
+def units_to_meters(crs:str) -> float:
+    """
+    Returns the length in meters of one unit of a projected coordinate system, e.g. 0.3048006 for US survey feet.
+    """
+    return pyproj.CRS(crs).axis_info[0].unit_conversion_factor
+
+
+def view_window(center:tuple, zoom:float, crs:str, size_px:tuple = MAP_SIZE_PX) -> tuple:
+    """
+    Calculates the extent of the map viewport in the projected coordinates of the mesh.
+    Args:
+        center (tuple): The (x, y) projected coordinates of the center of the map.
+        zoom (float): The web map zoom level.
+        crs (str): The coordinate reference system of the mesh, e.g. 'EPSG:2233'.
+        size_px (tuple): The width and height of the map in pixels.
+    Returns:
+        tuple: The (xmin, ymin, xmax, ymax) extent of the viewport, and the (longitude, latitude) of its center.
+    """
+    longitude, latitude = pyproj.Transformer.from_crs(crs, "EPSG:4326", always_xy=True).transform(*center)
+    units_per_pixel = METERS_PER_PIXEL_ZOOM_0 * np.cos(np.radians(latitude)) / 2**zoom / units_to_meters(crs)
+    half_width = units_per_pixel * size_px[0] / 2
+    half_height = units_per_pixel * size_px[1] / 2
+    window = (center[0] - half_width, center[1] - half_height, center[0] + half_width, center[1] + half_height)
+    return window, (longitude, latitude)
+
+
+def decimate_points(x, y, indices, window, budget:int) -> np.ndarray:
+    """
+    Thins points evenly over a window, keeping the first point in each cell of a square lattice over the points.
+    The lattice starts with budget cells and is refined while the occupied cells still fit in the budget,
+    so a mesh that covers only part of the window is not thinned more than needed.
+    Args:
+        x (ndarray): The x coordinates of all points.
+        y (ndarray): The y coordinates of all points.
+        indices (ndarray): The indices of the points inside the window.
+        window (tuple): The (xmin, ymin, xmax, ymax) extent of the window.
+        budget (int): Most points to keep.
+    Returns:
+        ndarray: The indices of the kept points, all of them if there are no more than budget.
+    """
+    if len(indices) <= budget:
+        return indices
+    px = x[indices]
+    py = y[indices]
+    xmin, ymin = max(window[0], px.min()), max(window[1], py.min())
+    width = max(min(window[2], px.max()) - xmin, min(window[3], py.max()) - ymin, 1e-9)
+    side = max(int(np.sqrt(budget)), 1)
+    kept = indices[:0]
+    for _ in range(10):
+        i = np.clip(((px - xmin) / width * side).astype(np.int64), 0, side - 1)
+        j = np.clip(((py - ymin) / width * side).astype(np.int64), 0, side - 1)
+        _, first = np.unique(i * side + j, return_index=True)
+        if len(first) > budget:
+            break
+        kept = indices[np.sort(first)]
+        side *= 2
+    return kept
+
+
+def select_mesh_features(map_index:dict, window, budget:int = DEFAULT_FEATURE_BUDGET) -> dict:
+    """
+    Picks the mesh nodes and elements drawn in a viewport, so no more than budget of each are sent to the browser.
+    Elements are drawn when all of the elements in the viewport fit in the budget, otherwise only an evenly thinned
+    set of nodes is drawn.
+    Args:
+        map_index (dict): The index returned by build_map_index.
+        window (tuple): The (xmin, ymin, xmax, ymax) extent of the viewport.
+        budget (int): Most nodes and most elements drawn.
+    Returns:
+        dict: The indices of the 'nodes' and 'elements' to draw and the number of 'nodes_in_view' and 'elements_in_view'.
+    """
+    nodes = grid_indices_in_window(map_index["node_grid"], window)
+    elements = grid_indices_in_window(map_index["element_grid"], window)
+    return {"nodes": decimate_points(map_index["x"], map_index["y"], nodes, window, budget),
+            "elements": elements if len(elements) <= budget else elements[:0],
+            "nodes_in_view": len(nodes), "elements_in_view": len(elements)}
+
+
+def mesh_map_deck(map_index:dict, selection:dict, crs:str, view_center:tuple, zoom:float, pier_locations, arc_node_mapping,
+                  search_radius:float, max_nodes=None, layers:list = MAP_LAYERS) -> pdk.Deck:
+    """
+    Builds the map of the mesh around the bridge with the search zones, pier arcs and maximum DxV nodes.
+    Only the selected features are transformed to latitude and longitude.
+    Args:
+        map_index (dict): The index returned by build_map_index.
+        selection (dict): The features returned by select_mesh_features.
+        crs (str): The coordinate reference system of the mesh, e.g. 'EPSG:2233'.
+        view_center (tuple): The (longitude, latitude) of the center of the map returned by view_window.
+        zoom (float): The web map zoom level.
+        pier_locations (DataFrame): DataFrame with the pier node coordinates returned by read_map_file.
+        arc_node_mapping (DataFrame): DataFrame mapping pier nodes to arc IDs returned by read_map_file.
+        search_radius (float): max distance from the pier centerline nodes searched for max DxV, drawn as a circle.
+        max_nodes (DataFrame): The maximum DxV nodes returned by find_mesh_points with 'lat' and 'long' in degrees, or None.
+        layers (list): The names of MAP_LAYERS to draw.
+    Returns:
+        Deck: The pydeck map.
+    """
+    transformer = pyproj.Transformer.from_crs(crs, "EPSG:4326", always_xy=True)
+    deck_layers = []
+
+    if "Mesh elements" in layers and len(selection["elements"]):
+        elements = map_index["elements"][selection["elements"]]
+        corner_nodes, corner_index = np.unique(elements[elements >= 0], return_inverse=True)
+        longitude, latitude = transformer.transform(map_index["x"][corner_nodes], map_index["y"][corner_nodes])
+        points = np.column_stack([longitude, latitude])
+        corners = np.full(elements.shape, -1)
+        corners[elements >= 0] = corner_index
+        polygons = [points[row[row >= 0]].tolist() for row in corners]
+        deck_layers.append(pdk.Layer("PolygonLayer", pd.DataFrame({"polygon": polygons}), get_polygon="polygon",
+                                     filled=False, stroked=True, get_line_color=[90, 90, 90], line_width_min_pixels=1))
+
+    if "Mesh nodes" in layers and len(selection["nodes"]):
+        longitude, latitude = transformer.transform(map_index["x"][selection["nodes"]], map_index["y"][selection["nodes"]])
+        deck_layers.append(pdk.Layer("ScatterplotLayer", pd.DataFrame({"lon": longitude, "lat": latitude}),
+                                     get_position=["lon", "lat"], get_fill_color=[40, 110, 200], radius_min_pixels=1.5,
+                                     radius_max_pixels=3, get_radius=0.5))
+
+    pier_longitude, pier_latitude = transformer.transform(pier_locations["lat"].to_numpy(), pier_locations["long"].to_numpy())
+    piers = pd.DataFrame({"Pier Node": pier_locations["Pier Node"].to_numpy(), "lon": pier_longitude, "lat": pier_latitude})
+    # each pickable layer has a label column shown by the tooltip
+    piers["label"] = "Search zone of pier node " + piers["Pier Node"].astype(str)
+    if "Search zones" in layers:
+        deck_layers.append(pdk.Layer("ScatterplotLayer", piers, get_position=["lon", "lat"], filled=False, stroked=True,
+                                     get_radius=search_radius * units_to_meters(crs), radius_units="meters",
+                                     get_line_color=[230, 140, 0], line_width_min_pixels=2, pickable=True))
+    if "Pier arcs" in layers:
+        arcs = piers.merge(arc_node_mapping.drop_duplicates("Node"), left_on="Pier Node", right_on="Node")
+        paths = [{"label": f"Pier {arc_id}", "path": arc[["lon", "lat"]].to_numpy().tolist()} for arc_id, arc in arcs.groupby("arcID", sort=False)]
+        deck_layers.append(pdk.Layer("PathLayer", pd.DataFrame(paths), get_path="path", get_color=[200, 30, 30],
+                                     width_min_pixels=3, pickable=True))
+    if "Maximum DxV nodes" in layers and max_nodes is not None and len(max_nodes):
+        dxv_nodes = max_nodes[["long", "lat"]].copy()
+        dxv_nodes["label"] = ("Maximum DxV " + max_nodes["DxV"].astype(str) + " of " + max_nodes["Pier Arc ID"].astype(str) +
+                              " at node " + max_nodes["Model Node"].astype(str))
+        deck_layers.append(pdk.Layer("ScatterplotLayer", dxv_nodes,
+                                     get_position=["long", "lat"], get_fill_color=[220, 0, 120], radius_min_pixels=5, pickable=True))
+
+    return pdk.Deck(layers=deck_layers, map_style=None,
+                    initial_view_state=pdk.ViewState(longitude=view_center[0], latitude=view_center[1], zoom=zoom),
+                    tooltip={"text": "{label}"})
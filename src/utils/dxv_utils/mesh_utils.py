@@ -0,0 +1,274 @@
+import numpy as np
+
+
+# Upper limit on the number of (triangle, grid cell) pairs evaluated at once when rasterizing,
+# which keeps the temporary arrays to a few hundred megabytes on any mesh size.
+MAX_RASTER_PAIRS = 4_000_000
+
+
+def triangulate_elements(elements:np.ndarray) -> np.ndarray:
+    """
+    Splits the mesh elements into triangles.
+    Args:
+        elements (ndarray): The (elements x 4) node id array returned by read_geom_elements.
+    Returns:
+        ndarray: A (triangles x 3) array of zero based node indices. Quadrilaterals are split along their first diagonal.
+    """
+    elements = np.asarray(elements, dtype=np.int64)
+    quads = elements[:, 3] > 0
+    triangles = np.concatenate([elements[:, [0, 1, 2]], elements[quads][:, [0, 2, 3]]])
+    return triangles - 1
+
+
+def build_node_grid(x, y, cell_size:float) -> dict:
+    """
+    Buckets the mesh nodes into a regular grid so the nodes near a point can be found without measuring the distance
+    to every node of the mesh.
+    Args:
+        x (ndarray): The x coordinates of the mesh nodes.
+        y (ndarray): The y coordinates of the mesh nodes.
+        cell_size (float): The width and height of each grid cell, about the search radius works well.
+    Returns:
+        dict: The grid with keys
+            - 'x', 'y': the node coordinates.
+            - 'origin', 'cell_size', 'shape': the lower left corner, cell size and (columns, rows) of the grid.
+            - 'order': the node indices sorted by grid cell.
+            - 'cell_start': the position in order of the first node of each cell, with one extra entry at the end.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    origin = (x.min(), y.min()) if len(x) else (0.0, 0.0)
+    shape = (int((x.max() - origin[0]) // cell_size) + 1, int((y.max() - origin[1]) // cell_size) + 1) if len(x) else (1, 1)
+    cells = (((x - origin[0]) // cell_size).astype(np.int64) * shape[1] +
+             ((y - origin[1]) // cell_size).astype(np.int64))
+    order = np.argsort(cells, kind="stable")
+    cell_start = np.concatenate(([0], np.cumsum(np.bincount(cells, minlength=shape[0] * shape[1]))))
+    return {"x": x, "y": y, "origin": origin, "cell_size": cell_size, "shape": shape, "order": order, "cell_start": cell_start}
+
+
+def grid_nodes_within_radius(grid:dict, px:float, py:float, radius:float) -> tuple:
+    """
+    Finds the mesh nodes within a radius of a point using the grid returned by build_node_grid.
+    Args:
+        grid (dict): The grid returned by build_node_grid.
+        px (float): The x coordinate of the point.
+        py (float): The y coordinate of the point.
+        radius (float): Maximum distance from the point.
+    Returns:
+        tuple: The indices of the nodes within the radius, in mesh order, and their distances from the point.
+    """
+    (columns, rows), size, origin = grid["shape"], grid["cell_size"], grid["origin"]
+    i0, i1 = np.clip([(px - radius - origin[0]) // size, (px + radius - origin[0]) // size], 0, columns - 1).astype(np.int64)
+    j0, j1 = np.clip([(py - radius - origin[1]) // size, (py + radius - origin[1]) // size], 0, rows - 1).astype(np.int64)
+    # the cells of each grid column are contiguous in order, so each column of the search window is one slice
+    starts = grid["cell_start"][np.arange(i0, i1 + 1) * rows + j0]
+    stops = grid["cell_start"][np.arange(i0, i1 + 1) * rows + j1 + 1]
+    candidates = np.sort(np.concatenate([grid["order"][start:stop] for start, stop in zip(starts, stops)]))
+    distance = np.hypot(grid["x"][candidates] - px, grid["y"][candidates] - py)
+    within = distance <= radius
+    return candidates[within], distance[within]
+
+
+def grid_indices_in_window(grid:dict, window) -> np.ndarray:
+    """
+    Finds the points of a grid returned by build_node_grid inside a rectangular window.
+    Args:
+        grid (dict): The grid returned by build_node_grid.
+        window (tuple): The (xmin, ymin, xmax, ymax) extent of the window.
+    Returns:
+        ndarray: The indices of the points inside the window, in mesh order.
+    """
+    xmin, ymin, xmax, ymax = window
+    (columns, rows), size, origin = grid["shape"], grid["cell_size"], grid["origin"]
+    i0, i1 = np.clip([(xmin - origin[0]) // size, (xmax - origin[0]) // size], 0, columns - 1).astype(np.int64)
+    j0, j1 = np.clip([(ymin - origin[1]) // size, (ymax - origin[1]) // size], 0, rows - 1).astype(np.int64)
+    starts = grid["cell_start"][np.arange(i0, i1 + 1) * rows + j0]
+    stops = grid["cell_start"][np.arange(i0, i1 + 1) * rows + j1 + 1]
+    candidates = np.sort(np.concatenate([grid["order"][start:stop] for start, stop in zip(starts, stops)]))
+    x = grid["x"][candidates]
+    y = grid["y"][candidates]
+    return candidates[(x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)]
+
+
+def barycentric_weights(px, py, ax, ay, bx, by, cx, cy) -> tuple:
+    """
+    Calculates the barycentric weights of points with respect to the triangles a, b, c.
+    All arguments are arrays of the same length, one entry per point and triangle pair.
+    Returns:
+        tuple: The three weight arrays. A point lies inside its triangle when all three weights are >= 0.
+    """
+    det = (by - cy) * (ax - cx) + (cx - bx) * (ay - cy)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        wa = ((by - cy) * (px - cx) + (cx - bx) * (py - cy)) / det
+        wb = ((cy - ay) * (px - cx) + (ax - cx) * (py - cy)) / det
+    return wa, wb, 1.0 - wa - wb
+
+
+def _expand_cell_ranges(i0, i1, j0, j1) -> tuple:
+    """
+    Lists the grid cells covered by each (i0..i1, j0..j1) range of cells.
+    Returns:
+        tuple: The index of the range and the column and row of each covered cell.
+    """
+    widths = np.maximum(i1 - i0 + 1, 0)
+    counts = widths * np.maximum(j1 - j0 + 1, 0)
+    owner = np.repeat(np.arange(len(counts)), counts)
+    offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, i0[owner] + offset % widths[owner], j0[owner] + offset // widths[owner]
+
+
+def build_triangle_locator(x, y, triangles, cell_size:float = None) -> dict:
+    """
+    Buckets the mesh triangles into a regular grid so the triangle containing a point can be found by testing only
+    the few triangles that overlap the point's grid cell.
+    Args:
+        x (ndarray): The x coordinates of the mesh nodes.
+        y (ndarray): The y coordinates of the mesh nodes.
+        triangles (ndarray): The (triangles x 3) node index array returned by triangulate_elements.
+        cell_size (float): The width and height of each grid cell. Defaults to the median triangle size.
+    Returns:
+        dict: The locator with keys
+            - 'x', 'y', 'triangles': the mesh the locator was built from.
+            - 'origin', 'cell_size', 'shape': the lower left corner, cell size and (columns, rows) of the grid.
+            - 'cell_triangles': the triangles overlapping each cell, sorted by cell.
+            - 'cell_start': the position in cell_triangles of the first triangle of each cell, with one extra entry at the end.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    tx = x[triangles]
+    ty = y[triangles]
+    if cell_size is None:
+        cell_size = float(np.median(np.maximum(np.ptp(tx, axis=1), np.ptp(ty, axis=1)))) if len(triangles) else 1.0
+    cell_size = max(cell_size, 1e-6)
+    origin = (tx.min(), ty.min()) if len(triangles) else (0.0, 0.0)
+    shape = (int((tx.max() - origin[0]) // cell_size) + 1, int((ty.max() - origin[1]) // cell_size) + 1) if len(triangles) else (1, 1)
+
+    # each triangle is listed in every cell its bounding box overlaps
+    owner, ii, jj = _expand_cell_ranges(((tx.min(axis=1) - origin[0]) // cell_size).astype(np.int64),
+                                        ((tx.max(axis=1) - origin[0]) // cell_size).astype(np.int64),
+                                        ((ty.min(axis=1) - origin[1]) // cell_size).astype(np.int64),
+                                        ((ty.max(axis=1) - origin[1]) // cell_size).astype(np.int64))
+    cells = ii * shape[1] + jj
+    order = np.argsort(cells, kind="stable")
+    cell_start = np.concatenate(([0], np.cumsum(np.bincount(cells, minlength=shape[0] * shape[1]))))
+    return {"x": x, "y": y, "triangles": np.asarray(triangles), "origin": origin, "cell_size": cell_size, "shape": shape,
+            "cell_triangles": owner[order], "cell_start": cell_start}
+
+
+def locate_points(locator:dict, px, py) -> tuple:
+    """
+    Finds the triangle containing each point and the barycentric weights of the point in it.
+    Args:
+        locator (dict): The locator returned by build_triangle_locator.
+        px (ndarray): The x coordinates of the points.
+        py (ndarray): The y coordinates of the points.
+    Returns:
+        tuple: The containing triangle of each point, -1 for points outside the mesh, and a (points x 3) array of the
+            weights of the triangle's nodes. The weights of points outside the mesh are NaN.
+    """
+    px = np.asarray(px, dtype=np.float64)
+    py = np.asarray(py, dtype=np.float64)
+    (columns, rows), size, origin = locator["shape"], locator["cell_size"], locator["origin"]
+    i = np.floor((px - origin[0]) / size)
+    j = np.floor((py - origin[1]) / size)
+    in_grid = (i >= 0) & (i < columns) & (j >= 0) & (j < rows)
+    cells = np.where(in_grid, i * rows + j, 0).astype(np.int64)
+    first = np.where(in_grid, locator["cell_start"][cells], 0)
+    counts = np.where(in_grid, locator["cell_start"][cells + 1] - first, 0)
+
+    # test every (point, candidate triangle) pair of the point's cell and keep the first triangle containing the point
+    pair_point = np.repeat(np.arange(len(px)), counts)
+    offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    pair_triangle = locator["cell_triangles"][first[pair_point] + offset]
+    corners = locator["triangles"][pair_triangle]
+    x, y = locator["x"], locator["y"]
+    wa, wb, wc = barycentric_weights(px[pair_point], py[pair_point],
+                                     x[corners[:, 0]], y[corners[:, 0]], x[corners[:, 1]], y[corners[:, 1]],
+                                     x[corners[:, 2]], y[corners[:, 2]])
+    inside = np.flatnonzero((wa >= -1e-9) & (wb >= -1e-9) & (wc >= -1e-9))
+    found, first_inside = np.unique(pair_point[inside], return_index=True)
+    pairs = inside[first_inside]
+
+    triangle = np.full(len(px), -1, dtype=np.int64)
+    weights = np.full((len(px), 3), np.nan)
+    triangle[found] = pair_triangle[pairs]
+    weights[found] = np.column_stack([wa[pairs], wb[pairs], wc[pairs]])
+    return triangle, weights
+
+
+def triangles_in_window(x, y, triangles, window) -> np.ndarray:
+    """
+    Finds the triangles whose bounding box overlaps a rectangular window.
+    Args:
+        x (ndarray): The x coordinates of the mesh nodes.
+        y (ndarray): The y coordinates of the mesh nodes.
+        triangles (ndarray): The (triangles x 3) node index array returned by triangulate_elements.
+        window (tuple): The (xmin, ymin, xmax, ymax) extent of the window.
+    Returns:
+        ndarray: The triangles overlapping the window.
+    """
+    xmin, ymin, xmax, ymax = window
+    tx = x[triangles]
+    ty = y[triangles]
+    overlap = ((tx.max(axis=1) >= xmin) & (tx.min(axis=1) <= xmax) &
+               (ty.max(axis=1) >= ymin) & (ty.min(axis=1) <= ymax))
+    return triangles[overlap]
+
+
+def rasterize_node_values(x, y, triangles, values, origin, cell_size:float, shape) -> np.ndarray:
+    """
+    Linearly interpolates node values onto the cell centers of a regular grid using the mesh triangles.
+    Args:
+        x (ndarray): The x coordinates of the mesh nodes.
+        y (ndarray): The y coordinates of the mesh nodes.
+        triangles (ndarray): The (triangles x 3) node index array returned by triangulate_elements.
+        values (ndarray): The value at each mesh node.
+        origin (tuple): The (x, y) coordinates of the lower left corner of the grid.
+        cell_size (float): The width and height of each grid cell.
+        shape (tuple): The (rows, columns) of the grid.
+    Returns:
+        ndarray: A float32 grid of the interpolated values, with row 0 at the bottom of the grid.
+            Cells outside the mesh are NaN.
+    """
+    rows, columns = shape
+    grid = np.full(shape, np.nan, dtype=np.float32)
+    if len(triangles) == 0:
+        return grid
+
+    tx = x[triangles]
+    ty = y[triangles]
+    # range of grid cell centers covered by the bounding box of each triangle
+    i0 = np.maximum(np.ceil((tx.min(axis=1) - origin[0]) / cell_size - 0.5), 0).astype(np.int64)
+    i1 = np.minimum(np.floor((tx.max(axis=1) - origin[0]) / cell_size - 0.5), columns - 1).astype(np.int64)
+    j0 = np.maximum(np.ceil((ty.min(axis=1) - origin[1]) / cell_size - 0.5), 0).astype(np.int64)
+    j1 = np.minimum(np.floor((ty.max(axis=1) - origin[1]) / cell_size - 0.5), rows - 1).astype(np.int64)
+    widths = np.maximum(i1 - i0 + 1, 0)
+    counts = widths * np.maximum(j1 - j0 + 1, 0)
+
+    # process the triangles in batches so the number of candidate cells per batch is bounded
+    cumulative = np.cumsum(counts)
+    start = 0
+    while start < len(triangles):
+        limit = (cumulative[start - 1] if start > 0 else 0) + MAX_RASTER_PAIRS
+        stop = max(start + 1, int(np.searchsorted(cumulative, limit, side="right")))
+        batch = np.arange(start, stop)
+        batch_counts = counts[batch]
+        total = int(batch_counts.sum())
+        if total > 0:
+            pair_triangle = np.repeat(batch, batch_counts)
+            offset = np.arange(total) - np.repeat(np.cumsum(batch_counts) - batch_counts, batch_counts)
+            ii = i0[pair_triangle] + offset % widths[pair_triangle]
+            jj = j0[pair_triangle] + offset // widths[pair_triangle]
+            px = origin[0] + (ii + 0.5) * cell_size
+            py = origin[1] + (jj + 0.5) * cell_size
+            wa, wb, wc = barycentric_weights(px, py,
+                                             tx[pair_triangle, 0], ty[pair_triangle, 0],
+                                             tx[pair_triangle, 1], ty[pair_triangle, 1],
+                                             tx[pair_triangle, 2], ty[pair_triangle, 2])
+            inside = (wa >= -1e-9) & (wb >= -1e-9) & (wc >= -1e-9)
+            node_values = values[triangles[pair_triangle[inside]]]
+            grid[jj[inside], ii[inside]] = (wa[inside] * node_values[:, 0] +
+                                            wb[inside] * node_values[:, 1] +
+                                            wc[inside] * node_values[:, 2])
+        start = stop
+    return grid
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import numpy as np
+
+from .read_srh_results import extract_interpolated_peaks
+from .mesh_utils import triangulate_elements, build_triangle_locator, locate_points
+from ..startup_utils.lazy_import import lazy_import
+
+
+pd = lazy_import("pandas")
+
+
+def pier_sample_points(pier_data, arc_node_mapping, spacing:float, offsets) -> pd.DataFrame:
+    """
+    Places sample points along each pier arc and along lines offset to either side of it.
+    Each arcType 5 pier arc is the straight line between its two end nodes.
+    Args:
+        pier_data (DataFrame): DataFrame with the pier node coordinates returned by read_map_file.
+        arc_node_mapping (DataFrame): DataFrame mapping pier nodes to arc IDs returned by read_map_file.
+        spacing (float): Distance in feet between the points along each line.
+        offsets (list): Distances in feet of the offset lines from the arc. Lines are placed on both sides of the arc,
+            and the arc itself is always sampled.
+    Returns:
+        DataFrame: One row per point with columns ['Pier Arc ID', 'Offset', 'Station', 'x', 'y']. The station is the
+            distance along the arc from its first node and the offset is positive to the left of the arc.
+    """
+    arcs = pier_data.merge(arc_node_mapping.drop_duplicates("Node"), left_on="Pier Node", right_on="Node")
+    offsets = np.unique(np.concatenate([[0.0], np.abs(np.asarray(offsets, dtype=np.float64)), -np.abs(np.asarray(offsets, dtype=np.float64))]))
+    samples = []
+    for arc_id, arc in arcs.groupby("arcID", sort=False):
+        if len(arc) < 2:
+            continue
+        start = arc[["lat", "long"]].to_numpy()[0]
+        end = arc[["lat", "long"]].to_numpy()[-1]
+        length = np.hypot(*(end - start))
+        if length == 0:
+            continue
+        direction = (end - start) / length
+        normal = np.array([-direction[1], direction[0]])
+        stations = np.linspace(0.0, length, max(int(np.ceil(length / spacing)), 1) + 1)
+        station, offset = (grid.ravel() for grid in np.meshgrid(stations, offsets))
+        points = start + station[:, None] * direction + offset[:, None] * normal
+        samples.append(pd.DataFrame({"Pier Arc ID": arc_id, "Offset": offset, "Station": station,
+                                     "x": points[:, 0], "y": points[:, 1]}))
+    if not samples:
+        return pd.DataFrame(columns=["Pier Arc ID", "Offset", "Station", "x", "y"])
+    return pd.concat(samples, ignore_index=True)
+
+
+def sample_pier_faces(pier_data, arc_node_mapping, model_nodes, elements, depth_file:str, depth_file_name:str,
+                      velocity_file:str, spacing:float = 1.0, offsets = (5.0, 10.0), locator:dict = None) -> pd.DataFrame:
+    """
+    Interpolates the peak depth and velocity at points along and offset from each pier arc, so the result does not
+    depend on where the mesh nodes happen to be around the pier.
+    The mesh element containing each point is found with a triangle locator and the barycentric weights of the points
+    are calculated once and applied to every timestep of the result files.
+    Args:
+        pier_data (DataFrame): DataFrame with the pier node coordinates returned by read_map_file.
+        arc_node_mapping (DataFrame): DataFrame mapping pier nodes to arc IDs returned by read_map_file.
+        model_nodes (DataFrame): DataFrame with the model node coordinates returned by read_geom_file.
+        elements (ndarray): The (elements x 4) node id array returned by read_geom_elements.
+        depth_file (str): Path to the HDF5 file containing water depth data.
+        depth_file_name (str): Name of the depth file, used to find the result group in both files.
+        velocity_file (str): Path to the HDF5 file containing velocity magnitude data.
+        spacing (float): Distance in feet between the points along each line.
+        offsets (list): Distances in feet of the offset lines on either side of each arc.
+        locator (dict): The locator returned by build_triangle_locator for the mesh. It is built from elements if None.
+    Returns:
+        DataFrame: The points returned by pier_sample_points with the 'Element' triangle containing each point,
+            and the interpolated 'Depth', 'Velocity' and 'DxV'. Points outside the mesh have an element of -1 and NaN
+            results, and DxV is NaN where the point is dry.
+    """
+    samples = pier_sample_points(pier_data, arc_node_mapping, spacing, offsets)
+    if locator is None:
+        locator = build_triangle_locator(model_nodes["lat"].to_numpy(), model_nodes["long"].to_numpy(), triangulate_elements(elements))
+    triangle, weights = locate_points(locator, samples["x"].to_numpy(), samples["y"].to_numpy())
+    node_index = locator["triangles"][np.maximum(triangle, 0)]
+
+    depth, velocity = extract_interpolated_peaks(depth_file, depth_file_name, velocity_file, node_index, weights)
+    if depth is None or velocity is None:
+        raise ValueError(f"No depth or velocity results found for {depth_file_name}.")
+    samples["Element"] = triangle
+    samples["Depth"] = np.round(depth, 4)
+    samples["Velocity"] = np.round(velocity, 4)
+    samples["DxV"] = np.where((depth > 0) & (velocity > 0), np.round(depth * velocity, 2), np.nan)
+    return samples
+
+
+def pier_face_maxima(samples) -> pd.DataFrame:
+    """
+    Picks the sample point with the maximum DxV of each pier arc.
+    Args:
+        samples (DataFrame): The DataFrame returned by sample_pier_faces.
+    Returns:
+        DataFrame: One row per pier arc with a wet sample point, in the order of the arcs.
+    """
+    wet = samples.dropna(subset=["DxV"])
+    return wet.loc[wet.groupby("Pier Arc ID", sort=False)["DxV"].idxmax()].reset_index(drop=True)
@@ -1,8 +1,21 @@
-import h5py
 import csv
-import pandas as pd
-import streamlit as st
+import numpy as np
 
+from ..startup_utils.lazy_import import lazy_import
+
+
+# h5py, pandas and streamlit are only imported when results are first read, so worker processes start quickly
+h5py = lazy_import("h5py")
+pd = lazy_import("pandas")
+st = lazy_import("streamlit")
+
+
+# Upper limit on the size of each block of timesteps read from the HDF5 files. The peak values are
+# reduced one block at a time so memory use does not depend on the number of timesteps.
+CHUNK_BYTES = 64 * 1024 * 1024
+
+# Most unrequested node columns read between two requested columns rather than starting a separate read
+MAX_COLUMN_GAP = 256
 
 
 def write_csv(data, filename):
@@ -12,8 +25,156 @@ def write_csv(data, filename):
         for key, value in data.items():
             writer.writerow([key, value])
 
+def get_values_dataset(h5_file, file_name:str, dataset_name:str):
+    """
+    Finds the 'Values' dataset of an SRH-2D result in an open HDF5 file.
+    The result group is named after one of the underscore separated parts of the result file name,
+    e.g. the '100yr' in '100yr_Water_Depth_ft.h5'.
+    Args:
+        h5_file (h5py.File): The open HDF5 file.
+        file_name (str): Name of the result file used to find the result group.
+        dataset_name (str): Name of the result dataset, e.g. 'Water_Depth_ft' or 'Vel_Mag_ft_p_s'.
+    Returns:
+        h5py.Dataset: The (timesteps x nodes) values dataset, or None if it could not be found.
+    """
+    a_group_key = list(h5_file.keys())[0]
+    for file_reference in file_name.split("_")[:4]:
+        try:
+            return h5_file[a_group_key][file_reference][dataset_name]['Values']
+        except (KeyError, ValueError):
+            pass
+    return None
+
+def column_runs(columns, max_gap:int = MAX_COLUMN_GAP) -> tuple:
+    """
+    Groups column indices into runs of nearby columns, so each run is read as one contiguous slice.
+    Args:
+        columns (array): Zero based column indices, in any order and possibly repeated.
+        max_gap (int): Most unrequested columns between two requested columns of the same run.
+    Returns:
+        tuple: The (start, stop) of each run in column order, and the position of each requested column
+            in the runs placed end to end.
+    """
+    columns = np.asarray(columns, dtype=np.int64)
+    unique = np.unique(columns)
+    breaks = np.flatnonzero(np.diff(unique) > max_gap + 1) + 1
+    starts = unique[np.concatenate(([0], breaks))]
+    stops = unique[np.concatenate((breaks - 1, [len(unique) - 1]))] + 1
+    offsets = np.concatenate(([0], np.cumsum(stops - starts)[:-1]))
+    run = np.searchsorted(starts, columns, side='right') - 1
+    return list(zip(starts.tolist(), stops.tolist())), offsets[run] + columns - starts[run]
+
+def peak_values(values, columns=None, chunk_bytes:int = CHUNK_BYTES) -> np.ndarray:
+    """
+    Calculates the maximum value over all timesteps for each node of a values dataset.
+    Args:
+        values (h5py.Dataset or ndarray): The (timesteps x nodes) values dataset.
+        columns (array): Zero based column indices of the nodes to reduce. All nodes are reduced if None.
+        chunk_bytes (int): Approximate size in bytes of each block of timesteps read from the dataset.
+    Returns:
+        ndarray: The maximum value for each requested node.
+    """
+    n_steps, n_nodes = values.shape
+    if columns is None:
+        runs, selection = [(0, n_nodes)], None
+    else:
+        if len(columns) == 0:
+            return np.empty(0, dtype=values.dtype)
+        # nearby columns are read as contiguous slices, which is much faster than an h5py point selection,
+        # and columns far apart are read as separate slices so the columns between them are not read
+        runs, selection = column_runs(columns)
+    width = sum(stop - start for start, stop in runs)
+    rows = max(1, chunk_bytes // max(1, width * values.dtype.itemsize))
+
+    peak = None
+    for row in range(0, n_steps, rows):
+        block_peak = np.concatenate([values[row:row + rows, start:stop].max(axis=0) for start, stop in runs])
+        if peak is None:
+            peak = block_peak
+        else:
+            np.maximum(peak, block_peak, out=peak)
+    return peak if selection is None else peak[selection]
+
+def extract_peak_fields(depth_file:str, depth_file_name:str, velocity_file:str, nodes=None) -> tuple:
+    """
+    Extracts the peak water depth and velocity magnitude at each node from the HDF5 result files.
+    Args:
+        depth_file (str): Path to the HDF5 file containing water depth data.
+        depth_file_name (str): Name of the depth file, used to find the result group in both files.
+        velocity_file (str): Path to the HDF5 file containing velocity magnitude data.
+        nodes (list): Node ids (one based) to extract. All nodes in the mesh are extracted if None.
+    Returns:
+        tuple: Two arrays with the peak depth and peak velocity of each node, or None for a result
+            that could not be found in its file.
+    """
+    columns = None if nodes is None else np.asarray(nodes, dtype=np.int64) - 1
+    peaks = []
+    for result_file, dataset_name in [(depth_file, 'Water_Depth_ft'), (velocity_file, 'Vel_Mag_ft_p_s')]:
+        with h5py.File(result_file, 'r') as file:
+            values = get_values_dataset(file, depth_file_name, dataset_name)
+            peaks.append(None if values is None else peak_values(values, columns))
+    return peaks[0], peaks[1]
+
+def interpolated_peak_values(values, node_index, weights, chunk_bytes:int = CHUNK_BYTES) -> np.ndarray:
+    """
+    Interpolates a values dataset to points at every timestep and calculates the maximum over all timesteps at each point.
+    The weights are applied to a block of timesteps at a time in a single vectorized pass.
+    Args:
+        values (h5py.Dataset or ndarray): The (timesteps x nodes) values dataset.
+        node_index (ndarray): (points x 3) zero based column indices of the nodes each point is interpolated from.
+        weights (ndarray): (points x 3) weights of the nodes, NaN for points that can not be interpolated.
+        chunk_bytes (int): Approximate size in bytes of each block of timesteps read from the dataset.
+    Returns:
+        ndarray: The maximum interpolated value at each point, NaN where the weights are NaN.
+    """
+    node_index = np.asarray(node_index, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+    valid = np.isfinite(weights).all(axis=1)
+    peak = np.full(len(weights), np.nan)
+    if not valid.any():
+        return peak
+
+    # read only the runs of columns around the nodes, as peak_values does
+    runs, local_index = column_runs(node_index[valid])
+    point_weights = weights[valid]
+    n_steps = values.shape[0]
+    width = sum(stop - start for start, stop in runs)
+    # the block is bounded by the larger of the columns read and the (points x 3) values gathered from them
+    rows = max(1, chunk_bytes // (8 * max(width, 3 * len(point_weights))))
+
+    valid_peak = None
+    for row in range(0, n_steps, rows):
+        block = np.concatenate([np.asarray(values[row:row + rows, start:stop], dtype=np.float64) for start, stop in runs], axis=1)
+        block_peak = np.einsum("tpk,pk->tp", block[:, local_index], point_weights).max(axis=0)
+        if valid_peak is None:
+            valid_peak = block_peak
+        else:
+            np.maximum(valid_peak, block_peak, out=valid_peak)
+    peak[valid] = valid_peak
+    return peak
+
+def extract_interpolated_peaks(depth_file:str, depth_file_name:str, velocity_file:str, node_index, weights) -> tuple:
+    """
+    Extracts the peak water depth and velocity magnitude at points inside the mesh from the HDF5 result files.
+    Args:
+        depth_file (str): Path to the HDF5 file containing water depth data.
+        depth_file_name (str): Name of the depth file, used to find the result group in both files.
+        velocity_file (str): Path to the HDF5 file containing velocity magnitude data.
+        node_index (ndarray): (points x 3) zero based indices of the nodes each point is interpolated from.
+        weights (ndarray): (points x 3) barycentric weights of the nodes, NaN for points outside the mesh.
+    Returns:
+        tuple: Two arrays with the peak interpolated depth and velocity at each point, or None for a result
+            that could not be found in its file.
+    """
+    peaks = []
+    for result_file, dataset_name in [(depth_file, 'Water_Depth_ft'), (velocity_file, 'Vel_Mag_ft_p_s')]:
+        with h5py.File(result_file, 'r') as file:
+            values = get_values_dataset(file, depth_file_name, dataset_name)
+            peaks.append(None if values is None else interpolated_peak_values(values, node_index, weights))
+    return peaks[0], peaks[1]
+
 def extract_data(depth_file:str,depth_file_name,velocity_file: str, nodes: list) -> tuple:
-    
+
     """
     Extracts and processes depth and velocity data from HDF5 files for specified nodes.
 
@@ -23,53 +184,21 @@ def extract_data(depth_file:str,depth_file_name,velocity_file: str, nodes: list)
         nodes (list): List of node indices for which data is to be extracted.
     Returns:
         tuple: A tuple containing two pandas DataFrames:
-            - depth_data_dict (pd.DataFrame): DataFrame with columns "Node" and "Depth", 
+            - depth_data_dict (pd.DataFrame): DataFrame with columns "Node" and "Depth",
                 where "Depth" is the maximum water depth for each node.
-            - velocity_data_dict (pd.DataFrame): DataFrame with columns "Node" and "Velocity", 
+            - velocity_data_dict (pd.DataFrame): DataFrame with columns "Node" and "Velocity",
                 where "Velocity" is the maximum velocity magnitude for each node.
     """
 
-    depth_data_dict = []
-    velocity_data_dict = []
-    for index in range(4):
-        try:
-            file_reference = depth_file_name.split("_")[index]
-            with h5py.File(depth_file, 'r') as file:
-                a_group_key = list(file.keys())[0]
-                # Getting the data  [0]
-                data = list(file[a_group_key][file_reference]['Water_Depth_ft']['Values'])
-                for j in nodes:
-                    depth_array = []
-                    for i in range(len(data)):
-                        depth_array.append(float(data[i][int(j)-1]))
-                    depth_data_dict.append([j,max(depth_array)])
-                depth_data_dict = pd.DataFrame(depth_data_dict,columns = ["Node","Depth"])
-        except Exception as e:
-            pass
-        
-        
-    for index in range(4):
-        try:
-            file_reference = depth_file_name.split("_")[index]
-            with h5py.File(velocity_file, 'r') as file:
-                a_group_key = list(file.keys())[0]
-                
-                # Getting the data  [0]
-                data = list(file[a_group_key][file_reference]['Vel_Mag_ft_p_s']['Values'])
-            
-                for j in nodes:
-                    velocity_array = []
-                    for i in range(len(data)):
-                        velocity_array.append(float(data[i][int(j)-1]))
-                    
-                    velocity_data_dict.append([j,max(velocity_array)])
-                velocity_data_dict = pd.DataFrame(velocity_data_dict,columns = ["Node","Velocity"])
-        except Exception as e:
-            pass
+    depth_data_dict = pd.DataFrame(columns = ["Node","Depth"])
+    velocity_data_dict = pd.DataFrame(columns = ["Node","Velocity"])
+    if len(nodes) == 0:
+        return depth_data_dict, velocity_data_dict
 
+    depth, velocity = extract_peak_fields(depth_file, depth_file_name, velocity_file, [int(j) for j in nodes])
+    if depth is not None:
+        depth_data_dict = pd.DataFrame({"Node": list(nodes), "Depth": depth.astype(np.float64)})
+    if velocity is not None:
+        velocity_data_dict = pd.DataFrame({"Node": list(nodes), "Velocity": velocity.astype(np.float64)})
 
     return depth_data_dict, velocity_data_dict
-
-
-
-
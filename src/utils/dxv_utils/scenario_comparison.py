@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import os
+import re
+
+import numpy as np
+
+from .read_srh_results import extract_peak_fields
+from .mesh_utils import build_node_grid, grid_nodes_within_radius
+from ..startup_utils.lazy_import import lazy_import
+
+
+pd = lazy_import("pandas")
+
+# Parts of the SRH-2D result file names that tell the depth and velocity files of a scenario apart
+DEPTH_FILE_TAG = "Water_Depth"
+VELOCITY_FILE_TAG = "Vel_Mag"
+
+
+def pair_scenario_files(result_files) -> tuple:
+    """
+    Pairs the depth and velocity result files of each scenario by the part of the file name before the result name,
+    e.g. '100yr_Water_Depth_ft.h5' and '100yr_Vel_Mag_ft_p_s.h5' are the '100yr' scenario.
+    Args:
+        result_files (list): Uploaded files or paths to the result files.
+    Returns:
+        tuple: Dict of scenario name to its (depth file, depth file name, velocity file), in the order the depth
+            files were given, and a list of the names of files that could not be paired.
+    """
+    depth_files = {}
+    velocity_files = {}
+    unpaired = []
+    for result_file in result_files:
+        name = result_file if isinstance(result_file, str) else result_file.name
+        name = os.path.basename(name)
+        match = re.match(rf"(.*?)_?({DEPTH_FILE_TAG}|{VELOCITY_FILE_TAG})", name)
+        if match is None:
+            unpaired.append(name)
+            continue
+        files = depth_files if match.group(2) == DEPTH_FILE_TAG else velocity_files
+        files[match.group(1) or name] = (result_file, name)
+
+    scenarios = {}
+    for scenario, (depth_file, depth_file_name) in depth_files.items():
+        if scenario in velocity_files:
+            scenarios[scenario] = (depth_file, depth_file_name, velocity_files[scenario][0])
+        else:
+            unpaired.append(depth_file_name)
+    unpaired += [name for scenario, (_, name) in velocity_files.items() if scenario not in depth_files]
+    return scenarios, unpaired
+
+
+def resolve_pier_nodes(pier_data, model_nodes, search_radius:float) -> list:
+    """
+    Finds the model nodes within the search radius of each pier node once, so every scenario reuses the same search.
+    Args:
+        pier_data (DataFrame): DataFrame with the pier node coordinates returned by read_map_file.
+        model_nodes (DataFrame): DataFrame with the model node coordinates returned by read_geom_file.
+        search_radius (float): max distance from the pier centerline nodes to search for max DxV.
+    Returns:
+        list: The node ids within the search radius of each pier node, in mesh order.
+    """
+    x = model_nodes["lat"].to_numpy(dtype=np.float64)
+    y = model_nodes["long"].to_numpy(dtype=np.float64)
+    # cells of at least about four nodes each, so a small search radius over a large mesh does not allocate a cell
+    # for every search radius square of its bounding box
+    extent = max((x.max() - x.min()) * (y.max() - y.min()), 1.0) if len(x) else 1.0
+    cell_size = max(search_radius, np.sqrt(4 * extent / max(len(x), 1)), 1e-6)
+    grid = build_node_grid(x, y, cell_size)
+    node_ids = model_nodes["Node"].to_numpy()
+    return [node_ids[grid_nodes_within_radius(grid, x, y, search_radius)[0]]
+            for x, y in zip(pier_data["lat"].to_numpy(), pier_data["long"].to_numpy())]
+
+
+def compare_scenarios(scenarios:dict, pier_data, model_nodes, arc_node_mapping, search_radius:float = 8) -> pd.DataFrame:
+    """
+    Finds the maximum DxV at each pier node for several scenarios on the same mesh.
+    The pier search is resolved once and only the result columns of the nodes within reach of a pier are read from
+    each scenario. The scenarios are read one after another, as h5py holds a global lock for every read and reading
+    them from several threads is no faster. The maximum of each pier node is picked as in find_mesh_points.
+    Args:
+        scenarios (dict): Scenario name to its (depth file, depth file name, velocity file), as returned by pair_scenario_files.
+        pier_data (DataFrame): DataFrame with the pier node coordinates returned by read_map_file.
+        model_nodes (DataFrame): DataFrame with the model node coordinates returned by read_geom_file.
+        arc_node_mapping (DataFrame): DataFrame mapping pier nodes to arc IDs returned by read_map_file.
+        search_radius (float): max distance from the pier centerline nodes to search for max DxV.
+    Returns:
+        DataFrame: One row per scenario and pier node with the columns returned by find_mesh_points and 'Scenario'.
+            Pier nodes without a wet node within the search radius are left out.
+    """
+    pier_nodes = resolve_pier_nodes(pier_data, model_nodes, search_radius)
+    all_nodes = np.unique(np.concatenate(pier_nodes)) if pier_nodes else np.empty(0, dtype=np.int64)
+    positions = [np.searchsorted(all_nodes, node_ids) for node_ids in pier_nodes]
+    arc_ids = arc_node_mapping.drop_duplicates("Node").set_index("Node")["arcID"]
+
+    rows = []
+    for scenario, (depth_file, depth_file_name, velocity_file) in scenarios.items():
+        if len(all_nodes) == 0:
+            continue
+        depth, velocity = extract_peak_fields(depth_file, depth_file_name, velocity_file, all_nodes)
+        if depth is None or velocity is None:
+            continue
+        for pier_node, node_ids, position in zip(pier_data["Pier Node"], pier_nodes, positions):
+            pier_depth = depth[position].astype(np.float64)
+            pier_velocity = velocity[position].astype(np.float64)
+            dxv = np.where((pier_depth > 0) & (pier_velocity > 0), np.round(pier_depth * pier_velocity, 2), -np.inf)
+            if not np.isfinite(dxv).any():
+                continue
+            best = int(np.argmax(dxv))
+            rows.append([scenario, arc_ids[pier_node], pier_node, node_ids[best], dxv[best],
+                         np.round(pier_depth[best], 4), np.round(pier_velocity[best], 4)])
+    return pd.DataFrame(rows, columns=["Scenario", "Pier Arc ID", "Pier Node", "Model Node", "DxV", "Depth", "Velocity"])
+
+
+def dxv_matrix(scenario_results) -> pd.DataFrame:
+    """
+    Arranges the results of compare_scenarios as a scenario x pier matrix.
+    Args:
+        scenario_results (DataFrame): The DataFrame returned by compare_scenarios.
+    Returns:
+        DataFrame: The maximum DxV of each pier, the larger of its two arc end nodes, with one row per scenario
+            and one column per Pier Arc ID, in the order they were found.
+    """
+    matrix = scenario_results.pivot_table(index="Scenario", columns="Pier Arc ID", values="DxV", aggfunc="max", sort=False)
+    return matrix.reindex(columns=scenario_results["Pier Arc ID"].unique())
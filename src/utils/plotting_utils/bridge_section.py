@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from ..startup_utils.lazy_import import lazy_import
+
+
+pd = lazy_import("pandas")
+
+
+# Pier geometry columns of scour_data.csv and the BridgeSection attribute each one is stored in
+PIER_COLUMNS = {
+    'Bridge Thickness': 'bridge_thickness',
+    'Pier Stem Top Width': 'stem_top_width',
+    'Pier Stem Bottom Width': 'stem_bottom_width',
+    'Footing Cap Width': 'footing_cap_width',
+    'Footing Width': 'footing_width',
+    'Footing Cap Height': 'footing_cap_height',
+    'Footing Height': 'footing_height',
+    'Bent CL Sta': 'bent_cl_sta',
+    'Bottom of Footing Elev': 'bottom_of_footing_elev',
+    'Low Chord Elev': 'low_chord_elev',
+    'High Chord Elev': 'high_chord_elev',
+}
+
+# Columns that hold one value per recurrence interval, looked up with the flags returned by recurrence_txt
+LOCAL_SCOUR_COLUMNS = ['Local Scour Depth (100-yr)', 'Local Scour Depth (500-yr)']
+CS_LTD_COLUMNS = ['CS + LTD Depth (100-yr)', 'CS + LTD Depth (500-yr)']
+ABUT_SCOUR_COLUMNS = ['abut scour 100', 'abut scour 500']
+WSE_COLUMNS = ['WSE 100yr', 'WSE 500yr']
+
+# Bridge parameters read from the first row of the file
+SCALAR_COLUMNS = ['Long Term Deg', 'Abt Toe Left Sta.', 'Abt Toe Right Sta.'] + ABUT_SCOUR_COLUMNS + WSE_COLUMNS
+
+NUMERIC_COLUMNS = (list(PIER_COLUMNS) + LOCAL_SCOUR_COLUMNS + CS_LTD_COLUMNS + SCALAR_COLUMNS +
+                   ['Scour Datum Elev.', 'Channel Bank Sta.', 'Offset Station', 'Elev'])
+REQUIRED_COLUMNS = ['Bent ID'] + NUMERIC_COLUMNS + ['Laterally Stable Channel?']
+
+
+class BridgeDataError(ValueError):
+    """
+    Raised when scour_data.csv is missing columns or values needed to build the bridge section.
+    """
+
+
+@dataclass(slots=True, frozen=True, eq=False)
+class BridgeSection:
+    """
+    The bridge, pier and ground line data of a scour_data.csv file.
+    Pier attributes are arrays with one entry per bent, in the order of bent_ids. The first and last bents are the abutments.
+    Recurrence dependent values are dictionaries keyed by the scour_data.csv column they were read from,
+    so they can be looked up with the flags returned by recurrence_txt.
+    """
+    bent_ids: tuple
+    bridge_thickness: np.ndarray
+    stem_top_width: np.ndarray
+    stem_bottom_width: np.ndarray
+    footing_cap_width: np.ndarray
+    footing_width: np.ndarray
+    footing_cap_height: np.ndarray
+    footing_height: np.ndarray
+    bent_cl_sta: np.ndarray
+    bottom_of_footing_elev: np.ndarray
+    low_chord_elev: np.ndarray
+    high_chord_elev: np.ndarray
+    local_scour_depth: dict
+    low_chord: np.ndarray
+    high_chord: np.ndarray
+    ground_station: np.ndarray
+    ground_elev: np.ndarray
+    cs_ltd_depth: dict
+    scour_datum_elev: float
+    bank_stations: tuple
+    laterally_stable: bool
+    long_term_deg: float
+    abut_scour_elev: dict
+    abut_toe_left_sta: float
+    abut_toe_right_sta: float
+    wse: dict
+
+    def pier_table(self) -> pd.DataFrame:
+        """
+        Returns the pier data as a table with one row per bent, indexed by Bent ID.
+        """
+        table = {column: getattr(self, attribute) for column, attribute in PIER_COLUMNS.items()}
+        table.update(self.local_scour_depth)
+        return pd.DataFrame(table, index=pd.Index(self.bent_ids, name='Bent ID'))
+
+
+def _first_value(bridge_data:pd.DataFrame, column:str, errors:list, row:int = 0):
+    """
+    Returns the value of a column in a row of the bridge data, recording an error if it is blank.
+    """
+    if len(bridge_data) <= row or pd.isna(bridge_data[column].iloc[row]):
+        errors.append(f"'{column}' has no value in row {row + 1}.")
+        return np.nan
+    return bridge_data[column].iloc[row]
+
+
+def parse_bridge_section(bridge_data:pd.DataFrame) -> BridgeSection:
+    """
+    Validates the scour data read from scour_data.csv and builds the bridge section from it.
+    Args:
+        bridge_data (DataFrame): DataFrame containing the contents of scour_data.csv.
+    Returns:
+        BridgeSection: The pier geometry, bridge parameters and ground line of the bridge, with the ground line
+            sorted by station.
+    Raises:
+        BridgeDataError: If columns are missing, numeric columns hold text, or required values are blank.
+            The message lists every problem found.
+    """
+    missing = [column for column in REQUIRED_COLUMNS if column not in bridge_data.columns]
+    if missing:
+        raise BridgeDataError(f"scour_data.csv is missing the columns: {', '.join(missing)}.")
+
+    errors = []
+    numeric = {}
+    for column in NUMERIC_COLUMNS:
+        values = pd.to_numeric(bridge_data[column], errors='coerce')
+        invalid = np.flatnonzero(values.isna().to_numpy() & bridge_data[column].notna().to_numpy())
+        if len(invalid):
+            errors.append(f"'{column}' has a non numeric value '{bridge_data[column].iloc[invalid[0]]}' in row {invalid[0] + 1}.")
+        numeric[column] = values.to_numpy(dtype=float)
+    numeric_data = pd.DataFrame(numeric)
+
+    # Bents are the rows with every pier column filled in
+    pier_columns = list(PIER_COLUMNS) + LOCAL_SCOUR_COLUMNS
+    is_pier = bridge_data['Bent ID'].notna().to_numpy() & np.isfinite(numeric_data[pier_columns].to_numpy()).all(axis=1)
+    if not is_pier.any():
+        errors.append("No bent has all of the pier columns filled in.")
+
+    # The scour datum and contraction scour come from the first bent with all of them filled in
+    scour_rows = np.flatnonzero(bridge_data['Bent ID'].notna().to_numpy() &
+                                np.isfinite(numeric_data[CS_LTD_COLUMNS + ['Scour Datum Elev.']].to_numpy()).all(axis=1))
+    if len(scour_rows) == 0:
+        errors.append(f"No bent has all of {', '.join(CS_LTD_COLUMNS + ['Scour Datum Elev.'])} filled in.")
+        scour_row = 0
+    else:
+        scour_row = scour_rows[0]
+
+    scalars = {column: _first_value(numeric_data, column, errors) for column in SCALAR_COLUMNS}
+    bank_stations = (_first_value(numeric_data, 'Channel Bank Sta.', errors, 0),
+                     _first_value(numeric_data, 'Channel Bank Sta.', errors, 1))
+
+    has_station = np.isfinite(numeric_data['Offset Station'].to_numpy())
+    if has_station.sum() < 2:
+        errors.append("The ground line needs at least two 'Offset Station' values.")
+
+    if errors:
+        raise BridgeDataError("scour_data.csv has invalid data:\n" + "\n".join(errors))
+
+    def chord(column):
+        points = numeric_data[['Bent CL Sta', column]].to_numpy()
+        return points[np.isfinite(points).all(axis=1)]
+
+    piers = {attribute: numeric_data[column].to_numpy()[is_pier] for column, attribute in PIER_COLUMNS.items()}
+    # the scour calculations look up the ground line by station with binary searches, so its points are put in
+    # station order. The sort is stable, so points sharing a station, e.g. a vertical wall, keep their order.
+    ground_station = numeric_data['Offset Station'].to_numpy()[has_station]
+    ground_order = np.argsort(ground_station, kind='stable')
+    return BridgeSection(bent_ids=tuple(bridge_data['Bent ID'][is_pier].tolist()),
+                         local_scour_depth={column: numeric_data[column].to_numpy()[is_pier] for column in LOCAL_SCOUR_COLUMNS},
+                         low_chord=chord('Low Chord Elev'),
+                         high_chord=chord('High Chord Elev'),
+                         ground_station=ground_station[ground_order],
+                         ground_elev=numeric_data['Elev'].to_numpy()[has_station][ground_order],
+                         cs_ltd_depth={column: float(numeric_data[column].iloc[scour_row]) for column in CS_LTD_COLUMNS},
+                         scour_datum_elev=float(numeric_data['Scour Datum Elev.'].iloc[scour_row]),
+                         bank_stations=(float(bank_stations[0]), float(bank_stations[1])),
+                         laterally_stable=bridge_data['Laterally Stable Channel?'].iloc[0] != 'No',
+                         long_term_deg=float(scalars['Long Term Deg']),
+                         abut_scour_elev={column: float(scalars[column]) for column in ABUT_SCOUR_COLUMNS},
+                         abut_toe_left_sta=float(scalars['Abt Toe Left Sta.']),
+                         abut_toe_right_sta=float(scalars['Abt Toe Right Sta.']),
+                         wse={column: float(scalars[column]) for column in WSE_COLUMNS},
+                         **piers)
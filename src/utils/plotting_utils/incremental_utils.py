@@ -0,0 +1,152 @@
+import hashlib
+import io
+
+import numpy as np
+
+from .bridge_section import PIER_COLUMNS
+from ..startup_utils.lazy_import import lazy_import
+
+
+plt = lazy_import("matplotlib.pyplot")
+
+
+def _digest(*parts) -> str:
+    """
+    Returns a SHA-1 digest of arrays, numbers and strings.
+    """
+    digest = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(str(part.shape).encode())
+            digest.update(np.ascontiguousarray(part, dtype=float).tobytes())
+        else:
+            digest.update(repr(part).encode())
+        digest.update(b"|")
+    return digest.hexdigest()
+
+
+def section_digests(bridge_section) -> dict:
+    """
+    Calculates digests of the parts of a bridge section so a re-uploaded file can be compared with the previous one.
+    Args:
+        bridge_section (BridgeSection): The bridge section returned by parse_bridge_section.
+    Returns:
+        dict: Digests with keys
+            - 'piers': dict of Bent ID to the digest of its geometry and local scour depths.
+            - 'ground_line': digest of the ground line.
+            - 'chords': digest of the low and high chords.
+            - 'bridge': digest of the scalar bridge parameters.
+    """
+    pier_values = np.column_stack([getattr(bridge_section, attribute) for attribute in PIER_COLUMNS.values()] +
+                                  list(bridge_section.local_scour_depth.values()))
+    return {"piers": {bent_id: _digest(values) for bent_id, values in zip(bridge_section.bent_ids, pier_values)},
+            "ground_line": _digest(bridge_section.ground_station, bridge_section.ground_elev),
+            "chords": _digest(bridge_section.low_chord, bridge_section.high_chord),
+            "bridge": _digest(_bridge_parameters(bridge_section))}
+
+
+def _bridge_parameters(bridge_section, recurrence_data=None) -> list:
+    """
+    Returns the scalar bridge parameters, limited to the given recurrence intervals if any.
+    """
+    parameters = [bridge_section.scour_datum_elev, bridge_section.bank_stations, bridge_section.laterally_stable,
+                  bridge_section.long_term_deg, bridge_section.abut_toe_left_sta, bridge_section.abut_toe_right_sta]
+    if recurrence_data is None:
+        return parameters + [sorted(bridge_section.cs_ltd_depth.items()), sorted(bridge_section.abut_scour_elev.items()),
+                             sorted(bridge_section.wse.items())]
+    for year in recurrence_data:
+        parameters += [year, bridge_section.cs_ltd_depth[year[0]], bridge_section.abut_scour_elev[year[4]], bridge_section.wse[year[3]]]
+    return parameters
+
+
+def diff_sections(previous:dict, current:dict) -> dict:
+    """
+    Compares the digests of two versions of a bridge section.
+    Args:
+        previous (dict): The digests returned by section_digests for the previous upload, or None.
+        current (dict): The digests returned by section_digests for the new upload.
+    Returns:
+        dict: The changes with keys 'added', 'removed' and 'changed' listing Bent IDs,
+            and 'ground_line', 'chords' and 'bridge' flags. Everything is reported as added if there is no previous upload.
+    """
+    if previous is None:
+        return {"added": list(current["piers"]), "removed": [], "changed": [],
+                "ground_line": True, "chords": True, "bridge": True}
+    return {"added": [bent_id for bent_id in current["piers"] if bent_id not in previous["piers"]],
+            "removed": [bent_id for bent_id in previous["piers"] if bent_id not in current["piers"]],
+            "changed": [bent_id for bent_id, digest in current["piers"].items()
+                        if bent_id in previous["piers"] and previous["piers"][bent_id] != digest],
+            "ground_line": previous["ground_line"] != current["ground_line"],
+            "chords": previous["chords"] != current["chords"],
+            "bridge": previous["bridge"] != current["bridge"]}
+
+
+def describe_changes(changes:dict) -> str:
+    """
+    Describes the changes returned by diff_sections in a sentence for the page.
+    """
+    parts = []
+    for key, label in (("changed", "changed"), ("added", "added"), ("removed", "removed")):
+        if changes[key]:
+            parts.append(f"{label} bents {', '.join(str(bent_id) for bent_id in changes[key])}")
+    for key, label in (("ground_line", "the ground line"), ("chords", "the bridge chords"), ("bridge", "the bridge parameters")):
+        if changes[key]:
+            parts.append(f"{label} changed")
+    return "; ".join(parts) if parts else "no changes"
+
+
+def static_layers_digest(bridge_section) -> str:
+    """
+    Returns a digest of the inputs of build_static_layers.
+    """
+    return _digest("static", bridge_section.bent_ids, *[getattr(bridge_section, attribute) for attribute in PIER_COLUMNS.values()],
+                   bridge_section.low_chord, bridge_section.high_chord,
+                   bridge_section.ground_station, bridge_section.ground_elev)
+
+
+def profile_digest(bridge_section, recurrence_data) -> str:
+    """
+    Returns a digest of every input of the scour profiles and figures of the given recurrence intervals.
+    A change to a column of another recurrence interval leaves the digest unchanged.
+    Args:
+        bridge_section (BridgeSection): The bridge section returned by parse_bridge_section.
+        recurrence_data (list): List of recurrence data for the years the output depends on.
+    Returns:
+        str: The digest.
+    """
+    return _digest(static_layers_digest(bridge_section),
+                   *[bridge_section.local_scour_depth[year[1]] for year in recurrence_data],
+                   _bridge_parameters(bridge_section, recurrence_data))
+
+
+def render_figure(figure) -> dict:
+    """
+    Renders a figure to PNG for display and download and closes it.
+    Args:
+        figure (Figure): The figure to render.
+    Returns:
+        dict: PNG bytes with keys 'display', rendered like st.pyplot, and 'download', rendered at the figure's own resolution.
+    """
+    display = io.BytesIO()
+    figure.savefig(display, format="png", bbox_inches="tight", dpi=200)
+    download = io.BytesIO()
+    figure.savefig(download, format="png")
+    plt.close(figure)
+    return {"display": display.getvalue(), "download": download.getvalue()}
+
+
+def reuse_or_compute(previous:dict, current:dict, key, compute):
+    """
+    Returns the result stored under key in the previous results, or computes it.
+    The result is stored in the current results, so only outputs of the latest upload are kept.
+    Args:
+        previous (dict): The results kept from the previous run.
+        current (dict): The results of this run.
+        key: The digest of the inputs of the result.
+        compute (callable): Function without arguments that computes the result.
+    Returns:
+        tuple: The result and whether it was reused.
+    """
+    reused = key in previous
+    current[key] = previous[key] if reused else compute()
+    return current[key], reused
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import numpy as np
+
+from .scour_plotting_utils import calculate_scour_profile, _scour_hole_lines
+from ..startup_utils.lazy_import import lazy_import
+
+
+pd = lazy_import("pandas")
+alt = lazy_import("altair")
+
+
+# Colors of each layer of the interactive profile, matching the static scour figures
+LAYER_COLORS = {
+    "Ground Line": "green",
+    "Total Scour (LTD + CS + LS)": "#E98300",
+    "CS + LTD": "#E98300",
+    "Abutment Scour (AS)": "#0073CF",
+    "Contraction Scour (CS)": "#FCD450",
+    "Local Scour (LS) at Pier": "red",
+    "WSE": "blue",
+    "Bridge": "black",
+}
+
+
+def lttb_downsample(x, y, n_out:int) -> np.ndarray:
+    """
+    Selects the points of a line that best preserve its shape using the Largest Triangle Three Buckets algorithm.
+    Args:
+        x (ndarray): The x coordinates of the line, in increasing order and without NaN values.
+        y (ndarray): The y coordinates of the line, without NaN values.
+        n_out (int): Number of points to keep.
+    Returns:
+        ndarray: The indices of the points to keep, always including the first and last point.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n) if n_out >= n else np.unique([0, n - 1])
+
+    # the first and last points are kept, the points between them are split into n_out - 2 buckets
+    # and the point making the largest triangle with the previous kept point and the mean of the next bucket is kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_start, next_stop = stop, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        mean_x = x[next_start:next_stop].mean()
+        mean_y = y[next_start:next_stop].mean()
+        area = np.abs((x[previous] - mean_x) * (y[start:stop] - y[previous]) -
+                      (x[previous] - x[start:stop]) * (mean_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        keep[bucket + 1] = previous
+    return keep
+
+
+def downsample_line(x, y, window, max_points:int) -> tuple:
+    """
+    Clips a line to a station window and downsamples it, keeping the breaks at NaN values.
+    Args:
+        x (ndarray): The stations of the line, in increasing order.
+        y (ndarray): The elevations of the line. NaN values break the line into segments.
+        window (tuple): The (start, end) stations to show.
+        max_points (int): Maximum number of points to return for the line.
+    Returns:
+        tuple: The stations, elevations and segment number of the points to draw.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    inside = np.flatnonzero((x >= window[0]) & (x <= window[1]))
+    if len(inside) == 0:
+        return np.empty(0), np.empty(0), np.empty(0, dtype=np.int64)
+    # keep one point either side of the window so the line runs to the edges of the view
+    start = max(inside[0] - 1, 0)
+    stop = min(inside[-1] + 2, len(x))
+    x = x[start:stop]
+    y = y[start:stop]
+
+    valid = np.isfinite(x) & np.isfinite(y)
+    # split the line into runs of valid points, each run gets points in proportion to its length
+    change = np.flatnonzero(np.diff(np.concatenate(([False], valid, [False])).astype(np.int8)))
+    runs = list(zip(change[::2], change[1::2]))
+    total = sum(end - begin for begin, end in runs)
+    if total == 0:
+        return np.empty(0), np.empty(0), np.empty(0, dtype=np.int64)
+
+    stations, elevations, segments = [], [], []
+    for segment, (begin, end) in enumerate(runs):
+        run_points = max(2, int(round(max_points * (end - begin) / total)))
+        keep = begin + lttb_downsample(x[begin:end], y[begin:end], run_points)
+        stations.append(x[keep])
+        elevations.append(y[keep])
+        segments.append(np.full(len(keep), segment))
+    return np.concatenate(stations), np.concatenate(elevations), np.concatenate(segments)
+
+
+def build_profile_layers(bridge_section, year, static_layers, window=None, max_points:int = 2000) -> pd.DataFrame:
+    """
+    Builds the downsampled lines of the interactive scour profile for a recurrence interval.
+    The scour lines come from calculate_scour_profile, the same calculation used for the static figures.
+    Args:
+        bridge_section (BridgeSection): The bridge section returned by parse_bridge_section.
+        year (list): List containing recurrence interval data for the year.
+        static_layers (dict): The layers returned by build_static_layers.
+        window (tuple): The (start, end) stations to show. The whole ground line is shown if None.
+        max_points (int): Maximum number of points for each of the dense ground and scour lines.
+    Returns:
+        DataFrame: Long form table with columns ['Layer', 'Segment', 'Point', 'Station', 'Elevation'] for plotting.
+            Point numbers the vertices in drawing order, since pier outlines and scour hole walls double back on
+            themselves or repeat stations.
+    """
+    profile, scour_holes = calculate_scour_profile(bridge_section, year)
+    stations = profile['station']
+    if window is None:
+        window = (np.nanmin(stations), np.nanmax(stations))
+
+    first_station = bridge_section.bent_cl_sta[0]
+    last_station = bridge_section.bent_cl_sta[-1]
+    wse = bridge_section.wse[year[3]]
+
+    lines = [("Ground Line", stations, profile['elev'])]
+    # the scour holes, piers, chords and flat lines have a handful of points and are only clipped to the window
+    small_lines = [("Local Scour (LS) at Pier", np.column_stack(_scour_hole_lines(scour_holes)) if len(scour_holes) else np.empty((0, 2))),
+                   ("WSE", np.array([[first_station, wse], [last_station, wse]]))]
+    if not bridge_section.laterally_stable:
+        cs_ltd_elev = bridge_section.scour_datum_elev - bridge_section.cs_ltd_depth[year[0]]
+        contraction_elev = bridge_section.scour_datum_elev - profile["contract_scour"][0]
+        small_lines.append(("CS + LTD", np.array([[first_station, cs_ltd_elev], [last_station, cs_ltd_elev]])))
+        small_lines.append(("Contraction Scour (CS)", np.array([[first_station, contraction_elev], [last_station, contraction_elev]])))
+    else:
+        lines.append(("Total Scour (LTD + CS + LS)", stations, profile['lt_deg']))
+        lines.append(("Abutment Scour (AS)", stations, profile['abut_scour']))
+        lines.append(("Contraction Scour (CS)", stations, profile['contract_scour']))
+
+    frames = []
+    for layer, x, y in lines:
+        x, y, segment = downsample_line(x, y, window, max_points)
+        frames.append(pd.DataFrame({"Layer": layer, "Segment": segment, "Station": x, "Elevation": y}))
+
+    for outline in list(static_layers["piers"]) + list(static_layers["chords"]):
+        small_lines.append(("Bridge", outline))
+
+    segment_number = 0
+    for layer, points in small_lines:
+        x, y, segment = downsample_line(points[:, 0], points[:, 1], window, len(points))
+        frames.append(pd.DataFrame({"Layer": layer, "Segment": segment + segment_number, "Station": x, "Elevation": y}))
+        segment_number += len(points)
+    profile_layers = pd.concat(frames, ignore_index=True)
+    # downsampling keeps the vertices of each line in their original order, so the row order is the drawing order
+    profile_layers.insert(2, "Point", np.arange(len(profile_layers)))
+    return profile_layers
+
+
+def profile_chart(profile_layers:pd.DataFrame, title:str) -> alt.Chart:
+    """
+    Builds an interactive Altair line chart of the profile layers.
+    Args:
+        profile_layers (DataFrame): The table returned by build_profile_layers.
+        title (str): Title of the chart.
+    Returns:
+        Chart: A zoomable and pannable line chart with a tooltip for every point.
+    """
+    layers = [layer for layer in LAYER_COLORS if layer in set(profile_layers["Layer"])]
+    return alt.Chart(profile_layers, title=title).mark_line().encode(
+        x=alt.X("Station:Q", title="Station [ft]", scale=alt.Scale(zero=False)),
+        y=alt.Y("Elevation:Q", title="Elevation [ft-NAVD88]", scale=alt.Scale(zero=False)),
+        color=alt.Color("Layer:N", scale=alt.Scale(domain=layers, range=[LAYER_COLORS[layer] for layer in layers])),
+        detail="Segment:N",
+        order="Point:Q",
+        tooltip=["Layer", alt.Tooltip("Station:Q", format=".1f"), alt.Tooltip("Elevation:Q", format=".2f")],
+    ).interactive()
@@ -1,8 +1,17 @@
-import pandas as pd 
-import matplotlib.pyplot as plt
-import matplotlib.ticker as plticker
 import numpy as np
-pd.options.mode.copy_on_write = True
+
+from ..startup_utils.lazy_import import lazy_import
+
+
+def _enable_copy_on_write(pandas):
+    pandas.options.mode.copy_on_write = True
+
+
+# pandas and matplotlib are only imported when a figure or summary is first made
+pd = lazy_import("pandas", on_load=_enable_copy_on_write)
+plt = lazy_import("matplotlib.pyplot")
+plticker = lazy_import("matplotlib.ticker")
+mcollections = lazy_import("matplotlib.collections")
 
 
 def recurrence_txt():
@@ -13,324 +22,269 @@ def recurrence_txt():
     flags_500yr = ['CS + LTD Depth (500-yr)', 'Local Scour Depth (500-yr)', 'Scour Datum Elev.', 'WSE 500yr','abut scour 500','500-Year Scour Check']
     return [flags_100yr, flags_500yr]
 
-def generate_pier_scour_df(bridge_data):
+
+def _second_closest(stations, target):
     """
-    Generates a dictionary of pier data and other related data from the bridge data DataFrame.
-    Args:
-        bridge_data (DataFrame): DataFrame containing bridge data.
-    Returns:
-        list: A list containing the pier data dictionary, 
-            individual pier IDs, 
-            low chord data, 
-            high chord data, 
-            ground line data, 
-            scour data DataFrame, 
-            bank stations, 
-            lateral stability, 
-            long term degradation, 
-            abutment scour elevation, 
-            abutment station data, 
-            and water surface elevation data.
+    Returns the index of the ground line station second closest to a target station.
     """
-    
-    pier_data_dict = {}
-    individual_pier_ids = []
-    bank_stations = bridge_data[['Channel Bank Sta.']]
-    lateral_stability = bridge_data[['Laterally Stable Channel?']]
-    lt_deg = bridge_data[['Long Term Deg']]
-    abt_scour_elev = bridge_data[['abut scour 100', 'abut scour 500']]
-    abut_stat = bridge_data[['Abt Toe Left Sta.','Abt Toe Right Sta.']]
-    scour_data_df = bridge_data[['Bent ID','CS + LTD Depth (100-yr)','CS + LTD Depth (500-yr)','Scour Datum Elev.']]
-    wse = bridge_data[['WSE 100yr','WSE 500yr']]
-    scour_data_df = scour_data_df.dropna()
-    pier_data_df = bridge_data[['Bent ID',
-                                'Bridge Thickness', 
-                                'Pier Stem Top Width', 
-                                'Pier Stem Bottom Width',
-                                'Footing Cap Width',
-                                'Footing Width',
-                                'Footing Cap Height',
-                                'Footing Height',
-                                'Bent CL Sta',
-                                'Bottom of Footing Elev',
-                                'Low Chord Elev',
-                                'High Chord Elev',
-                                'Local Scour Depth (100-yr)',
-                                 'Local Scour Depth (500-yr)' ]]
-    
-    bridge_low_chord = bridge_data[['Bent CL Sta','Low Chord Elev']]
-    bridge_low_chord = bridge_low_chord.dropna()
-    bridge_high_chord = bridge_data[['Bent CL Sta','High Chord Elev']]
-    bridge_high_chord = bridge_high_chord.dropna()
-    ground_line = bridge_data[['Offset Station', 'Elev']]
-    pier_data_df = pier_data_df.dropna()
-
-    for index, row in pier_data_df.iterrows():
-        pier_data_dict[row['Bent ID']] = row
-        individual_pier_ids.append(row['Bent ID'])
-    return [pier_data_dict, 
-            individual_pier_ids,
-            bridge_low_chord, 
-            bridge_high_chord, 
-            ground_line, 
-            scour_data_df, 
-            bank_stations, 
-            lateral_stability,
-            lt_deg, 
-            abt_scour_elev, 
-            abut_stat, wse]
-
-
-def calculate_scour_data(pier_data_dict,pier_id, scour_data_df,ground_line, year):
+    return np.argsort(np.abs(stations - target), kind='quicksort')[1]
+
+
+def calculate_scour_data(bridge_section, profile, year):
     """
-    Calculates the scour data for a given pier based on its ID and the year.
+    Calculates the local scour hole at each interior pier for a recurrence interval.
     Args:
-        pier_data_dict (dict): Dictionary containing pier data.
-        pier_id (str): ID of the pier.
-        scour_data_df (DataFrame): DataFrame containing scour data.
-        ground_line (DataFrame): DataFrame containing ground line data.
+        bridge_section (BridgeSection): The bridge section returned by parse_bridge_section.
+        profile (dict): The ground line profile with the 'station' and 'lt_deg' arrays.
         year (list): List containing recurrence interval data for the year.
     Returns:
-        list: List containing the calculated scour data for the pier.
+        ndarray: (interior piers, 3, 2) array with the left, center and right point of the scour hole at each pier.
     """
-    cs_ltd = year[0]
-    local_scour = year[1]
-    scour_data_array = []
-    pier_data = pier_data_dict[pier_id]
+    cs_ltd = bridge_section.cs_ltd_depth[year[0]]
+    local_scour = bridge_section.local_scour_depth[year[1]][1:-1]
+    center = bridge_section.bent_cl_sta[1:-1]
+    stations = profile['station']
+    lt_deg = profile['lt_deg']
     # calculate the left, right, and center stations based on the pier data and the local scour data
     # The left and right stations are calculated as 2 times the local scour depth away from the pier center line station
     # The center station is the pier center line station
     # The left and right stations are used to find the closest stations in the ground line to the scour holes plotted at each pier
-    left = pier_data['Bent CL Sta'] - 2*(scour_data_df[cs_ltd].values[0] - (scour_data_df[cs_ltd].values[0] - pier_data[local_scour]))
-    right = pier_data['Bent CL Sta'] + 2*(scour_data_df[cs_ltd].values[0] - (scour_data_df[cs_ltd].values[0] - pier_data[local_scour]))
-    center = pier_data['Bent CL Sta']
-    left_station = ground_line.iloc[(ground_line['Offset Station']-left).abs().argsort()[:2]]
-    right_station = ground_line.iloc[(ground_line['Offset Station']-right).abs().argsort()[:2]]
-    center_station = ground_line.iloc[(ground_line['Offset Station']-center).abs().argsort()[:2]]
-    
-    scour_data_array.append([pier_data['Bent CL Sta'] - 2*(scour_data_df[cs_ltd].values[0] - (scour_data_df[cs_ltd].values[0] - pier_data[local_scour])),
-                                   left_station['lt_deg'].values[1]])
-    
-    scour_data_array.append([pier_data['Bent CL Sta'],
-                                   (center_station['lt_deg'].values[1] - pier_data[local_scour])- scour_data_df[cs_ltd].values[0]])
-    
-    scour_data_array.append([pier_data['Bent CL Sta'] + 2*(scour_data_df[cs_ltd].values[0] - (scour_data_df[cs_ltd].values[0] - pier_data[local_scour])),
-                                   right_station['lt_deg'].values[1]])
-    
-    
+    left = center - 2*(cs_ltd - (cs_ltd - local_scour))
+    right = center + 2*(cs_ltd - (cs_ltd - local_scour))
+
+    scour_data_array = np.empty((len(center), 3, 2))
+    for pier in range(len(center)):
+        scour_data_array[pier, 0] = [left[pier], lt_deg[_second_closest(stations, left[pier])]]
+        scour_data_array[pier, 1] = [center[pier], (lt_deg[_second_closest(stations, center[pier])] - local_scour[pier]) - cs_ltd]
+        scour_data_array[pier, 2] = [right[pier], lt_deg[_second_closest(stations, right[pier])]]
     return scour_data_array
 
 
-def calculate_pier_data(pier_data_dict,pier_id):
+def calculate_scour_profile(bridge_section, year):
     """
-    Calculates the plotting data for a pier based on its ID.
+    Calculates the total, contraction and abutment scour lines along the ground line and the local scour hole at each interior pier.
     Args:
-        pier_data_dict (dict): Dictionary containing pier data.
-        pier_id (str): ID of the pier.
+        bridge_section (BridgeSection): The bridge section returned by parse_bridge_section.
+        year (list): List containing recurrence interval data for the year.
+    Returns:
+        tuple: The profile, a dict of ground line arrays with keys 'station', 'elev', 'lt_deg', 'contract_scour' and 'abut_scour',
+            and the (interior piers, 3, 2) array of local scour holes returned by calculate_scour_data.
+    """
+    stations = bridge_section.ground_station
+    elevations = bridge_section.ground_elev
+
+    # Set the channel type based on the bank stations and abutment stations
+    channel = (stations > bridge_section.bank_stations[0]) & (stations < bridge_section.bank_stations[1])
+    abutment = (stations < bridge_section.abut_toe_left_sta) | (stations > bridge_section.abut_toe_right_sta)
+    channel = channel & ~abutment
+
+    # Calculate lt_deg, contract_scour, and abut_scour based on channel type
+    abutment_elev = bridge_section.abut_scour_elev[year[4]]
+    contraction_elev = elevations - bridge_section.cs_ltd_depth[year[0]]
+    profile = {'station': stations,
+               'elev': elevations,
+               'lt_deg': np.where(abutment, abutment_elev,
+                                  np.where(channel, contraction_elev - bridge_section.long_term_deg, contraction_elev)),
+               'contract_scour': np.where(abutment, np.nan, contraction_elev),
+               'abut_scour': np.where(abutment, abutment_elev, np.where(channel, np.nan, contraction_elev))}
+
+    # Calculate the scour holes for the interior piers, the first and last bents are the abutments
+    scour_holes = calculate_scour_data(bridge_section, profile, year)
+
+    for station in scour_holes:
+        # Find the closest left and right stations in the ground line to the scour holes plotted at each pier
+        # This is done to ensure that the scour holes are plotted at the correct locations on the ground line
+        # and that the lt_deg values are updated correctly
+        left_index = np.nanargmin(np.abs(stations - station[0][0]))
+        right_index = np.nanargmin(np.abs(stations - station[2][0]))
+        for line in ('contract_scour', 'lt_deg', 'abut_scour'):
+            # Set the scour values to NaN for the range between the left and right stations
+            # and replace the values at the left and right stations with the values from the scour holes
+            profile[line][left_index:right_index + 1] = np.nan
+            profile[line][left_index] = station[0][1]
+            profile[line][right_index] = station[2][1]
+
+    return profile, scour_holes
+
+
+def summarize_scour_profile(bridge_section, year):
+    """
+    Summarizes the scour results at each interior pier for a specific recurrence interval.
+    Args:
+        bridge_section (BridgeSection): The bridge section returned by parse_bridge_section.
+        year (list): List containing recurrence interval data for the year.
     Returns:
-        tuple: Two lists containing the plotting data for the left and right sides of the pier.
+        DataFrame: One row per interior pier with the scour elevation at the pier centerline,
+            the bottom of footing elevation and the minimum total scour elevation of the profile.
+    """
+    profile, scour_holes = calculate_scour_profile(bridge_section, year)
+    min_total_scour = np.nanmin(np.concatenate([[np.nanmin(profile['lt_deg'])], scour_holes[:, 1, 1]]))
+    interior = slice(1, -1)
+    return pd.DataFrame({"Recurrence": year[-1],
+                         "Bent ID": list(bridge_section.bent_ids[interior]),
+                         "Bent CL Sta": bridge_section.bent_cl_sta[interior],
+                         "Local Scour Depth": bridge_section.local_scour_depth[year[1]][interior],
+                         "CS + LTD Depth": bridge_section.cs_ltd_depth[year[0]],
+                         "Scour Elev": scour_holes[:, 1, 1],
+                         "Bottom of Footing Elev": bridge_section.bottom_of_footing_elev[interior],
+                         "Min Total Scour Elev": min_total_scour,
+                         "WSE": bridge_section.wse[year[3]]},
+                        columns=["Recurrence", "Bent ID", "Bent CL Sta", "Local Scour Depth", "CS + LTD Depth",
+                                 "Scour Elev", "Bottom of Footing Elev", "Min Total Scour Elev", "WSE"])
+
+
+def calculate_pier_data(bridge_section):
+    """
+    Calculates the outline of every pier.
+    Args:
+        bridge_section (BridgeSection): The bridge section returned by parse_bridge_section.
+    Returns:
+        ndarray: (2 x bents, 7, 2) array with the left and then the right outline of each pier.
+    """
+    center = bridge_section.bent_cl_sta
+    bottom = bridge_section.bottom_of_footing_elev
+    footing_top = bottom + bridge_section.footing_height
+    cap_top = bottom + bridge_section.footing_cap_height + bridge_section.footing_height
+    # Offsets from the pier center line and elevations of the seven points of each side, from the low chord down to the
+    # bottom of the footing, taken from the pier stem top width, bottom width, footing cap width, and footing width.
+    half_widths = np.stack([bridge_section.stem_top_width/2,
+                            bridge_section.stem_bottom_width/2,
+                            bridge_section.footing_cap_width/2,
+                            bridge_section.footing_cap_width/2,
+                            bridge_section.footing_width/2,
+                            bridge_section.footing_width/2,
+                            np.zeros_like(center)], axis=1)
+    elevations = np.stack([bridge_section.low_chord_elev, cap_top, cap_top, footing_top, footing_top, bottom, bottom], axis=1)
+
+    outlines = np.empty((len(center), 2, 7, 2))
+    outlines[:, 0, :, 0] = center[:, None] - half_widths
+    outlines[:, 1, :, 0] = center[:, None] + half_widths
+    outlines[:, :, :, 1] = elevations[:, None, :]
+    return outlines.reshape(-1, 7, 2)
+
+def build_static_layers(bridge_section):
+    """
+    Builds the line work of the bridge layers that are the same in every scour figure.
+    The layers are built once and passed to generate_figure and generate_summary_figure, which draw
+    them as a few batched LineCollections and only draw the scour overlays of each recurrence interval on top.
+    Args:
+        bridge_section (BridgeSection): The bridge section returned by parse_bridge_section.
+    Returns:
+        dict: The static layers with keys
+            - 'piers': (2 x bents, 7, 2) array with the left and right outline of each pier.
+            - 'chords': list with the (stations, 2) low chord and high chord lines.
+            - 'ground_line': (stations, 2) array with the ground line.
+    """
+    return {"piers": calculate_pier_data(bridge_section),
+            "chords": [bridge_section.low_chord, bridge_section.high_chord],
+            "ground_line": np.column_stack([bridge_section.ground_station, bridge_section.ground_elev])}
+
+
+def draw_static_layers(ax, static_layers):
+    """
+    Draws the pier outlines and the bridge chords of the static layers as two LineCollections.
+    Args:
+        ax (Axes): The axes to draw on.
+        static_layers (dict): The layers returned by build_static_layers.
+    """
+    ax.add_collection(mcollections.LineCollection(static_layers["piers"], colors='black', linewidths=1))
+    ax.add_collection(mcollections.LineCollection(static_layers["chords"], colors='black'))
+
+
+def _scour_hole_lines(scour_holes):
+    """
+    Joins the local scour holes into a single line broken by NaN so they are drawn as one artist.
+    """
+    if len(scour_holes) == 0:
+        return [], []
+    points = np.full((len(scour_holes), 4, 2), np.nan)
+    points[:, :3] = np.asarray(scour_holes, dtype=float)
+    points = points.reshape(-1, 2)[:-1]
+    return points[:, 0], points[:, 1]
+
+
+def _draw_envelope(ax, envelope, color, label):
+    """
+    Draws the percentile band returned by scour_envelope as a shaded area.
+    """
+    low, high = envelope["percentiles"]
+    ax.fill_between(envelope["station"], envelope["low"], envelope["high"], color=color, alpha=0.25, linewidth=0,
+                    label=f"{label} ({low:g}th-{high:g}th percentile)")
+
+
+def _draw_elevation_ticks(ax):
     """
-    # Initialize lists to hold the plotting data for the left and right sides of the pier
-    pier_plotting_data_left = []
-    pier_plotting_data_right = []
-    pier_data = pier_data_dict[pier_id]
-    #x1, y1
-    # Calculate the plotting data for the left and right sides of the pier by taking the pier data and calculating the coordinates based on the pier stem top width, bottom width, footing cap width, and footing width.
-    pier_plotting_data_left.append([pier_data['Bent CL Sta']-(pier_data['Pier Stem Top Width']/2),pier_data['Low Chord Elev']])
-    #x2, y2
-    pier_plotting_data_left.append([pier_data['Bent CL Sta']-(pier_data['Pier Stem Bottom Width']/2),(pier_data['Bottom of Footing Elev'] + pier_data['Footing Cap Height'] + pier_data['Footing Height'])])
-    #x3, y3
-    pier_plotting_data_left.append([pier_data['Bent CL Sta']-pier_data['Footing Cap Width']/2,(pier_data['Bottom of Footing Elev'] + pier_data['Footing Cap Height'] + pier_data['Footing Height'])])
-    #x4, y4
-    pier_plotting_data_left.append([pier_data['Bent CL Sta']-pier_data['Footing Cap Width']/2,(pier_data['Bottom of Footing Elev']+pier_data['Footing Height'])])
-    #x5, y5
-    pier_plotting_data_left.append([pier_data['Bent CL Sta']-(pier_data['Footing Width']/2),(pier_data['Bottom of Footing Elev']+pier_data['Footing Height'])])
-    #x6, y6
-    pier_plotting_data_left.append([pier_data['Bent CL Sta']-(pier_data['Footing Width']/2),pier_data['Bottom of Footing Elev']])
-    #x7, y7
-    pier_plotting_data_left.append([pier_data['Bent CL Sta'],pier_data['Bottom of Footing Elev']])
-
-
-    #x1, y1
-    pier_plotting_data_right.append([pier_data['Bent CL Sta']+(pier_data['Pier Stem Top Width']/2),pier_data['Low Chord Elev']])
-    #x2, y2
-    pier_plotting_data_right.append([pier_data['Bent CL Sta']+(pier_data['Pier Stem Bottom Width']/2),(pier_data['Bottom of Footing Elev'] + pier_data['Footing Cap Height'] + pier_data['Footing Height'])])
-    #x3, y3
-    pier_plotting_data_right.append([pier_data['Bent CL Sta']+pier_data['Footing Cap Width']/2,(pier_data['Bottom of Footing Elev'] + pier_data['Footing Cap Height'] + pier_data['Footing Height'])])
-    #x4, y4
-    pier_plotting_data_right.append([pier_data['Bent CL Sta']+pier_data['Footing Cap Width']/2,(pier_data['Bottom of Footing Elev']+pier_data['Footing Height'])])
-    #x5, y5
-    pier_plotting_data_right.append([pier_data['Bent CL Sta']+(pier_data['Footing Width']/2),(pier_data['Bottom of Footing Elev']+pier_data['Footing Height'])])
-    #x6, y6
-    pier_plotting_data_right.append([pier_data['Bent CL Sta']+(pier_data['Footing Width']/2),pier_data['Bottom of Footing Elev']])
-    #x7, y7
-    pier_plotting_data_right.append([pier_data['Bent CL Sta'],pier_data['Bottom of Footing Elev']])
-
-    return pier_plotting_data_left, pier_plotting_data_right
-
-def generate_figure(pier_data_dict, 
-                          individual_pier_ids,
-                          bridge_low_chord, 
-                          bridge_high_chord, 
-                          ground_line,
-                          scour_data_df,
-                          bank_stations, 
-                          lateral_stability,
-                          lt_deg, 
-                          abt_scour_elev, 
-                          abut_stat, wse_data, 
-                          year
-                          ):
-    
+    Draws a short horizontal tick at every foot of elevation left of station 0 as a single LineCollection.
+    """
+    ax.axvline(x=0, color='grey',linewidth=.5)
+    y_axis_range = ax.get_ylim()
+    y_ticks = range(int(y_axis_range[0]),int(y_axis_range[1]),1)
+    ax.hlines(y=list(y_ticks),xmin = -5, xmax = 0, color='grey',linewidth=1)
+
+
+def generate_figure(bridge_section, year, static_layers = None, envelope = None):
+
     """
     Generates a figure for scour data for a specific recurrence interval.
     Args:
-        pier_data_dict (dict): Dictionary containing pier data.
-        individual_pier_ids (list): List of individual pier IDs.
-        bridge_low_chord (DataFrame): DataFrame containing low chord data.
-        bridge_high_chord (DataFrame): DataFrame containing high chord data.
-        ground_line (DataFrame): DataFrame containing ground line data.
-        scour_data_df (DataFrame): DataFrame containing scour data.
-        bank_stations (DataFrame): DataFrame containing bank station data.
-        lateral_stability (DataFrame): DataFrame containing lateral stability data.
-        lt_deg (DataFrame): DataFrame containing long term degradation data.
-        abt_scour_elev (DataFrame): DataFrame containing abutment scour elevation data.
-        abut_stat (DataFrame): DataFrame containing abutment station data.
-        wse_data (DataFrame): DataFrame containing water surface elevation data.
+        bridge_section (BridgeSection): The bridge section returned by parse_bridge_section.
         year (list): List containing recurrence interval data for the year.
+        static_layers (dict): The layers returned by build_static_layers. They are built from the bridge section if None.
+        envelope (dict): The uncertainty band returned by scour_envelope for this recurrence interval, drawn if given.
     Returns:
         fig (Figure): The generated figure.
     """
 
-    abut_scour_flag = year[4]
     cs_ltd = year[0]
     wse_flag = year[3]
     recurrence_title = year[-1]
 
-    scour_data_array = []
-    
-    left_station = abut_stat['Abt Toe Left Sta.'].values[0]
-    right_station = abut_stat['Abt Toe Right Sta.'].values[0]
-    
-    
-    # Set the channel type based on the bank stations and abutment stations
-    ground_line.loc[(ground_line['Offset Station'] > bank_stations['Channel Bank Sta.'].values[0]) & (ground_line['Offset Station'] < bank_stations['Channel Bank Sta.'].values[1]), "channel"] = "Channel"
-    ground_line.loc[(ground_line['Offset Station'] < left_station) | (ground_line['Offset Station'] > right_station), "channel"] = "Abutment"
-    ground_line = ground_line.assign(lt_deg = 0.0)
-    ground_line = ground_line.assign(contract_scour = 0.0)
-    ground_line = ground_line.assign(abut_scour = 0.0)
-
-    # Update lt_deg, contract_scour, and abut_scour based on channel type
-    # Assign initial values for lt_deg, contract_scour, and abut_scour
-    # This is done to ensure that the lt_deg values are updated correctly
-    for idx, row in ground_line.iterrows():
-        if row['channel'] == "Abutment":
-            ground_line.at[idx, 'abut_scour'] = abt_scour_elev[abut_scour_flag].values[0]
-            ground_line.at[idx, 'contract_scour'] = np.nan
-            ground_line.at[idx, 'lt_deg'] = abt_scour_elev[abut_scour_flag].values[0]
-        elif row['channel'] == "Channel":
-            
-            ground_line.at[idx, 'lt_deg'] = row['Elev'] - lt_deg['Long Term Deg'].values[0] - scour_data_df[cs_ltd].values[0] 
-            ground_line.at[idx, 'contract_scour'] = row['Elev'] - scour_data_df[cs_ltd].values[0] 
-            ground_line.at[idx, 'abut_scour'] = np.nan
-        else:
-            ground_line.at[idx, 'lt_deg'] = row['Elev'] - scour_data_df[cs_ltd].values[0] 
-            ground_line.at[idx, 'contract_scour'] = row['Elev'] - scour_data_df[cs_ltd].values[0] 
-            ground_line.at[idx, 'abut_scour'] = row['Elev'] - scour_data_df[cs_ltd].values[0]
-   
-
-    cl_lsd = [[pier_data_dict[individual_pier_ids[0]]['Bent CL Sta'], (scour_data_df['Scour Datum Elev.'].values[0] - scour_data_df[cs_ltd].values[0])],
-                    [pier_data_dict[individual_pier_ids[-1]]['Bent CL Sta'], (scour_data_df['Scour Datum Elev.'].values[0] - scour_data_df[cs_ltd].values[0])]]
-    
-    #local_instable = [[pier_data_dict[individual_pier_ids[0]]['Bent CL Sta'], (abut_scour_flag)],
-    #                [pier_data_dict[individual_pier_ids[-1]]['Bent CL Sta'], (abut_scour_flag)]]
-    
-    contraction_instable = [[pier_data_dict[individual_pier_ids[0]]['Bent CL Sta'], (scour_data_df['Scour Datum Elev.'].values[0] - ground_line["contract_scour"].values[0])],
-                    [pier_data_dict[individual_pier_ids[-1]]['Bent CL Sta'], (scour_data_df['Scour Datum Elev.'].values[0] - ground_line["contract_scour"].values[0])]]
-    
-    wse = [[pier_data_dict[individual_pier_ids[0]]['Bent CL Sta'], wse_data[wse_flag].values[0]],
-           [pier_data_dict[individual_pier_ids[-1]]['Bent CL Sta'], wse_data[wse_flag].values[0]]]
-                    
+    profile, scour_data_copy = calculate_scour_profile(bridge_section, year)
+
+    first_station = bridge_section.bent_cl_sta[0]
+    last_station = bridge_section.bent_cl_sta[-1]
+    cl_lsd = [[first_station, (bridge_section.scour_datum_elev - bridge_section.cs_ltd_depth[cs_ltd])],
+              [last_station, (bridge_section.scour_datum_elev - bridge_section.cs_ltd_depth[cs_ltd])]]
+
+    contraction_instable = [[first_station, (bridge_section.scour_datum_elev - profile["contract_scour"][0])],
+                            [last_station, (bridge_section.scour_datum_elev - profile["contract_scour"][0])]]
+
+    wse = [[first_station, bridge_section.wse[wse_flag]],
+           [last_station, bridge_section.wse[wse_flag]]]
+
+    if static_layers is None:
+        static_layers = build_static_layers(bridge_section)
+
     fig, ax = plt.subplots()
-    
-    i=0
-    scour_data_copy = []
-    for pier_id in individual_pier_ids:
-        # Calculate the plotting data for the pier
-        pier_plotting_data_left, pier_plotting_data_right = calculate_pier_data(pier_data_dict,pier_id)
-        # Plot the left and right sides of the pier
-        ax.plot([x[0] for x in pier_plotting_data_left], [x[1] for x in pier_plotting_data_left], color='black',linewidth=1)
-        ax.plot([x[0] for x in pier_plotting_data_right], [x[1] for x in pier_plotting_data_right], color='black',linewidth=1)
-        # If the pier is not the first or last pier, calculate and plot the scour data
-        if i > 0 and i < len(individual_pier_ids)-1:
-            scour_data_array = calculate_scour_data(pier_data_dict,pier_id, scour_data_df,ground_line, year)
-            scour_data_copy.append(scour_data_array)
-        
-            if i == 1:
-                # Plot the scour data for the first pier (100 year), only add label for last iteration
-                ax.plot([x[0] for x in scour_data_array], [x[1] for x in scour_data_array], color='red',linestyle=':',linewidth=2, label = "Local Scour (LS) at Pier")
-            else:
-                ax.plot([x[0] for x in scour_data_array], [x[1] for x in scour_data_array], color='red',linestyle=':',linewidth=2)
-        i+=1
-    
-    for station in scour_data_copy:
-        # Find the closest left and right stations in the ground line to the scour holes plotted at each pier
-        # This is done to ensure that the scour holes are plotted at the correct locations on the ground line
-        # and that the lt_deg values are updated correctly
-        # Find the closest left and right stations in the ground line to the scour holes plotted at each pier
-        left = min(ground_line['Offset Station'], key=lambda x: abs(x - station[0][0]))
-        right = min(ground_line['Offset Station'], key=lambda x: abs(x - station[2][0]))
-        # Get the index of the left and right stations in the ground line
-        left_index = ground_line['Offset Station'][ground_line['Offset Station'] == left].index.tolist()
-        right_index = ground_line['Offset Station'][ground_line['Offset Station'] == right].index.tolist()
-        # Set the lt_deg values to NaN for the range between the left and right stations
-        # This is done to ensure that the lt_deg values are updated correctly
-        ground_line.loc[left_index[0]:right_index[0], ["contract_scour"]] = np.nan
-        ground_line.loc[left_index[0]:right_index[0], ['lt_deg']] = np.nan
-        ground_line.loc[left_index[0]:right_index[0], ["abut_scour"]] = np.nan
-        # Replace the lt_deg, abutment scour, and contraction scour values at the left and right stations with the values from the scour holes
-        ground_line.loc[left_index[0], ["lt_deg"]] = station[0][1]
-        ground_line.loc[right_index[0], ["lt_deg"]] = station[2][1]
-        ground_line.loc[left_index[0], ["abut_scour"]] = station[0][1]
-        ground_line.loc[right_index[0], ["abut_scour"]] = station[2][1]
-        ground_line.loc[left_index[0], ["contract_scour"]] = station[0][1]
-        ground_line.loc[right_index[0], ["contract_scour"]] = station[2][1]
-        
-        
-
-
-    
-    if lateral_stability['Laterally Stable Channel?'].values[0] == 'No':
+    # Draw the pier outlines and chords, then the scour overlays for this recurrence interval on top
+    draw_static_layers(ax, static_layers)
+
+    scour_hole_x, scour_hole_y = _scour_hole_lines(scour_data_copy)
+    ax.plot(scour_hole_x, scour_hole_y, color='red',linestyle=':',linewidth=2, label = "Local Scour (LS) at Pier")
+
+    if not bridge_section.laterally_stable:
         ax.plot([x[0] for x in cl_lsd], [x[1] for x in cl_lsd], color='#E98300', label='CS + LTD')
-        #ax.plot([x[0] for x in local_instable], [x[1] for x in local_instable], color='#0073CF', label='Local Scour')
         ax.plot([x[0] for x in contraction_instable], [x[1] for x in contraction_instable], color='#FCD450', label='Contraction Scour (CS)')
     else:
-        ax.plot(ground_line['Offset Station'], ground_line['lt_deg'], color='#E98300', label='Total Scour (LTD + CS + LS)')
-        ax.plot(ground_line['Offset Station'], ground_line["abut_scour"], color='#0073CF', label='Abutment Scour (AS)')
-        ax.plot(ground_line['Offset Station'], ground_line["contract_scour"], color='#FCD450', label='Contraction Scour (CS)')
-
-    
-    ax.plot(ground_line['Offset Station'], ground_line['Elev'], color='green', label='Ground Line')
-    
-    ax.plot(bridge_low_chord['Bent CL Sta'], bridge_low_chord['Low Chord Elev'], color='black' )
-    ax.plot(bridge_high_chord['Bent CL Sta'], bridge_high_chord['High Chord Elev'], color='black')
-    
-    
-    
+        ax.plot(profile['station'], profile['lt_deg'], color='#E98300', label='Total Scour (LTD + CS + LS)')
+        ax.plot(profile['station'], profile["abut_scour"], color='#0073CF', label='Abutment Scour (AS)')
+        ax.plot(profile['station'], profile["contract_scour"], color='#FCD450', label='Contraction Scour (CS)')
+
+
+    if envelope is not None:
+        _draw_envelope(ax, envelope, '#E98300', 'Total Scour' if bridge_section.laterally_stable else 'CS + LTD')
+
+    ax.plot(static_layers["ground_line"][:, 0], static_layers["ground_line"][:, 1], color='green', label='Ground Line')
+
     ax.plot([x[0] for x in wse], [x[1] for x in wse], color='blue',linewidth=2,linestyle=':', label='WSE')
-    
-    plt.axvline(x=0, color='grey',linewidth=.5)
-    y_axis_range = ax.get_ylim()
-    y_ticks = range(int(y_axis_range[0]),int(y_axis_range[1]),1)
 
     # Add horizontal ticks
-    for y in y_ticks:
-        plt.hlines(y=y,xmin = -5, xmax = 0, color='grey',linewidth=1)
+    _draw_elevation_ticks(ax)
     plt.xlabel('Station [ft]', weight='bold')
-    plt.ylabel('Elevation [ft-NAVD88]', weight='bold')    
+    plt.ylabel('Elevation [ft-NAVD88]', weight='bold')
     plt.title(recurrence_title, weight='bold')
-    
-    
+
+
 
     loc = plticker.MultipleLocator(base=10)
     loc_major = plticker.MultipleLocator(base=50)
@@ -340,157 +294,73 @@ def generate_figure(pier_data_dict,
     plt.grid(axis='y')
     ax.legend()
     plt.gcf().set_size_inches(17, 11)
-    
+
     return fig
-    
-
-def generate_summary_figure(pier_data_dict, 
-                          individual_pier_ids,
-                          bridge_low_chord, 
-                          bridge_high_chord, 
-                          ground_line,
-                          scour_data_df,
-                          bank_stations, 
-                          lateral_stability,
-                          lt_deg, 
-                          abt_scour_elev, 
-                          abut_stat, wse_data, 
-                          recurrence_data
-                         ):
-    
+
+
+def generate_summary_figure(bridge_section, recurrence_data, static_layers = None, envelopes = None):
+
     """
     Generates a summary figure for scour data across multiple recurrence intervals.
     Args:
-        pier_data_dict (dict): Dictionary containing pier data.
-        individual_pier_ids (list): List of individual pier IDs.
-        bridge_low_chord (DataFrame): DataFrame containing low chord data.
-        bridge_high_chord (DataFrame): DataFrame containing high chord data.
-        ground_line (DataFrame): DataFrame containing ground line data.
-        scour_data_df (DataFrame): DataFrame containing scour data.
-        bank_stations (DataFrame): DataFrame containing bank station data.
-        lateral_stability (DataFrame): DataFrame containing lateral stability data.
-        lt_deg (DataFrame): DataFrame containing long term degradation data.
-        abt_scour_elev (DataFrame): DataFrame containing abutment scour elevation data.
-        abut_stat (DataFrame): DataFrame containing abutment station data.
-        wse_data (DataFrame): DataFrame containing water surface elevation data.
+        bridge_section (BridgeSection): The bridge section returned by parse_bridge_section.
         recurrence_data (list): List of recurrence data for different years.
+        static_layers (dict): The layers returned by build_static_layers. They are built from the bridge section if None.
+        envelopes (list): The uncertainty bands returned by scour_envelope for each recurrence interval, drawn if given.
     Returns:
         fig (Figure): The generated summary figure.
     """
+    if static_layers is None:
+        static_layers = build_static_layers(bridge_section)
+
     fig, ax = plt.subplots()
+    draw_static_layers(ax, static_layers)
     iteration = 0
     for year in recurrence_data:
-        
-        abut_scour_flag = year[4]
+
         cs_ltd = year[0]
-        scour_data_array = []
-        
-        left_station = abut_stat['Abt Toe Left Sta.'].values[0]
-        right_station = abut_stat['Abt Toe Right Sta.'].values[0]
-
-        ground_line.loc[(ground_line['Offset Station'] > bank_stations['Channel Bank Sta.'].values[0]) & (ground_line['Offset Station'] < bank_stations['Channel Bank Sta.'].values[1]), "channel"] = "Channel"
-        ground_line.loc[(ground_line['Offset Station'] < left_station) | (ground_line['Offset Station'] > right_station), "channel"] = "Abutment"
-        
-        # Assign initial values for lt_deg, contract_scour, and abut_scour
-        ground_line = ground_line.assign(lt_deg = 0.0)
-        ground_line = ground_line.assign(contract_scour = 0.0)
-        ground_line = ground_line.assign(abut_scour = 0.0)
-
-        # Update lt_deg, contract_scour, and abut_scour based on channel type
-        for idx, row in ground_line.iterrows():
-            if row['channel'] == "Abutment":
-                ground_line.at[idx, 'abut_scour'] = abt_scour_elev[abut_scour_flag].values[0]
-                ground_line.at[idx, 'contract_scour'] = np.nan
-                ground_line.at[idx, 'lt_deg'] = abt_scour_elev[abut_scour_flag].values[0]
-            elif row['channel'] == "Channel":
-                
-                ground_line.at[idx, 'lt_deg'] = row['Elev'] - lt_deg['Long Term Deg'].values[0] - scour_data_df[cs_ltd].values[0] 
-                ground_line.at[idx, 'contract_scour'] = row['Elev'] - scour_data_df[cs_ltd].values[0] 
-                ground_line.at[idx, 'abut_scour'] = np.nan
-            else:
-                ground_line.at[idx, 'lt_deg'] = row['Elev'] - scour_data_df[cs_ltd].values[0] 
-                ground_line.at[idx, 'contract_scour'] = row['Elev'] - scour_data_df[cs_ltd].values[0] 
-                ground_line.at[idx, 'abut_scour'] = row['Elev'] - scour_data_df[cs_ltd].values[0]
-        
-
-        cl_lsd = [[pier_data_dict[individual_pier_ids[0]]['Bent CL Sta'], (scour_data_df['Scour Datum Elev.'].values[0] - scour_data_df[cs_ltd].values[0])],
-                        [pier_data_dict[individual_pier_ids[-1]]['Bent CL Sta'], (scour_data_df['Scour Datum Elev.'].values[0] - scour_data_df[cs_ltd].values[0])]]
-        
-    
-        i=0
-        scour_data_copy = []
-        
-        for pier_id in individual_pier_ids:
-            # Calculate the plotting data for the pier
-            pier_plotting_data_left, pier_plotting_data_right = calculate_pier_data(pier_data_dict,pier_id)
-            scour_data_array = calculate_scour_data(pier_data_dict,pier_id, scour_data_df,ground_line, year)
-            # Plot the left and right sides of the pier
-            ax.plot([x[0] for x in pier_plotting_data_left], [x[1] for x in pier_plotting_data_left], color='black',linewidth=1)
-            ax.plot([x[0] for x in pier_plotting_data_right], [x[1] for x in pier_plotting_data_right], color='black',linewidth=1)
-
-            if i > 0 and i < len(individual_pier_ids)-1:
-                # Calculate scour data for the pier and append to the list
-                # This is done to ensure that the scour holes are plotted at the correct locations on the ground line
-                scour_data_array = calculate_scour_data(pier_data_dict,pier_id, scour_data_df,ground_line, year)
-                scour_data_copy.append(scour_data_array)
-            
-                if iteration == 0:
-                    # Plot the scour data for the first iteration (100 year)
-                    ax.plot([x[0] for x in scour_data_array], [x[1] for x in scour_data_array], color='grey',linewidth=2)
-                else:
-                    # Plot the scour data for the second iteration (500 year)
-                    ax.plot([x[0] for x in scour_data_array], [x[1] for x in scour_data_array], color='red',linestyle=':',linewidth=2)
-            i+=1
-
-
-        for station in scour_data_copy:
-            # Find the closest left and right stations in the ground line to the scour holes plotted at each pier
-            left = min(ground_line['Offset Station'], key=lambda x: abs(x - station[0][0]))
-            right = min(ground_line['Offset Station'], key=lambda x: abs(x - station[2][0]))
-            # Get the index of the left and right stations in the ground line
-            # This is done to ensure that the scour holes are plotted at the correct locations on the ground line
-            # and that the lt_deg values are updated correctly
-            left_index = ground_line['Offset Station'][ground_line['Offset Station'] == left].index.tolist()
-            right_index = ground_line['Offset Station'][ground_line['Offset Station'] == right].index.tolist()
-            # Set the lt_deg values to NaN for the range between the left and right stations
-            ground_line.loc[left_index[0]:right_index[0], ['lt_deg']] = np.nan
-            # Replace the lt_deg values at the left and right stations with the values from the scour holes
-            ground_line.loc[left_index[0], ["lt_deg"]] = station[0][1]
-            ground_line.loc[right_index[0], ["lt_deg"]] = station[2][1]
-           
+
+        profile, scour_data_copy = calculate_scour_profile(bridge_section, year)
+
+        cl_lsd = [[bridge_section.bent_cl_sta[0], (bridge_section.scour_datum_elev - bridge_section.cs_ltd_depth[cs_ltd])],
+                  [bridge_section.bent_cl_sta[-1], (bridge_section.scour_datum_elev - bridge_section.cs_ltd_depth[cs_ltd])]]
+
+        scour_hole_x, scour_hole_y = _scour_hole_lines(scour_data_copy)
+        if iteration == 0:
+            # Plot the scour data for the first iteration (100 year)
+            ax.plot(scour_hole_x, scour_hole_y, color='grey',linewidth=2)
+        else:
+            # Plot the scour data for the second iteration (500 year)
+            ax.plot(scour_hole_x, scour_hole_y, color='red',linestyle=':',linewidth=2)
 
         if iteration == 0:
             #plot total scour for 100 year
-            ax.plot(ground_line['Offset Station'], ground_line['Elev'], color='green', label='Ground Line')
-            ax.plot(bridge_low_chord['Bent CL Sta'], bridge_low_chord['Low Chord Elev'], color='black' )
-            ax.plot(bridge_high_chord['Bent CL Sta'], bridge_high_chord['High Chord Elev'], color='black')
-            
-            if lateral_stability['Laterally Stable Channel?'].values[0] == 'No':
+            ax.plot(static_layers["ground_line"][:, 0], static_layers["ground_line"][:, 1], color='green', label='Ground Line')
+
+            if not bridge_section.laterally_stable:
                 ax.plot([x[0] for x in cl_lsd], [x[1] for x in cl_lsd], color='#E98300')
             else:
-                ax.plot(ground_line['Offset Station'], ground_line['lt_deg'],color='grey',linewidth=2, label = "Total Scour - 100YR")
+                ax.plot(profile['station'], profile['lt_deg'],color='grey',linewidth=2, label = "Total Scour - 100YR")
         else:
             #plot total scour for 500 year
-            if lateral_stability['Laterally Stable Channel?'].values[0] == 'No':
+            if not bridge_section.laterally_stable:
                 ax.plot([x[0] for x in cl_lsd], [x[1] for x in cl_lsd], color='#E98300')
             else:
-                ax.plot(ground_line['Offset Station'], ground_line['lt_deg'], color='red',linestyle=':',linewidth=2, label = "Total Scour - 500YR")
-              
-        iteration += 1
+                ax.plot(profile['station'], profile['lt_deg'], color='red',linestyle=':',linewidth=2, label = "Total Scour - 500YR")
 
+        if envelopes is not None:
+            _draw_envelope(ax, envelopes[iteration], 'grey' if iteration == 0 else 'red', f"Total Scour - {'100YR' if iteration == 0 else '500YR'}")
+
+        iteration += 1
 
-    plt.axvline(x=0, color='grey',linewidth=.5)
-    y_axis_range = ax.get_ylim()
-    y_ticks = range(int(y_axis_range[0]),int(y_axis_range[1]),1)
 
     # Add horizontal ticks
-    for y in y_ticks:
-        plt.hlines(y=y,xmin = -5, xmax = 0, color='grey',linewidth=1)
+    _draw_elevation_ticks(ax)
     plt.xlabel('Station [ft]', weight='bold')
-    plt.ylabel('Elevation [ft-NAVD88]', weight='bold')    
+    plt.ylabel('Elevation [ft-NAVD88]', weight='bold')
     plt.title("Scour Summary", weight='bold')
-    
-    
+
+
 
     loc = plticker.MultipleLocator(base=10)
     loc_major = plticker.MultipleLocator(base=50)
@@ -502,4 +372,4 @@ def generate_summary_figure(pier_data_dict,
     plt.gcf().set_size_inches(17, 11)
 
     return fig
-    
\ No newline at end of file
+
@@ -0,0 +1,188 @@
+import numpy as np
+
+
+DISTRIBUTIONS = ["Normal", "Lognormal", "Uniform", "Triangular"]
+
+# Uncertain scour inputs and the default distribution and spread of each, the spread is a fraction of the value
+UNCERTAIN_PARAMETERS = {
+    "Local Scour Depth": ("Normal", 0.2),
+    "CS + LTD Depth": ("Normal", 0.2),
+    "Long Term Deg": ("Uniform", 0.5),
+}
+
+# Number of ground line stations evaluated at once. The (stations x samples) block and the scratch arrays of the scour
+# hole sides are small enough to stay in the processor cache between the broadcast operations on them.
+STATION_BLOCK = 32
+
+
+def sample_factors(rng, distribution:str, spread:float, n_samples:int) -> np.ndarray:
+    """
+    Samples multiplicative factors with a mean of one from a distribution.
+    Args:
+        rng (Generator): NumPy random generator.
+        distribution (str): One of DISTRIBUTIONS.
+        spread (float): Coefficient of variation for the Normal and Lognormal distributions,
+            half width as a fraction of the value for the Uniform and Triangular distributions.
+        n_samples (int): Number of samples.
+    Returns:
+        ndarray: (samples x 1) array of non negative factors.
+    """
+    if distribution == "Normal":
+        factors = 1.0 + spread * rng.standard_normal(n_samples)
+    elif distribution == "Lognormal":
+        sigma = np.sqrt(np.log1p(spread**2))
+        factors = rng.lognormal(-sigma**2 / 2, sigma, n_samples)
+    elif distribution == "Uniform":
+        factors = rng.uniform(1.0 - spread, 1.0 + spread, n_samples)
+    elif distribution == "Triangular":
+        factors = rng.triangular(1.0 - spread, 1.0, 1.0 + spread, n_samples) if spread > 0 else np.ones(n_samples)
+    else:
+        raise ValueError(f"Unknown distribution '{distribution}', expected one of {DISTRIBUTIONS}.")
+    # scour depths can not be negative
+    return np.maximum(factors, 0.0)[:, None]
+
+
+def _nearest_indices(stations, targets) -> tuple:
+    """
+    Finds the closest and second closest ground line stations to each target, as calculate_scour_profile
+    and calculate_scour_data do, using a binary search on the sorted stations.
+    """
+    position = np.searchsorted(stations, targets)
+    candidates = np.clip(position[..., None] + np.arange(-2, 2), 0, len(stations) - 1)
+    distance = np.abs(stations[candidates] - targets[..., None])
+    # stations repeated by the clipping at the ends of the ground line are only counted once
+    distance[..., 1:][candidates[..., 1:] == candidates[..., :-1]] = np.inf
+    order = np.argsort(distance, axis=-1, kind='stable')
+    return (np.take_along_axis(candidates, order[..., :1], axis=-1)[..., 0],
+            np.take_along_axis(candidates, order[..., 1:2], axis=-1)[..., 0])
+
+
+def scour_envelope(bridge_section, year, parameters:dict = None, n_samples:int = 10000,
+                   percentiles:tuple = (5, 95), seed:int = 0) -> dict:
+    """
+    Calculates percentile bands of the total scour line from Monte Carlo realizations of the uncertain scour inputs.
+    Each realization scales the local scour depth of every pier, the contraction scour and the long term degradation
+    by a sampled factor, and the total scour line with its local scour holes is evaluated for all realizations at once
+    as a (stations x samples) array, in blocks of the stations the scour holes can reach. Each side of a scour hole is
+    broadcast over the block up to the last realization whose scour hole reaches its stations.
+    Args:
+        bridge_section (BridgeSection): The bridge section returned by parse_bridge_section.
+        year (list): List containing recurrence interval data for the year.
+        parameters (dict): Distribution and spread of each of UNCERTAIN_PARAMETERS. The defaults are used if None.
+        n_samples (int): Number of realizations.
+        percentiles (tuple): The lower and upper percentiles of the band.
+        seed (int): Seed of the random generator, so the same inputs give the same band.
+    Returns:
+        dict: The band with keys 'station', 'low', 'median' and 'high', and the 'percentiles' of the band.
+    """
+    parameters = {**UNCERTAIN_PARAMETERS, **(parameters or {})}
+    rng = np.random.default_rng(seed)
+    local_factor, cs_ltd_factor, lt_deg_factor = [sample_factors(rng, *parameters[name], n_samples) for name in UNCERTAIN_PARAMETERS]
+
+    local_scour = local_factor * bridge_section.local_scour_depth[year[1]][1:-1]
+    cs_ltd = cs_ltd_factor * bridge_section.cs_ltd_depth[year[0]]
+    long_term_deg = lt_deg_factor * bridge_section.long_term_deg
+
+    if not bridge_section.laterally_stable:
+        # The unstable channel is drawn as a flat CS + LTD line between the abutments
+        stations = bridge_section.bent_cl_sta[[0, -1]]
+        total = np.repeat(bridge_section.scour_datum_elev - cs_ltd, 2, axis=1)
+        low, median, high = np.percentile(total, [percentiles[0], 50, percentiles[1]], axis=0)
+        return {"station": stations, "low": low, "median": median, "high": high, "percentiles": percentiles}
+
+    stations = bridge_section.ground_station
+    elevations = bridge_section.ground_elev
+    channel = (stations > bridge_section.bank_stations[0]) & (stations < bridge_section.bank_stations[1])
+    abutment = (stations < bridge_section.abut_toe_left_sta) | (stations > bridge_section.abut_toe_right_sta)
+    channel = channel & ~abutment
+    abutment_elev = bridge_section.abut_scour_elev[year[4]]
+
+    def total_scour(index, cs, ltd):
+        # total scour line before the scour holes at ground line indices, broadcast against the sampled depths
+        contraction_elev = elevations[index] - cs
+        return np.where(abutment[index], abutment_elev, np.where(channel[index], contraction_elev - ltd, contraction_elev))
+
+    # Scour hole points of each realization and interior pier, as in calculate_scour_data
+    center = bridge_section.bent_cl_sta[1:-1]
+    left = center - 2*local_scour
+    right = center + 2*local_scour
+    left_value = total_scour(_nearest_indices(stations, left)[1], cs_ltd, long_term_deg)
+    right_value = total_scour(_nearest_indices(stations, right)[1], cs_ltd, long_term_deg)
+    center_value = total_scour(_nearest_indices(stations, center)[1], cs_ltd, long_term_deg) - local_scour - cs_ltd
+
+    # Away from the scour holes the total scour line is the ground elevation less a sampled depth, so its percentiles
+    # follow directly from the percentiles of that depth and only the stations a scour hole can reach are evaluated
+    # for every realization
+    quantiles = [100 - percentiles[0], 50, 100 - percentiles[1]]
+    contraction = np.percentile(cs_ltd, quantiles)
+    degradation = np.percentile(cs_ltd + long_term_deg, quantiles)
+    band = np.where(abutment, abutment_elev,
+                    elevations - np.where(channel, degradation[:, None], contraction[:, None]))
+
+    spans = [np.arange(np.searchsorted(stations, left[:, pier].min()), np.searchsorted(stations, right[:, pier].max(), side='right'))
+             for pier in range(len(center))]
+    hole_stations = np.unique(np.concatenate(spans)) if spans else np.empty(0, dtype=np.int64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # each side of a scour hole is the line value = intercept + slope * station in every realization
+        left_slope = (center_value - left_value) / (center - left)
+        right_slope = (right_value - center_value) / (right - center)
+    left_intercept = left_value - left_slope * left
+    right_intercept = center_value - right_slope * center
+
+    # The realizations are ordered by decreasing local scour factor, so the realizations whose scour hole reaches a
+    # station are the leading columns of its row and only those are evaluated. The percentiles do not depend on the order.
+    order = np.argsort(-local_factor[:, 0], kind='stable')
+    cs_row = cs_ltd[order, 0]
+    degradation_row = cs_row + long_term_deg[order, 0]
+    left, right, left_slope, right_slope, left_intercept, right_intercept = (
+        np.ascontiguousarray(array[order].T) for array in (left, right, left_slope, right_slope, left_intercept, right_intercept))
+    # a side only reaches past the pier centerline in the realizations with some local scour
+    left_reach = [np.searchsorted(left[pier], center[pier]) for pier in range(len(center))]
+    right_reach = [np.searchsorted(-right[pier], -center[pier]) for pier in range(len(center))]
+
+    # the blocks and the scratch arrays of the scour hole sides are allocated once and reused for every block
+    block_size = min(STATION_BLOCK, len(hole_stations))
+    buffer = np.empty((block_size, n_samples))
+    hole_buffer = np.empty((block_size, n_samples))
+    side_buffer = np.empty((block_size, n_samples))
+    reach_buffer = np.empty((block_size, n_samples), dtype=bool)
+    columns = np.arange(n_samples)
+
+    def carve(hole, x, counts, intercept, slope):
+        # lowers the scour hole of the leading realizations of each row to a side of a pier's scour hole, broadcast over
+        # the (stations x realizations) the side reaches, so overlapping scour holes keep the lower of the two
+        rows, width = len(x), counts.max(initial=0)
+        if width == 0:
+            return
+        side = np.multiply(slope[:width], x[:, None], out=side_buffer[:rows, :width])
+        np.add(side, intercept[:width], out=side)
+        reach = np.less(columns[:width], counts[:, None], out=reach_buffer[:rows, :width])
+        np.minimum(hole[:, :width], side, out=hole[:, :width], where=reach)
+
+    # The blocks are (stations x samples) so each row is sorted in place and the percentiles are read at their ranks
+    ranks = np.array([percentiles[0], 50, percentiles[1]]) / 100 * (n_samples - 1)
+    lower = np.floor(ranks).astype(np.int64)
+    upper = np.ceil(ranks).astype(np.int64)
+    for start in range(0, len(hole_stations), STATION_BLOCK):
+        block = hole_stations[start:start + STATION_BLOCK]
+        x = stations[block]
+        values = buffer[:len(block)]
+        np.subtract(elevations[block, None], cs_row, out=values, where=~channel[block, None])
+        np.subtract(elevations[block, None], degradation_row, out=values, where=channel[block, None])
+        np.copyto(values, abutment_elev, where=abutment[block, None])
+        hole = hole_buffer[:len(block)]
+        hole.fill(np.inf)
+        for pier in np.flatnonzero((left[:, 0] <= x[-1]) & (right[:, 0] >= x[0])):
+            # only the stations of this block within reach of each side of the pier's scour hole are updated
+            first = np.searchsorted(x, left[pier, 0])
+            middle = np.searchsorted(x, center[pier], side='right')
+            last = np.searchsorted(x, right[pier, 0], side='right')
+            counts = np.minimum(np.searchsorted(left[pier], x[first:middle], side='right'), left_reach[pier])
+            carve(hole[first:middle], x[first:middle], counts, left_intercept[pier], left_slope[pier])
+            counts = np.minimum(np.searchsorted(-right[pier], -x[middle:last], side='right'), right_reach[pier])
+            carve(hole[middle:last], x[middle:last], counts, right_intercept[pier], right_slope[pier])
+        np.copyto(values, hole, where=hole < np.inf)
+        values.sort(axis=1)
+        low_value = values[:, lower]
+        band[:, block] = (low_value + (values[:, upper] - low_value) * (ranks - lower)).T
+    return {"station": stations, "low": band[0], "median": band[1], "high": band[2], "percentiles": percentiles}
@@ -0,0 +1,401 @@
+"""
+Local HTTP service for DxV extraction and scour figure rendering, for tools that do not go through the Streamlit pages.
+
+Run from the src folder:
+    python -m utils.service_utils.http_service --port 8765 --workers 4
+
+Endpoints, all answering with newline delimited JSON (one object per line, streamed as results are ready):
+    GET  /health   The worker count and the number of queued jobs.
+    POST /extract  JSON body with the local paths 'map_file', 'geom_file', 'depth_file' and 'velocity_file',
+                   and optionally 'search_radius' (ft, default 8) and 'scour_run' (default 'Bridge Scour').
+                   Streams one line per pier node with the maximum DxV found by find_mesh_points.
+    POST /extract?stream=false and /render?stream=false answer with a single JSON document instead.
+    POST /render   The contents of scour_data.csv as the body. Streams one line per figure, each recurrence
+                   interval and the summary, with the PNG encoded in base64.
+
+Every response starts with an 'accepted' line holding the SHA-256 digest of the request inputs and ends with a
+'done' line. Identical requests that are queued, running or recently finished share the same jobs. The service only
+binds to the loopback interface and answers 503 when the job queue is full.
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import io
+import ipaddress
+import json
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from ..startup_utils.lazy_import import lazy_import
+
+
+pd = lazy_import("pandas")
+
+DEFAULT_PORT = 8765
+
+# Most jobs a service holds queued or running at once, further requests are refused with 503
+DEFAULT_MAX_PENDING = 32
+
+# Number of finished jobs kept so repeated requests are answered without running them again
+DEFAULT_CACHE_SIZE = 64
+
+# Largest request body accepted, scour_data.csv files and extraction requests are far smaller
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+EXTRACT_FILES = ["map_file", "geom_file", "depth_file", "velocity_file"]
+
+
+class ServiceError(Exception):
+    """
+    Raised for a request the service can not run, with the HTTP status to answer with.
+    """
+    def __init__(self, status:int, message:str):
+        super().__init__(message)
+        self.status = status
+
+
+def _quiet_streamlit(streamlit):
+    # find_mesh_points reports progress through streamlit, which only logs warnings outside of a page
+    streamlit.logger.set_log_level("error")
+
+
+def _init_worker():
+    """
+    Prepares a worker process. Figures are drawn off screen and streamlit is silenced if a job imports it.
+    """
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    lazy_import("streamlit", on_load=_quiet_streamlit)
+
+
+def _extract_job(request:dict) -> list:
+    """
+    Runs find_mesh_points for the piers of a map file in a worker process.
+    Args:
+        request (dict): The validated body of an /extract request.
+    Returns:
+        list: One dict per pier node with the columns returned by find_mesh_points.
+    """
+    from ..dxv_utils.find_pier_nodes import read_map_file, read_geom_file, find_mesh_points
+
+    pier_data, arc_node_mapping = read_map_file(request["map_file"], request["scour_run"])
+    model_nodes = read_geom_file(request["geom_file"])
+    max_nodes = find_mesh_points(pier_data, model_nodes, arc_node_mapping, request["depth_file"],
+                                 os.path.basename(request["depth_file"]), request["velocity_file"], request["search_radius"])
+    # round trip through JSON so numpy scalars become plain numbers that can be sent back to the service
+    return json.loads(max_nodes.to_json(orient="records"))
+
+
+def _render_job(bridge_section, years:list, static_layers:dict) -> dict:
+    """
+    Renders the figure of one recurrence interval, or the summary figure if several are given, in a worker process.
+    Args:
+        bridge_section (BridgeSection): The bridge section returned by parse_bridge_section.
+        years (list): The recurrence data of the figure, as returned by recurrence_txt.
+        static_layers (dict): The layers returned by build_static_layers.
+    Returns:
+        dict: The figure title and its PNG encoded in base64.
+    """
+    from ..plotting_utils.scour_plotting_utils import generate_figure, generate_summary_figure, plt
+
+    if len(years) == 1:
+        title, figure = years[0][-1], generate_figure(bridge_section, years[0], static_layers)
+    else:
+        title, figure = "Scour Summary", generate_summary_figure(bridge_section, years, static_layers)
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png")
+    plt.close(figure)
+    return {"figure": title, "png": base64.b64encode(buffer.getvalue()).decode("ascii")}
+
+
+def _file_stamp(path:str) -> list:
+    """
+    Returns the size and modification time of a file, so a changed file is not served from an earlier job.
+    """
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def input_digest(kind:str, *parts) -> str:
+    """
+    Returns the SHA-256 digest used to deduplicate jobs.
+    Args:
+        kind (str): The kind of job, so the same inputs to different endpoints are kept apart.
+        parts: Bytes, or values that are encoded as canonical JSON.
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256(kind.encode())
+    for part in parts:
+        digest.update(b"|")
+        digest.update(part if isinstance(part, bytes) else json.dumps(part, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def parse_extract_request(body:bytes) -> dict:
+    """
+    Validates the body of an /extract request.
+    Args:
+        body (bytes): The JSON request body.
+    Returns:
+        dict: The request with the defaults filled in and absolute file paths.
+    Raises:
+        ServiceError: If the body is not valid JSON, a file is missing or the search radius is not a positive number.
+    """
+    try:
+        request = json.loads(body)
+    except ValueError as error:
+        raise ServiceError(400, f"The request body is not valid JSON: {error}")
+    if not isinstance(request, dict):
+        raise ServiceError(400, "The request body must be a JSON object.")
+
+    missing = [key for key in EXTRACT_FILES if not isinstance(request.get(key), str)]
+    if missing:
+        raise ServiceError(400, f"The request is missing the file paths: {', '.join(missing)}.")
+    parsed = {key: os.path.abspath(request[key]) for key in EXTRACT_FILES}
+    not_found = [parsed[key] for key in EXTRACT_FILES if not os.path.isfile(parsed[key])]
+    if not_found:
+        raise ServiceError(400, f"Files not found: {', '.join(not_found)}.")
+
+    search_radius = request.get("search_radius", 8)
+    if isinstance(search_radius, bool) or not isinstance(search_radius, (int, float)) or not search_radius > 0:
+        raise ServiceError(400, "'search_radius' must be a positive number.")
+    parsed["search_radius"] = float(search_radius)
+    parsed["scour_run"] = str(request.get("scour_run", "Bridge Scour"))
+    return parsed
+
+
+class JobQueue:
+    """
+    Runs jobs on a bounded process pool, sharing the job of identical requests.
+    Jobs are keyed by the digest of their inputs. A job that is queued or running is shared by every request for it,
+    and the last finished jobs are kept so repeated requests are answered straight away.
+    """
+
+    def __init__(self, workers:int = None, max_pending:int = DEFAULT_MAX_PENDING, cache_size:int = DEFAULT_CACHE_SIZE):
+        # worker processes are spawned rather than forked from the threaded server
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker)
+        self.max_pending = max_pending
+        self.cache_size = cache_size
+        self.pending = {}
+        self.finished = OrderedDict()
+        # reentrant because a job that is already done runs its done callback straight away
+        self.lock = threading.RLock()
+
+    def submit(self, jobs:dict) -> tuple:
+        """
+        Submits jobs that are not already queued, running or finished.
+        Args:
+            jobs (dict): Digest of each job to a tuple of the function and its arguments.
+        Returns:
+            tuple: Dict of digest to future, in the order of jobs, and the number of jobs shared with earlier requests.
+        Raises:
+            ServiceError: With status 503 if the new jobs do not fit in the queue.
+        """
+        with self.lock:
+            futures = {}
+            for key in jobs:
+                futures[key] = self.pending.get(key) or self.finished.get(key)
+                if key in self.finished:
+                    self.finished.move_to_end(key)
+            new = [key for key, future in futures.items() if future is None]
+            if len(self.pending) + len(new) > self.max_pending:
+                raise ServiceError(503, f"The job queue is full ({len(self.pending)} of {self.max_pending} jobs), retry later.")
+            for key in new:
+                function, *arguments = jobs[key]
+                futures[key] = self.pending[key] = self.executor.submit(function, *arguments)
+                futures[key].add_done_callback(lambda future, key=key: self._finish(key, future))
+        return futures, len(jobs) - len(new)
+
+    def _finish(self, key, future):
+        with self.lock:
+            self.pending.pop(key, None)
+            # failed jobs are not kept, so the request can be retried
+            if not future.cancelled() and future.exception() is None and self.cache_size > 0:
+                self.finished[key] = future
+                while len(self.finished) > self.cache_size:
+                    self.finished.popitem(last=False)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """
+    Answers the requests of the service. Results are streamed with chunked transfer encoding.
+    """
+    protocol_version = "HTTP/1.1"
+    server_version = "ScourPlottingService/1.0"
+
+    def do_GET(self):
+        if urlsplit(self.path).path != "/health":
+            return self._send_error(ServiceError(404, f"Unknown endpoint '{self.path}'."))
+        jobs = self.server.jobs
+        self._send_json(200, {"status": "ok", "workers": jobs.workers, "pending": len(jobs.pending), "max_pending": jobs.max_pending})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        stream = parse_qs(url.query).get("stream", ["true"])[0].lower() != "false"
+        try:
+            body = self._read_body()
+            if url.path == "/extract":
+                self._run_extract(body, stream)
+            elif url.path == "/render":
+                self._run_render(body, stream)
+            else:
+                raise ServiceError(404, f"Unknown endpoint '{url.path}'.")
+        except ServiceError as error:
+            self._send_error(error)
+        except (BrokenPipeError, ConnectionResetError):
+            return
+        except Exception as error:
+            # any other failure before the response is started still answers the client, as failed jobs do in _respond
+            self._send_error(ServiceError(500, f"The request failed: {error}"))
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise ServiceError(413, f"The request body is larger than {MAX_BODY_BYTES} bytes.")
+        return self.rfile.read(length)
+
+    def _run_extract(self, body:bytes, stream:bool):
+        request = parse_extract_request(body)
+        key = input_digest("extract", request, *[_file_stamp(request[name]) for name in EXTRACT_FILES])
+        futures, shared = self.server.jobs.submit({key: (_extract_job, request)})
+
+        def lines():
+            for row in futures[key].result():
+                yield {"status": "result", **row}
+        self._respond(key, shared, len(futures), lines(), stream)
+
+    def _run_render(self, body:bytes, stream:bool):
+        from ..plotting_utils.bridge_section import parse_bridge_section, BridgeDataError
+        from ..plotting_utils.scour_plotting_utils import recurrence_txt, build_static_layers
+
+        try:
+            bridge_section = parse_bridge_section(pd.read_csv(io.BytesIO(body)))
+        except (BridgeDataError, ValueError) as error:
+            raise ServiceError(400, str(error))
+        static_layers = build_static_layers(bridge_section)
+        recurrence_data = recurrence_txt()
+        key = input_digest("render", body)
+        # each figure is its own job so the figures are drawn in parallel and streamed as soon as each is ready
+        figures = [[year] for year in recurrence_data] + [recurrence_data]
+        futures, shared = self.server.jobs.submit({input_digest("render figure", body, years): (_render_job, bridge_section, years, static_layers)
+                                                   for years in figures})
+
+        def lines():
+            for future in as_completed(futures.values()):
+                yield {"status": "result", **future.result()}
+        self._respond(key, shared, len(futures), lines(), stream)
+
+    def _respond(self, key:str, shared:int, job_count:int, results, stream:bool):
+        """
+        Sends the results of a request, as they are ready if streaming, or as a single JSON document.
+        """
+        start = time.perf_counter()
+        accepted = {"status": "accepted", "digest": key, "jobs": job_count, "shared_jobs": shared}
+        if not stream:
+            try:
+                rows = [{name: value for name, value in line.items() if name != "status"} for line in results]
+            except Exception as error:
+                return self._send_error(ServiceError(500, f"The job failed: {error}"))
+            return self._send_json(200, {**accepted, "status": "done", "results": rows, "seconds": round(time.perf_counter() - start, 3)})
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self._write_line(accepted)
+        try:
+            count = 0
+            for line in results:
+                self._write_line(line)
+                count += 1
+            self._write_line({"status": "done", "results": count, "seconds": round(time.perf_counter() - start, 3)})
+        except (BrokenPipeError, ConnectionResetError):
+            return
+        except Exception as error:
+            # the status line is already sent, so a failed job is reported in the stream
+            self._write_line({"status": "error", "error": f"The job failed: {error}"})
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_line(self, data:dict):
+        line = json.dumps(data).encode() + b"\n"
+        self.wfile.write(f"{len(line):X}\r\n".encode() + line + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status:int, data:dict, headers:dict = None):
+        payload = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_error(self, error:ServiceError):
+        self._send_json(error.status, {"status": "error", "error": str(error)}, {"Retry-After": "1"} if error.status == 503 else None)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def create_server(port:int = DEFAULT_PORT, host:str = "127.0.0.1", workers:int = None,
+                  max_pending:int = DEFAULT_MAX_PENDING, cache_size:int = DEFAULT_CACHE_SIZE, quiet:bool = False) -> ThreadingHTTPServer:
+    """
+    Creates the service bound to a loopback address. Call serve_forever on the result to start answering requests
+    and server.jobs.shutdown() after server_close to stop the worker processes.
+    Args:
+        port (int): Port to listen on, 0 picks a free port.
+        host (str): Loopback address to bind to.
+        workers (int): Number of worker processes, one per CPU if None.
+        max_pending (int): Most jobs held queued or running at once.
+        cache_size (int): Number of finished jobs kept for repeated requests.
+        quiet (bool): Whether to skip logging each request.
+    Returns:
+        ThreadingHTTPServer: The server, with the job queue as its jobs attribute.
+    Raises:
+        ValueError: If host is not a loopback address.
+    """
+    if not ipaddress.ip_address(host).is_loopback:
+        raise ValueError(f"The service only runs on localhost, '{host}' is not a loopback address.")
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    server.daemon_threads = True
+    server.jobs = JobQueue(workers, max_pending, cache_size)
+    server.quiet = quiet
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve DxV extraction and scour figure rendering on localhost.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--host", default="127.0.0.1", help="loopback address to bind to")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, one per CPU by default")
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING, help="jobs held before answering 503")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE, help="finished jobs kept for repeated requests")
+    args = parser.parse_args()
+
+    server = create_server(args.port, args.host, args.workers, args.max_pending, args.cache_size)
+    print(f"Serving on http://{args.host}:{server.server_address[1]} with {server.jobs.workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.jobs.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Measures how long each page and the worker facing utility modules take to import in a fresh interpreter.
+
+Run from the src folder:
+    python -m utils.startup_utils.benchmark_startup
+    python -m utils.startup_utils.benchmark_startup --repeat 10 --src path/to/other/checkout/src
+"""
+import argparse
+import glob
+import os
+import subprocess
+import sys
+
+
+# Modules imported by worker processes, which should start without streamlit or the plotting libraries
+WORKER_MODULES = [
+    "utils.dxv_utils.read_srh_results",
+    "utils.dxv_utils.find_pier_nodes",
+    "utils.dxv_utils.dxv_hotspots",
+    "utils.dxv_utils.export_mesh_fields",
+    "utils.plotting_utils.scour_plotting_utils",
+]
+
+# Pages are run without their __main__ block, so only their imports are timed. Streamlit is imported first because
+# it is already loaded when the server imports a page.
+_PAGE_SCRIPT = """
+import runpy, sys, time
+import streamlit
+start = time.perf_counter()
+runpy.run_path(sys.argv[1], run_name="benchmark")
+print(time.perf_counter() - start)
+"""
+
+_MODULE_SCRIPT = """
+import importlib, sys, time
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+print(time.perf_counter() - start)
+"""
+
+
+def _time_script(script:str, argument:str, src:str, repeat:int) -> float:
+    """
+    Runs a timing script in fresh interpreters and returns the fastest time in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-c", script, argument], cwd=src, capture_output=True, text=True, check=True)
+        times.append(float(result.stdout.strip().splitlines()[-1]))
+    return min(times)
+
+
+def benchmark_startup(src:str, repeat:int = 5) -> dict:
+    """
+    Times the cold import of every page and of the worker modules.
+    Args:
+        src (str): Path to the src folder of the app.
+        repeat (int): Number of fresh interpreters each import is timed in, the fastest time is kept.
+    Returns:
+        dict: Seconds keyed by page file name or module name.
+    """
+    timings = {}
+    for page in sorted(glob.glob(os.path.join(src, "pages", "*.py"))):
+        timings[os.path.basename(page)] = _time_script(_PAGE_SCRIPT, os.path.abspath(page), src, repeat)
+    for module in WORKER_MODULES:
+        timings[module] = _time_script(_MODULE_SCRIPT, module, src, repeat)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the cold start of each page and worker module.")
+    parser.add_argument("--src", default=os.path.join(os.path.dirname(__file__), "..", ".."), help="src folder of the app")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per import, the fastest is reported")
+    args = parser.parse_args()
+
+    timings = benchmark_startup(os.path.abspath(args.src), args.repeat)
+    width = max(len(name) for name in timings)
+    for name, seconds in timings.items():
+        print(f"{name:<{width}}  {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import importlib
+import sys
+import threading
+import types
+
+
+_lazy_modules = {}
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stand-in for a module that imports it on first attribute access.
+    Once loaded, the module's attributes are copied onto the stand-in so later lookups cost the same as on the module itself.
+    The first access may come from several threads at once, so loading is done under a lock and the hooks are only
+    removed after the attributes are copied, which is what marks the stand-in as loaded.
+    """
+
+    def __init__(self, name:str):
+        super().__init__(name)
+        self.__dict__["_lazy_hooks"] = []
+        self.__dict__["_lazy_lock"] = threading.RLock()
+
+    def _load(self):
+        with self.__dict__["_lazy_lock"]:
+            module = importlib.import_module(self.__name__)
+            if "_lazy_hooks" in self.__dict__:
+                # the hooks run before the attributes are copied, so no other thread uses the module before they are done
+                hooks, self.__dict__["_lazy_hooks"] = self.__dict__["_lazy_hooks"], []
+                for hook in hooks:
+                    hook(module)
+                self.__dict__.update(module.__dict__)
+                self.__dict__.pop("_lazy_hooks", None)
+        return module
+
+    def __getattr__(self, attribute):
+        if "_lazy_hooks" not in self.__dict__:
+            raise AttributeError(f"module '{self.__name__}' has no attribute '{attribute}'")
+        return getattr(self._load(), attribute)
+
+    def __repr__(self):
+        state = "loaded" if "_lazy_hooks" not in self.__dict__ else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name:str, on_load=None):
+    """
+    Returns a module that is only imported when one of its attributes is first used.
+    Heavy dependencies imported this way do not slow down loading a page or starting a worker process until they are needed.
+    The module is returned directly if it has already been imported.
+    Args:
+        name (str): Full name of the module, e.g. "matplotlib.pyplot".
+        on_load (callable): Function called with the module once it is imported, e.g. to set library options.
+            It is called straight away if the module is already imported.
+    Returns:
+        module: The module or a LazyModule standing in for it.
+    """
+    if name in sys.modules and name not in _lazy_modules:
+        if on_load is not None:
+            on_load(sys.modules[name])
+        return sys.modules[name]
+
+    module = _lazy_modules.setdefault(name, LazyModule(name))
+    if on_load is not None:
+        with module.__dict__["_lazy_lock"]:
+            loaded = "_lazy_hooks" not in module.__dict__
+            if not loaded:
+                module.__dict__["_lazy_hooks"].append(on_load)
+        if loaded:
+            on_load(module)
+    return module
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import hashlib
+from datetime import datetime
+import numpy as np
+
+from ..startup_utils.lazy_import import lazy_import
+
+
+pd = lazy_import("pandas")
+
+
+# The results store is a single SQLite database kept in the user's home folder so results
+# persist between sessions and can be compared across bridges and model revisions.
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser("~"), ".scour_plotting", "results_store.db")
+
+# Columns stored for each table, in the order they are written to the database
+DXV_COLUMNS = ["Pier Arc ID", "Pier Node", "Model Node", "DxV", "Depth", "Velocity"]
+SCOUR_COLUMNS = ["Recurrence", "Bent ID", "Bent CL Sta", "Local Scour Depth", "CS + LTD Depth",
+                 "Scour Elev", "Bottom of Footing Elev", "Min Total Scour Elev", "WSE"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dxv_results (
+    bridge TEXT NOT NULL,
+    scenario TEXT NOT NULL,
+    mesh_hash TEXT NOT NULL,
+    run_date TEXT NOT NULL,
+    pier_arc_id TEXT,
+    pier_node TEXT,
+    model_node INTEGER,
+    dxv REAL,
+    depth REAL,
+    velocity REAL
+);
+CREATE INDEX IF NOT EXISTS idx_dxv_keys ON dxv_results (bridge, scenario, mesh_hash, run_date);
+CREATE INDEX IF NOT EXISTS idx_dxv_run_date ON dxv_results (run_date);
+
+CREATE TABLE IF NOT EXISTS scour_summary (
+    bridge TEXT NOT NULL,
+    scenario TEXT NOT NULL,
+    mesh_hash TEXT NOT NULL,
+    run_date TEXT NOT NULL,
+    recurrence TEXT,
+    bent_id TEXT,
+    bent_cl_sta REAL,
+    local_scour_depth REAL,
+    cs_ltd_depth REAL,
+    scour_elev REAL,
+    bottom_of_footing_elev REAL,
+    min_total_scour_elev REAL,
+    wse REAL
+);
+CREATE INDEX IF NOT EXISTS idx_scour_keys ON scour_summary (bridge, scenario, mesh_hash, run_date);
+CREATE INDEX IF NOT EXISTS idx_scour_run_date ON scour_summary (run_date);
+"""
+
+_TABLE_COLUMNS = {
+    "dxv_results": (DXV_COLUMNS, ["pier_arc_id", "pier_node", "model_node", "dxv", "depth", "velocity"]),
+    "scour_summary": (SCOUR_COLUMNS, ["recurrence", "bent_id", "bent_cl_sta", "local_scour_depth", "cs_ltd_depth",
+                                      "scour_elev", "bottom_of_footing_elev", "min_total_scour_elev", "wse"]),
+}
+
+
+def open_results_store(store_path:str = DEFAULT_STORE_PATH) -> sqlite3.Connection:
+    """
+    Opens the results store, creating the database file, tables and indexes if they do not exist.
+    Args:
+        store_path (str): Path to the SQLite database file.
+    Returns:
+        Connection: An open sqlite3 connection to the results store.
+    """
+    if store_path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(store_path)), exist_ok=True)
+    connection = sqlite3.connect(store_path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+def mesh_hash(model_nodes) -> str:
+    """
+    Calculates a hash identifying the model mesh from its node ids and coordinates.
+    Args:
+        model_nodes (DataFrame): DataFrame with columns ['Node', 'lat', 'long'] returned by read_geom_file.
+    Returns:
+        str: The hexadecimal SHA-1 digest of the mesh nodes.
+    """
+    digest = hashlib.sha1()
+    for column in ["Node", "lat", "long"]:
+        digest.update(np.ascontiguousarray(model_nodes[column].to_numpy()).tobytes())
+    return digest.hexdigest()
+
+
+def _save(connection, table, results, bridge, scenario, mesh_hash, run_date):
+    """
+    Writes a results DataFrame to a table of the results store under the given keys.
+    """
+    frame_columns, table_columns = _TABLE_COLUMNS[table]
+    if run_date is None:
+        run_date = datetime.now().isoformat(timespec="seconds")
+    rows = results[frame_columns].astype(object).where(results[frame_columns].notna(), None).itertuples(index=False, name=None)
+    keys = (bridge, scenario, mesh_hash, run_date)
+    placeholders = ", ".join(["?"] * (len(table_columns) + 4))
+    with connection:
+        connection.executemany(
+            f"INSERT INTO {table} (bridge, scenario, mesh_hash, run_date, {', '.join(table_columns)}) VALUES ({placeholders})",
+            (keys + row for row in rows))
+    return run_date
+
+
+def save_dxv_results(connection, max_nodes, bridge:str, scenario:str, mesh_hash:str, run_date:str = None) -> str:
+    """
+    Saves the maximum DxV results returned by find_mesh_points to the results store.
+    Args:
+        connection (Connection): Connection returned by open_results_store.
+        max_nodes (DataFrame): DataFrame with the columns returned by find_mesh_points.
+        bridge (str): Name of the bridge.
+        scenario (str): Name of the model scenario, e.g. the recurrence interval or design alternative.
+        mesh_hash (str): Hash of the model mesh returned by mesh_hash.
+        run_date (str): ISO formatted date of the run. Defaults to the current date and time.
+    Returns:
+        str: The run date the results were stored under.
+    """
+    return _save(connection, "dxv_results", max_nodes, bridge, scenario, mesh_hash, run_date)
+
+
+def save_scour_summary(connection, scour_summary, bridge:str, scenario:str, mesh_hash:str = "", run_date:str = None) -> str:
+    """
+    Saves the scour profile summary returned by summarize_scour_profile to the results store.
+    Args:
+        connection (Connection): Connection returned by open_results_store.
+        scour_summary (DataFrame): DataFrame with the columns returned by summarize_scour_profile.
+        bridge (str): Name of the bridge.
+        scenario (str): Name of the design scenario.
+        mesh_hash (str): Hash of the model mesh the scour data was derived from, if known.
+        run_date (str): ISO formatted date of the run. Defaults to the current date and time.
+    Returns:
+        str: The run date the results were stored under.
+    """
+    return _save(connection, "scour_summary", scour_summary, bridge, scenario, mesh_hash, run_date)
+
+
+def _query(connection, table, bridge, scenario, mesh_hash, start_date, end_date):
+    """
+    Queries a table of the results store, filtering on any of the indexed keys.
+    """
+    frame_columns, table_columns = _TABLE_COLUMNS[table]
+    conditions = []
+    parameters = []
+    for column, value in [("bridge", bridge), ("scenario", scenario), ("mesh_hash", mesh_hash)]:
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple, set)):
+            value = list(value)
+            conditions.append(f"{column} IN ({', '.join(['?'] * len(value))})")
+            parameters.extend(value)
+        else:
+            conditions.append(f"{column} = ?")
+            parameters.append(value)
+    if start_date is not None:
+        conditions.append("run_date >= ?")
+        parameters.append(start_date)
+    if end_date is not None:
+        conditions.append("run_date <= ?")
+        parameters.append(end_date)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    cursor = connection.execute(
+        f"SELECT bridge, scenario, mesh_hash, run_date, {', '.join(table_columns)} FROM {table}{where} "
+        "ORDER BY bridge, scenario, run_date", parameters)
+    return pd.DataFrame(cursor.fetchall(), columns=["Bridge", "Scenario", "Mesh Hash", "Run Date"] + frame_columns)
+
+
+def query_dxv_results(connection, bridge=None, scenario=None, mesh_hash=None, start_date=None, end_date=None):
+    """
+    Queries stored DxV results.
+    Args:
+        connection (Connection): Connection returned by open_results_store.
+        bridge (str or list): Bridge name or names to return. All bridges are returned if None.
+        scenario (str or list): Scenario name or names to return. All scenarios are returned if None.
+        mesh_hash (str or list): Mesh hash or hashes to return. All meshes are returned if None.
+        start_date (str): Earliest ISO formatted run date to return.
+        end_date (str): Latest ISO formatted run date to return.
+    Returns:
+        DataFrame: The stored results with the bridge, scenario, mesh hash and run date keys.
+    """
+    return _query(connection, "dxv_results", bridge, scenario, mesh_hash, start_date, end_date)
+
+
+def query_scour_summary(connection, bridge=None, scenario=None, mesh_hash=None, start_date=None, end_date=None):
+    """
+    Queries stored scour profile summaries.
+    Args:
+        connection (Connection): Connection returned by open_results_store.
+        bridge (str or list): Bridge name or names to return. All bridges are returned if None.
+        scenario (str or list): Scenario name or names to return. All scenarios are returned if None.
+        mesh_hash (str or list): Mesh hash or hashes to return. All meshes are returned if None.
+        start_date (str): Earliest ISO formatted run date to return.
+        end_date (str): Latest ISO formatted run date to return.
+    Returns:
+        DataFrame: The stored summaries with the bridge, scenario, mesh hash and run date keys.
+    """
+    return _query(connection, "scour_summary", bridge, scenario, mesh_hash, start_date, end_date)
+
+
+def list_store_keys(connection, table:str) -> pd.DataFrame:
+    """
+    Lists the distinct bridge, scenario, mesh hash and run date combinations stored in a table.
+    Args:
+        connection (Connection): Connection returned by open_results_store.
+        table (str): Either "dxv_results" or "scour_summary".
+    Returns:
+        DataFrame: The distinct keys with the number of rows stored under each.
+    """
+    if table not in _TABLE_COLUMNS:
+        raise ValueError(f"Unknown results table '{table}'.")
+    cursor = connection.execute(
+        f"SELECT bridge, scenario, mesh_hash, run_date, COUNT(*) FROM {table} "
+        "GROUP BY bridge, scenario, mesh_hash, run_date ORDER BY bridge, scenario, run_date")
+    return pd.DataFrame(cursor.fetchall(), columns=["Bridge", "Scenario", "Mesh Hash", "Run Date", "Rows"])
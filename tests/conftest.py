@@ -0,0 +1,147 @@
+import os
+import sys
+
+import h5py
+import numpy as np
+import pandas as pd
+import pytest
+
+
+# The app is run from the src folder, so its modules are imported as utils.<area>_utils.<module>
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+
+def _column(values, length:int) -> list:
+    # scour_data.csv holds the bent and bridge values in the first rows of columns as long as the ground line
+    return list(values) + [np.nan] * (length - len(values))
+
+
+@pytest.fixture
+def make_scour_data():
+    """
+    Returns a function building the contents of a scour_data.csv file with five bents over a 300 ft ground line.
+    """
+    def make(stations=None, elevations=None, laterally_stable:str = "Yes") -> pd.DataFrame:
+        stations = np.arange(0, 301, 2.0) if stations is None else np.asarray(stations, dtype=np.float64)
+        if elevations is None:
+            elevations = 5300 - 8 * np.exp(-((stations - 150) / 60)**2) + 0.1 * np.sin(stations)
+        length = len(stations)
+        values = {
+            "Bent ID": ["Abut 1", "Pier 1", "Pier 2", "Pier 3", "Abut 2"],
+            "Bridge Thickness": [4] * 5,
+            "Pier Stem Top Width": [3] * 5,
+            "Pier Stem Bottom Width": [3] * 5,
+            "Footing Cap Width": [8] * 5,
+            "Footing Width": [12] * 5,
+            "Footing Cap Height": [2] * 5,
+            "Footing Height": [3] * 5,
+            "Bent CL Sta": [20, 90, 150, 210, 280],
+            "Bottom of Footing Elev": [5285] * 5,
+            "Low Chord Elev": [5310] * 5,
+            "High Chord Elev": [5314] * 5,
+            "Local Scour Depth (100-yr)": [0, 6, 7, 5.5, 0],
+            "Local Scour Depth (500-yr)": [0, 8, 9, 7, 0],
+            "CS + LTD Depth (100-yr)": [2.5],
+            "CS + LTD Depth (500-yr)": [3.5],
+            "Scour Datum Elev.": [5292.0],
+            "Channel Bank Sta.": [100, 200],
+            "Laterally Stable Channel?": [laterally_stable],
+            "Long Term Deg": [1.0],
+            "abut scour 100": [5290.0],
+            "abut scour 500": [5288.0],
+            "Abt Toe Left Sta.": [30],
+            "Abt Toe Right Sta.": [270],
+            "WSE 100yr": [5305.0],
+            "WSE 500yr": [5307.0],
+        }
+        scour_data = pd.DataFrame({column: _column(column_values, length) for column, column_values in values.items()})
+        scour_data["Offset Station"] = stations
+        scour_data["Elev"] = np.asarray(elevations, dtype=np.float64)
+        return scour_data
+    return make
+
+
+# Small SRH-2D model on a 5 ft grid of nodes, with three piers across its middle
+GRID_SHAPE = (24, 16)
+GRID_ORIGIN = (3100000.0, 1700000.0)
+GRID_SPACING = 5.0
+PIER_ARCS = [((3100030.0, 1700020.0), (3100030.0, 1700055.0)),
+             ((3100060.0, 1700020.0), (3100060.0, 1700055.0)),
+             ((3100090.0, 1700020.0), (3100090.0, 1700055.0))]
+N_TIMESTEPS = 12
+
+
+def _grid_nodes() -> tuple:
+    x = GRID_ORIGIN[0] + GRID_SPACING * np.arange(GRID_SHAPE[0])
+    y = GRID_ORIGIN[1] + GRID_SPACING * np.arange(GRID_SHAPE[1])
+    x, y = np.meshgrid(x, y)
+    return x.ravel(), y.ravel()
+
+
+def _write_srhgeom(path, x, y):
+    nx, ny = GRID_SHAPE
+    lines = ['SRHGEOM 30', 'Name "test"', 'GridUnit "FOOT"']
+    element = 1
+    for j in range(ny - 1):
+        for i in range(nx - 1):
+            a = j * nx + i + 1
+            # a mix of quadrilaterals and triangles, as in a real mesh
+            if (i + j) % 3 == 0:
+                lines.append(f"Elem {element} {a} {a + 1} {a + nx + 1} {a + nx}")
+                element += 1
+            else:
+                lines.append(f"Elem {element} {a} {a + 1} {a + nx + 1}")
+                lines.append(f"Elem {element + 1} {a} {a + nx + 1} {a + nx}")
+                element += 2
+    lines += [f"Node {node} {node_x:.3f} {node_y:.3f} 5280.0" for node, (node_x, node_y) in enumerate(zip(x, y), start=1)]
+    lines.append("NodeString 1 1 2 3")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def _write_map(path):
+    # a coverage before the bridge scour coverage, so the reader has to find the right one
+    lines = ['MAP VERSION 8', 'BEGCOV', 'COVFLDR "Area Property"', 'COVNAME "Materials"', 'NODE', 'XY 1 2 0', 'ID 99', 'END', 'ENDCOV',
+             'BEGCOV', 'COVFLDR "Area Property"', 'COVNAME "Bridge Scour"', 'COVELEV 0.0', 'COVID 1']
+    for node, (x, y) in enumerate([point for arc in PIER_ARCS for point in arc], start=1):
+        lines += ['NODE', f'XY {x:.1f} {y:.1f} 0.0', f'ID {node}', 'END']
+    for arc in range(len(PIER_ARCS)):
+        lines += ['ARC', f'ID {arc + 1}', 'ARCELEVATION 0.000000', f'NODES        {2 * arc + 1}        {2 * arc + 2}',
+                  'arcType 5', 'ARCVERTICES 0', 'END']
+    lines.append('ENDCOV')
+    path.write_text("\n".join(lines) + "\n")
+
+
+def _write_results(folder, scenario:str, scale:float, x, y) -> tuple:
+    center_x, center_y = GRID_ORIGIN[0] + 60, GRID_ORIGIN[1] + 40
+    depth = scale * (2 + 3 * np.exp(-((x - center_x)**2 + (y - center_y)**2) / 800))
+    velocity = scale * (1 + 2 * np.exp(-((x - center_x + 20)**2 + (y - center_y)**2) / 1200))
+    hydrograph = np.sin(np.linspace(0, np.pi, N_TIMESTEPS))[:, None]
+    depth = (depth[None, :] * hydrograph).astype(np.float32)
+    velocity = (velocity[None, :] * hydrograph).astype(np.float32)
+    # dry nodes are written with a depth of -999 and no velocity
+    depth[:, :5] = -999
+    velocity[:, :5] = 0
+    paths = []
+    for dataset_name, values in [("Water_Depth_ft", depth), ("Vel_Mag_ft_p_s", velocity)]:
+        path = folder / f"{scenario}_{dataset_name}.h5"
+        with h5py.File(path, "w") as file:
+            file.create_dataset(f"Datasets/{scenario}/{dataset_name}/Values", data=values, chunks=(4, 100))
+        paths.append(str(path))
+    return paths[0], paths[1]
+
+
+@pytest.fixture
+def srh_model(tmp_path):
+    """
+    Writes a small SRH-2D model to a temporary folder: the .srhgeom and .map files and the depth and velocity
+    result files of a '100yr' and a '500yr' scenario.
+    Returns:
+        dict: Paths of the 'srhgeom' and 'map' files and, for each scenario, its (depth file, velocity file).
+    """
+    x, y = _grid_nodes()
+    model = {"srhgeom": str(tmp_path / "test.srhgeom"), "map": str(tmp_path / "test.map")}
+    _write_srhgeom(tmp_path / "test.srhgeom", x, y)
+    _write_map(tmp_path / "test.map")
+    for scenario, scale in [("100yr", 1.0), ("500yr", 1.4)]:
+        model[scenario] = _write_results(tmp_path, scenario, scale, x, y)
+    return model
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from utils.plotting_utils.bridge_section import BridgeDataError, parse_bridge_section
+
+
+def test_parses_bents_and_ground_line(make_scour_data):
+    bridge_section = parse_bridge_section(make_scour_data())
+    assert bridge_section.bent_ids == ("Abut 1", "Pier 1", "Pier 2", "Pier 3", "Abut 2")
+    np.testing.assert_array_equal(bridge_section.bent_cl_sta, [20, 90, 150, 210, 280])
+    assert len(bridge_section.ground_station) == 151
+    assert bridge_section.bank_stations == (100.0, 200.0)
+    assert bridge_section.cs_ltd_depth == {"CS + LTD Depth (100-yr)": 2.5, "CS + LTD Depth (500-yr)": 3.5}
+    assert bridge_section.laterally_stable
+
+
+def test_missing_columns_are_listed(make_scour_data):
+    scour_data = make_scour_data().drop(columns=["Elev", "Long Term Deg"])
+    with pytest.raises(BridgeDataError, match="missing the columns: Long Term Deg, Elev"):
+        parse_bridge_section(scour_data)
+
+
+def test_every_invalid_value_is_reported(make_scour_data):
+    scour_data = make_scour_data()
+    scour_data["Footing Width"] = scour_data["Footing Width"].astype(object)
+    scour_data.loc[2, "Footing Width"] = "wide"
+    scour_data.loc[0, "Long Term Deg"] = np.nan
+    scour_data.loc[1, "Channel Bank Sta."] = np.nan
+    with pytest.raises(BridgeDataError) as error:
+        parse_bridge_section(scour_data)
+    message = str(error.value)
+    assert "'Footing Width' has a non numeric value 'wide' in row 3." in message
+    assert "'Long Term Deg' has no value in row 1." in message
+    assert "'Channel Bank Sta.' has no value in row 2." in message
+
+
+def test_short_ground_line_is_an_error(make_scour_data):
+    scour_data = make_scour_data()
+    scour_data.loc[1:, "Offset Station"] = np.nan
+    with pytest.raises(BridgeDataError, match="at least two 'Offset Station' values"):
+        parse_bridge_section(scour_data)
+
+
+def test_ground_line_is_sorted_by_station(make_scour_data):
+    scour_data = make_scour_data()
+    sorted_section = parse_bridge_section(scour_data)
+    shuffled = scour_data.copy()
+    order = np.random.default_rng(0).permutation(len(shuffled))
+    shuffled[["Offset Station", "Elev"]] = scour_data[["Offset Station", "Elev"]].to_numpy()[order]
+    shuffled_section = parse_bridge_section(shuffled)
+    np.testing.assert_array_equal(shuffled_section.ground_station, sorted_section.ground_station)
+    np.testing.assert_array_equal(shuffled_section.ground_elev, sorted_section.ground_elev)
+
+
+def test_points_sharing_a_station_keep_their_order(make_scour_data):
+    # the ground line steps down a vertical wall at station 20, with the last point listed first
+    bridge_section = parse_bridge_section(make_scour_data([40, 0, 10, 20, 20, 30], [5300, 5300, 5299, 5299, 5290, 5290]))
+    np.testing.assert_array_equal(bridge_section.ground_station, [0, 10, 20, 20, 30, 40])
+    np.testing.assert_array_equal(bridge_section.ground_elev, [5300, 5299, 5299, 5290, 5290, 5300])
@@ -0,0 +1,47 @@
+import io
+
+import numpy as np
+import pytest
+
+from conftest import GRID_ORIGIN, GRID_SHAPE, GRID_SPACING, PIER_ARCS
+from utils.dxv_utils.find_pier_nodes import read_map_file, read_geom_file, read_geom_elements
+
+
+def _upload(path, crlf:bool = False):
+    # uploaded files are binary buffers, possibly written on Windows
+    data = open(path, "rb").read()
+    return io.BytesIO(data.replace(b"\n", b"\r\n") if crlf else data)
+
+
+@pytest.mark.parametrize("source", ["path", "upload", "crlf upload"])
+def test_read_map_file(srh_model, source):
+    map_file = srh_model["map"] if source == "path" else _upload(srh_model["map"], crlf=source == "crlf upload")
+    pier_data, arc_node_mapping = read_map_file(map_file, "Bridge Scour")
+
+    assert list(pier_data.columns) == ["Pier Node", "lat", "long"]
+    assert pier_data["Pier Node"].tolist() == [f"ID {node}" for node in range(1, 7)]
+    np.testing.assert_array_equal(pier_data[["lat", "long"]].to_numpy(), [point for arc in PIER_ARCS for point in arc])
+    assert arc_node_mapping.values.tolist() == [[f"ID {node}", f"ArcID {(node + 1) // 2}"] for node in range(1, 7)]
+
+
+@pytest.mark.parametrize("source", ["path", "upload", "crlf upload"])
+def test_read_geom_file(srh_model, source):
+    geom_file = srh_model["srhgeom"] if source == "path" else _upload(srh_model["srhgeom"], crlf=source == "crlf upload")
+    model_nodes = read_geom_file(geom_file)
+
+    nx, ny = GRID_SHAPE
+    assert list(model_nodes.columns) == ["Node", "lat", "long"]
+    np.testing.assert_array_equal(model_nodes["Node"], np.arange(1, nx * ny + 1))
+    np.testing.assert_array_equal(model_nodes["lat"], np.tile(GRID_ORIGIN[0] + GRID_SPACING * np.arange(nx), ny))
+    np.testing.assert_array_equal(model_nodes["long"], np.repeat(GRID_ORIGIN[1] + GRID_SPACING * np.arange(ny), nx))
+
+
+def test_read_geom_elements(srh_model):
+    elements = read_geom_elements(_upload(srh_model["srhgeom"]))
+    nx, ny = GRID_SHAPE
+    quads = sum((i + j) % 3 == 0 for j in range(ny - 1) for i in range(nx - 1))
+    assert elements.shape == (quads + 2 * ((nx - 1) * (ny - 1) - quads), 4)
+    # triangles have a 0 in the last column
+    assert ((elements[:, 3] == 0).sum()) == len(elements) - quads
+    np.testing.assert_array_equal(elements[0], [1, 2, nx + 2, nx + 1])
+    np.testing.assert_array_equal(elements[1], [2, 3, nx + 3, 0])
@@ -0,0 +1,49 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from utils.service_utils.http_service import ServiceHandler, create_server
+
+
+@pytest.fixture
+def service():
+    server = create_server(port=0, workers=1, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    server.jobs.shutdown()
+
+
+def post(server, path:str, body:bytes) -> tuple:
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=30)
+    connection.request("POST", path, body=body)
+    response = connection.getresponse()
+    payload = response.read()
+    connection.close()
+    return response.status, json.loads(payload)
+
+
+def test_unknown_endpoint_answers_404(service):
+    status, payload = post(service, "/missing", b"")
+    assert status == 404
+    assert payload["status"] == "error"
+
+
+def test_invalid_extract_request_answers_400(service):
+    status, payload = post(service, "/extract", b"not json")
+    assert status == 400
+    assert "not valid JSON" in payload["error"]
+
+
+def test_unexpected_error_answers_500(service, monkeypatch):
+    def fail(self, body, stream):
+        raise RuntimeError("static layers failed")
+
+    monkeypatch.setattr(ServiceHandler, "_run_render", fail)
+    status, payload = post(service, "/render", b"Bent ID\n")
+    assert status == 500
+    assert payload == {"status": "error", "error": "The request failed: static layers failed"}
@@ -0,0 +1,80 @@
+import pytest
+
+from utils.plotting_utils.bridge_section import parse_bridge_section
+from utils.plotting_utils.incremental_utils import (section_digests, diff_sections, describe_changes, profile_digest,
+                                                    reuse_or_compute)
+from utils.plotting_utils.scour_plotting_utils import recurrence_txt
+
+
+@pytest.fixture
+def sections(make_scour_data):
+    # parses a copy of the scour data after applying an edit to it
+    def parse(edit=None):
+        bridge_data = make_scour_data()
+        if edit is not None:
+            edit(bridge_data)
+        return parse_bridge_section(bridge_data)
+    return parse
+
+
+def test_diff_of_the_first_upload(sections):
+    changes = diff_sections(None, section_digests(sections()))
+    assert changes == {"added": ["Abut 1", "Pier 1", "Pier 2", "Pier 3", "Abut 2"], "removed": [], "changed": [],
+                       "ground_line": True, "chords": True, "bridge": True}
+
+
+def test_diff_of_an_unchanged_upload(sections):
+    changes = diff_sections(section_digests(sections()), section_digests(sections()))
+    assert changes == {"added": [], "removed": [], "changed": [], "ground_line": False, "chords": False, "bridge": False}
+    assert describe_changes(changes) == "no changes"
+
+
+def _set(column, rows, value):
+    # an edit setting rows of a column to a new value
+    def edit(bridge_data):
+        bridge_data.loc[rows, column] = value
+    return edit
+
+
+@pytest.mark.parametrize("edit, expected", [
+    (_set("Footing Width", 2, 14), {"changed": ["Pier 2"]}),
+    (_set("Local Scour Depth (500-yr)", 1, 9.5), {"changed": ["Pier 1"]}),
+    (_set("Bent ID", 3, "Pier 3A"), {"added": ["Pier 3A"], "removed": ["Pier 3"]}),
+    (_set("Elev", 75, 5290.0), {"ground_line": True}),
+    # the chord elevations are given at every bent
+    (_set("High Chord Elev", slice(0, 4), 5315), {"changed": ["Abut 1", "Pier 1", "Pier 2", "Pier 3", "Abut 2"], "chords": True}),
+    (_set("Long Term Deg", 0, 2.0), {"bridge": True}),
+])
+def test_diff_of_an_edit(sections, edit, expected):
+    changes = diff_sections(section_digests(sections()), section_digests(sections(edit)))
+    assert changes == {"added": [], "removed": [], "changed": [], "ground_line": False, "chords": False, "bridge": False, **expected}
+    assert describe_changes(changes) != "no changes"
+
+
+def test_profile_digest_only_depends_on_its_recurrence_interval(sections):
+    year_100, year_500 = recurrence_txt()
+    edited = sections(_set("CS + LTD Depth (500-yr)", 0, 4.5))
+    assert profile_digest(sections(), [year_100]) == profile_digest(edited, [year_100])
+    assert profile_digest(sections(), [year_500]) != profile_digest(edited, [year_500])
+    assert profile_digest(sections(), [year_100, year_500]) != profile_digest(edited, [year_100, year_500])
+
+
+def test_reuse_or_compute():
+    calls = []
+
+    def compute(value):
+        def run():
+            calls.append(value)
+            return value
+        return run
+
+    previous, current = {}, {}
+    assert reuse_or_compute(previous, current, "a", compute(1)) == (1, False)
+    # the results of the next run only keep the keys it asked for
+    previous, current = current, {}
+    assert reuse_or_compute(previous, current, "a", compute(2)) == (1, True)
+    assert reuse_or_compute(previous, current, "b", compute(3)) == (3, False)
+    assert current == {"a": 1, "b": 3} and calls == [1, 3]
+    previous, current = current, {}
+    assert reuse_or_compute(previous, current, "b", compute(4)) == (3, True)
+    assert current == {"b": 3}
@@ -0,0 +1,71 @@
+import sys
+import threading
+import time
+
+from utils.startup_utils.lazy_import import LazyModule, lazy_import
+
+
+SLOW_MODULE = """
+import time
+time.sleep(0.2)
+VALUE = 42
+"""
+
+
+def test_module_is_imported_on_first_attribute_access(tmp_path, monkeypatch):
+    (tmp_path / "lazy_first_access.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = lazy_import("lazy_first_access")
+    assert isinstance(module, LazyModule)
+    assert "lazy_first_access" not in sys.modules
+    assert module.VALUE == 1
+    assert "lazy_first_access" in sys.modules
+    assert "loaded" in repr(module) and "not loaded" not in repr(module)
+
+
+def test_first_access_from_several_threads(tmp_path, monkeypatch):
+    (tmp_path / "lazy_slow_module.py").write_text(SLOW_MODULE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    calls = []
+
+    def on_load(loaded):
+        time.sleep(0.1)
+        calls.append(loaded.VALUE)
+
+    module = lazy_import("lazy_slow_module", on_load=on_load)
+
+    n_threads = 16
+    barrier = threading.Barrier(n_threads)
+    results = [None] * n_threads
+    errors = []
+
+    def first_access(index):
+        barrier.wait()
+        try:
+            # the hook has always run by the time any thread sees the module's attributes
+            results[index] = (module.VALUE, len(calls))
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=first_access, args=(index,)) for index in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert results == [(42, 1)] * n_threads
+    assert calls == [42]
+
+
+def test_missing_attribute_raises_attribute_error(tmp_path, monkeypatch):
+    (tmp_path / "lazy_missing_attribute.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = lazy_import("lazy_missing_attribute")
+    for _ in range(2):
+        try:
+            module.MISSING
+        except AttributeError:
+            pass
+        else:
+            raise AssertionError("expected an AttributeError")
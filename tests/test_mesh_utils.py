@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from conftest import GRID_ORIGIN, GRID_SHAPE, GRID_SPACING
+from utils.dxv_utils.find_pier_nodes import read_geom_file, read_geom_elements
+from utils.dxv_utils.mesh_utils import (triangulate_elements, barycentric_weights, build_triangle_locator, locate_points,
+                                        build_node_grid, grid_nodes_within_radius)
+
+
+@pytest.fixture
+def mesh(srh_model):
+    model_nodes = read_geom_file(srh_model["srhgeom"])
+    triangles = triangulate_elements(read_geom_elements(srh_model["srhgeom"]))
+    return model_nodes["lat"].to_numpy(), model_nodes["long"].to_numpy(), triangles
+
+
+def test_triangulate_elements():
+    elements = np.array([[1, 2, 3, 0], [2, 4, 5, 3]])
+    np.testing.assert_array_equal(triangulate_elements(elements), [[0, 1, 2], [1, 3, 4], [1, 4, 2]])
+
+
+def test_barycentric_weights():
+    ax, ay, bx, by, cx, cy = 0.0, 0.0, 4.0, 0.0, 1.0, 3.0
+    px = np.array([0.0, 4.0, 1.0, 5 / 3, 5.0])
+    py = np.array([0.0, 0.0, 3.0, 1.0, 5.0])
+    wa, wb, wc = barycentric_weights(px, py, ax, ay, bx, by, cx, cy)
+    # the corners have unit weights and every point is the weighted sum of the corners
+    np.testing.assert_allclose(np.column_stack([wa, wb, wc])[:3], np.eye(3), atol=1e-12)
+    np.testing.assert_allclose([wa[3], wb[3], wc[3]], [1 / 3] * 3)
+    np.testing.assert_allclose(wa * ax + wb * bx + wc * cx, px)
+    np.testing.assert_allclose(wa * ay + wb * by + wc * cy, py)
+    # the last point is outside the triangle
+    assert min(wa[4], wb[4], wc[4]) < 0
+    # a degenerate triangle has no weights
+    assert np.isnan(barycentric_weights(np.array([1.0]), np.array([1.0]), 0, 0, 1, 1, 2, 2)[0]).all()
+
+
+def _brute_force_inside(x, y, triangles, px, py):
+    # whether each point is inside any triangle of the mesh, testing every triangle
+    corners = [(x[triangles[:, k]], y[triangles[:, k]]) for k in range(3)]
+    inside = []
+    for point_x, point_y in zip(px, py):
+        weights = barycentric_weights(np.full(len(triangles), point_x), np.full(len(triangles), point_y), *corners[0], *corners[1], *corners[2])
+        inside.append(np.all(np.column_stack(weights) >= -1e-9, axis=1).any())
+    return np.array(inside)
+
+
+@pytest.mark.parametrize("cell_size", [None, 2.0, 13.0, 500.0])
+def test_locate_points(mesh, cell_size):
+    x, y, triangles = mesh
+    rng = np.random.default_rng(0)
+    # points inside and around the mesh, and the mesh nodes themselves
+    px = np.concatenate([rng.uniform(x.min() - 20, x.max() + 20, 400), x[::7]])
+    py = np.concatenate([rng.uniform(y.min() - 20, y.max() + 20, 400), y[::7]])
+    triangle, weights = locate_points(build_triangle_locator(x, y, triangles, cell_size), px, py)
+
+    found = triangle >= 0
+    np.testing.assert_array_equal(found, _brute_force_inside(x, y, triangles, px, py))
+    assert np.isnan(weights[~found]).all()
+    # the weights are those of the point in its triangle, so a linear field is interpolated exactly
+    corners = triangles[triangle[found]]
+    assert (weights[found] >= -1e-9).all()
+    np.testing.assert_allclose(weights[found].sum(axis=1), 1.0)
+    field = 3.0 * (x - GRID_ORIGIN[0]) - 2.0 * (y - GRID_ORIGIN[1]) + 7.0
+    np.testing.assert_allclose((weights[found] * field[corners]).sum(axis=1),
+                               3.0 * (px[found] - GRID_ORIGIN[0]) - 2.0 * (py[found] - GRID_ORIGIN[1]) + 7.0, atol=1e-6)
+
+
+def test_locate_points_outside_the_grid(mesh):
+    x, y, triangles = mesh
+    far = GRID_ORIGIN[0] + GRID_SPACING * GRID_SHAPE[0] * 10
+    triangle, weights = locate_points(build_triangle_locator(x, y, triangles), [far, -far, x.min()], [y.min(), y.min(), -far])
+    assert triangle.tolist() == [-1, -1, -1]
+    assert np.isnan(weights).all()
+
+
+@pytest.mark.parametrize("cell_size", [1.0, 8.0, 40.0])
+def test_grid_nodes_within_radius(mesh, cell_size):
+    x, y, _ = mesh
+    grid = build_node_grid(x, y, cell_size)
+    rng = np.random.default_rng(1)
+    for px, py, radius in zip(rng.uniform(x.min() - 10, x.max() + 10, 50), rng.uniform(y.min() - 10, y.max() + 10, 50), rng.uniform(0, 30, 50)):
+        nodes, distance = grid_nodes_within_radius(grid, px, py, radius)
+        brute = np.flatnonzero(np.hypot(x - px, y - py) <= radius)
+        np.testing.assert_array_equal(nodes, brute)
+        np.testing.assert_allclose(distance, np.hypot(x[brute] - px, y[brute] - py))
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from utils.plotting_utils.profile_viewer_utils import lttb_downsample, downsample_line
+
+
+@pytest.mark.parametrize("n, n_out", [(10, 3), (10, 9), (1000, 50), (1001, 100), (5000, 2000), (7, 6)])
+def test_lttb_keeps_the_endpoints_and_length(n, n_out):
+    x = np.sort(np.random.default_rng(n).uniform(0, 100, n))
+    y = np.sin(x / 5)
+    keep = lttb_downsample(x, y, n_out)
+    assert len(keep) == n_out
+    assert keep[0] == 0 and keep[-1] == n - 1
+    # one point from each bucket, in order
+    assert np.all(np.diff(keep) > 0)
+
+
+@pytest.mark.parametrize("n_out, expected", [(10, list(range(10))), (25, list(range(10))), (2, [0, 9]), (1, [0, 9])])
+def test_lttb_of_short_lines(n_out, expected):
+    x = np.arange(10.0)
+    assert lttb_downsample(x, x**2, n_out).tolist() == expected
+
+
+def test_lttb_keeps_a_spike():
+    x = np.arange(1000.0)
+    y = np.zeros(1000)
+    y[437] = 10.0
+    assert 437 in lttb_downsample(x, y, 20)
+
+
+def test_downsample_line_keeps_breaks_and_clips_to_the_window():
+    x = np.arange(0, 1000.0)
+    y = np.sin(x / 30)
+    y[400:450] = np.nan
+    stations, elevations, segments = downsample_line(x, y, (100, 800), 200)
+    # one point either side of the window is kept so the line runs to the edges of the view
+    assert stations[0] == 99 and stations[-1] == 801
+    assert np.isfinite(elevations).all()
+    assert sorted(set(segments.tolist())) == [0, 1]
+    assert stations[segments == 0].max() == 399 and stations[segments == 1].min() == 450
+    assert len(stations) <= 200 + 2
+    np.testing.assert_array_equal(elevations, np.sin(stations / 30))
+
+
+def test_downsample_line_outside_the_window():
+    stations, elevations, segments = downsample_line(np.arange(10.0), np.arange(10.0), (20, 30), 100)
+    assert len(stations) == len(elevations) == len(segments) == 0
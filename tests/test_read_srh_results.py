@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from utils.dxv_utils.read_srh_results import column_runs, peak_values, interpolated_peak_values
+
+
+@pytest.fixture
+def values():
+    return np.random.default_rng(0).random((23, 3000)).astype(np.float32)
+
+
+def test_column_runs_split_on_large_gaps():
+    runs, selection = column_runs([5, 1000, 6, 2000, 1200, 5], max_gap=256)
+    assert runs == [(5, 7), (1000, 1201), (2000, 2001)]
+    # each requested column is found at its position in the runs placed end to end
+    assert selection.tolist() == [0, 2, 1, 203, 202, 0]
+
+
+@pytest.mark.parametrize("chunk_bytes", [64, 10**6])
+@pytest.mark.parametrize("columns", [[7], [2999, 0, 0], list(range(0, 3000, 700)), list(range(100, 400))])
+def test_peak_values_of_selected_columns(values, columns, chunk_bytes):
+    np.testing.assert_array_equal(peak_values(values, np.array(columns), chunk_bytes), values.max(axis=0)[columns])
+
+
+def test_peak_values_reads_only_the_runs(values):
+    class Dataset:
+        # records the columns read from the dataset
+        def __init__(self, array):
+            self.array, self.shape, self.dtype, self.read = array, array.shape, array.dtype, set()
+
+        def __getitem__(self, key):
+            self.read.update(range(*key[1].indices(self.shape[1])))
+            return self.array[key]
+
+    dataset = Dataset(values)
+    columns = np.array([10, 12, 2500, 2990])
+    np.testing.assert_array_equal(peak_values(dataset, columns), values.max(axis=0)[columns])
+    assert dataset.read == {10, 11, 12, 2500, 2990}
+
+
+def test_peak_values_of_all_and_no_columns(values):
+    np.testing.assert_array_equal(peak_values(values, chunk_bytes=1000), values.max(axis=0))
+    assert peak_values(values, np.array([], dtype=np.int64)).shape == (0,)
+
+
+def test_interpolated_peak_values(values):
+    rng = np.random.default_rng(1)
+    node_index = rng.integers(0, 3000, (40, 3))
+    weights = rng.random((40, 3))
+    weights[5] = np.nan
+    expected = np.einsum("tpk,pk->tp", values[:, node_index].astype(np.float64), np.nan_to_num(weights)).max(axis=0)
+    expected[5] = np.nan
+    for chunk_bytes in [64, 10**6]:
+        np.testing.assert_allclose(interpolated_peak_values(values, node_index, weights, chunk_bytes), expected, equal_nan=True)
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.store_utils.results_store import (DXV_COLUMNS, SCOUR_COLUMNS, open_results_store, mesh_hash, save_dxv_results,
+                                             save_scour_summary, query_dxv_results, query_scour_summary, list_store_keys)
+
+
+@pytest.fixture
+def connection(tmp_path):
+    connection = open_results_store(str(tmp_path / "store" / "results_store.db"))
+    yield connection
+    connection.close()
+
+
+def _dxv_results(scale:float = 1.0) -> pd.DataFrame:
+    return pd.DataFrame({"Pier Arc ID": ["ArcID 1", "ArcID 2"], "Pier Node": ["ID 1", "ID 3"], "Model Node": [101, 205],
+                         "DxV": [7.74 * scale, 12.3 * scale], "Depth": [3.1, 4.2], "Velocity": [2.5, np.nan],
+                         # columns that are not stored are ignored
+                         "color": [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]]})
+
+
+def test_dxv_results_round_trip(connection):
+    run_date = save_dxv_results(connection, _dxv_results(), "SH-7", "100yr", "abc")
+    stored = query_dxv_results(connection)
+    assert stored[["Bridge", "Scenario", "Mesh Hash", "Run Date"]].drop_duplicates().values.tolist() == [["SH-7", "100yr", "abc", run_date]]
+    # missing values are stored as NULL and read back as missing
+    pd.testing.assert_frame_equal(stored[DXV_COLUMNS], _dxv_results()[DXV_COLUMNS], check_dtype=False)
+    assert stored["Velocity"].isna().tolist() == [False, True]
+
+
+def test_scour_summary_round_trip(connection):
+    summary = pd.DataFrame({"Recurrence": ["100-yr", "500-yr"], "Bent ID": ["Pier 1", "Pier 1"], "Bent CL Sta": [90.0, 90.0],
+                            "Local Scour Depth": [6.0, 8.0], "CS + LTD Depth": [2.5, 3.5], "Scour Elev": [5283.5, 5280.5],
+                            "Bottom of Footing Elev": [5285.0, 5285.0], "Min Total Scour Elev": [5283.2, 5280.1], "WSE": [5305.0, 5307.0]})
+    save_scour_summary(connection, summary, "SH-7", "Proposed", run_date="2026-01-02T03:04:05")
+    stored = query_scour_summary(connection, bridge="SH-7")
+    pd.testing.assert_frame_equal(stored[SCOUR_COLUMNS], summary, check_dtype=False)
+    assert stored["Mesh Hash"].unique().tolist() == [""]
+    assert stored["Run Date"].unique().tolist() == ["2026-01-02T03:04:05"]
+
+
+def test_query_filters(connection):
+    save_dxv_results(connection, _dxv_results(), "SH-7", "100yr", "abc", run_date="2026-01-01T00:00:00")
+    save_dxv_results(connection, _dxv_results(1.4), "SH-7", "500yr", "abc", run_date="2026-02-01T00:00:00")
+    save_dxv_results(connection, _dxv_results(), "US-36", "100yr", "def", run_date="2026-03-01T00:00:00")
+
+    assert len(query_dxv_results(connection)) == 6
+    assert query_dxv_results(connection, bridge="SH-7")["Scenario"].unique().tolist() == ["100yr", "500yr"]
+    assert query_dxv_results(connection, scenario=["500yr", "25yr"])["DxV"].tolist() == pytest.approx([7.74 * 1.4, 12.3 * 1.4])
+    assert query_dxv_results(connection, mesh_hash="def")["Bridge"].unique().tolist() == ["US-36"]
+    dates = query_dxv_results(connection, start_date="2026-01-15", end_date="2026-02-15")["Run Date"].unique().tolist()
+    assert dates == ["2026-02-01T00:00:00"]
+    assert query_dxv_results(connection, bridge="I-25").empty
+
+    keys = list_store_keys(connection, "dxv_results")
+    assert keys[["Bridge", "Scenario", "Rows"]].values.tolist() == [["SH-7", "100yr", 2], ["SH-7", "500yr", 2], ["US-36", "100yr", 2]]
+    with pytest.raises(ValueError):
+        list_store_keys(connection, "dxv")
+
+
+def test_results_persist_between_connections(tmp_path):
+    store_path = str(tmp_path / "results_store.db")
+    connection = open_results_store(store_path)
+    save_dxv_results(connection, _dxv_results(), "SH-7", "100yr", "abc")
+    connection.close()
+    connection = open_results_store(store_path)
+    assert len(query_dxv_results(connection, bridge="SH-7")) == 2
+    connection.close()
+
+
+def test_mesh_hash():
+    nodes = pd.DataFrame({"Node": np.arange(1, 5), "lat": [0.0, 5.0, 0.0, 5.0], "long": [0.0, 0.0, 5.0, 5.0]})
+    assert mesh_hash(nodes) == mesh_hash(nodes.copy())
+    moved = nodes.copy()
+    moved.loc[2, "lat"] = 0.001
+    assert mesh_hash(moved) != mesh_hash(nodes)
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.dxv_utils.find_pier_nodes import read_map_file, read_geom_file, find_mesh_points
+from utils.dxv_utils.scenario_comparison import pair_scenario_files, compare_scenarios, dxv_matrix
+
+
+def test_pair_scenario_files():
+    scenarios, unpaired = pair_scenario_files(["a/100yr_Water_Depth_ft.h5", "a/500yr_Vel_Mag_ft_p_s.h5",
+                                               "a/100yr_Vel_Mag_ft_p_s.h5", "a/notes.txt", "a/25yr_Water_Depth_ft.h5"])
+    assert scenarios == {"100yr": ("a/100yr_Water_Depth_ft.h5", "100yr_Water_Depth_ft.h5", "a/100yr_Vel_Mag_ft_p_s.h5")}
+    assert sorted(unpaired) == ["25yr_Water_Depth_ft.h5", "500yr_Vel_Mag_ft_p_s.h5", "notes.txt"]
+
+
+@pytest.mark.parametrize("search_radius", [4, 8, 15, 40])
+def test_compare_scenarios_matches_find_mesh_points(srh_model, search_radius):
+    pier_data, arc_node_mapping = read_map_file(srh_model["map"], "Bridge Scour")
+    model_nodes = read_geom_file(srh_model["srhgeom"])
+    scenarios, unpaired = pair_scenario_files([path for scenario in ("100yr", "500yr") for path in srh_model[scenario]])
+    assert list(scenarios) == ["100yr", "500yr"] and unpaired == []
+
+    results = compare_scenarios(scenarios, pier_data, model_nodes, arc_node_mapping, search_radius)
+    for scenario, (depth_file, depth_file_name, velocity_file) in scenarios.items():
+        expected = find_mesh_points(pier_data, model_nodes, arc_node_mapping, depth_file, depth_file_name, velocity_file, search_radius)
+        found = results[results["Scenario"] == scenario].drop(columns="Scenario").reset_index(drop=True)
+        pd.testing.assert_frame_equal(found, pd.DataFrame(expected), check_dtype=False)
+
+    matrix = dxv_matrix(results)
+    assert list(matrix.index) == ["100yr", "500yr"]
+    assert list(matrix.columns) == ["ArcID 1", "ArcID 2", "ArcID 3"]
+    # the larger scenario has the larger DxV at every pier
+    assert (matrix.loc["500yr"] > matrix.loc["100yr"]).all()
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.plotting_utils.bridge_section import parse_bridge_section
+from utils.plotting_utils.scour_plotting_utils import calculate_scour_profile, recurrence_txt, summarize_scour_profile
+
+
+def baseline_scour_profile(bridge_data, year) -> tuple:
+    # the scour lines and scour holes as generate_figure calculated them row by row before the profile was vectorized
+    cs_ltd = bridge_data[year[0]].values[0]
+    bank_stations = bridge_data["Channel Bank Sta."].values
+    abutment_elev = bridge_data[year[4]].values[0]
+    ground_line = bridge_data[["Offset Station", "Elev"]].copy()
+    ground_line.loc[(ground_line["Offset Station"] > bank_stations[0]) & (ground_line["Offset Station"] < bank_stations[1]), "channel"] = "Channel"
+    ground_line.loc[(ground_line["Offset Station"] < bridge_data["Abt Toe Left Sta."].values[0]) |
+                    (ground_line["Offset Station"] > bridge_data["Abt Toe Right Sta."].values[0]), "channel"] = "Abutment"
+    ground_line = ground_line.assign(lt_deg=0.0, contract_scour=0.0, abut_scour=0.0)
+    for index, row in ground_line.iterrows():
+        if row["channel"] == "Abutment":
+            ground_line.loc[index, ["abut_scour", "contract_scour", "lt_deg"]] = [abutment_elev, np.nan, abutment_elev]
+        elif row["channel"] == "Channel":
+            ground_line.loc[index, ["lt_deg", "contract_scour", "abut_scour"]] = [
+                row["Elev"] - bridge_data["Long Term Deg"].values[0] - cs_ltd, row["Elev"] - cs_ltd, np.nan]
+        else:
+            ground_line.loc[index, ["lt_deg", "contract_scour", "abut_scour"]] = [row["Elev"] - cs_ltd] * 3
+
+    piers = bridge_data[["Bent CL Sta", year[1]]].dropna().to_numpy()[1:-1]
+    scour_holes = []
+    for center, local_scour in piers:
+        points = []
+        for station in (center - 2 * (cs_ltd - (cs_ltd - local_scour)), center, center + 2 * (cs_ltd - (cs_ltd - local_scour))):
+            second = ground_line.iloc[(ground_line["Offset Station"] - station).abs().argsort()[:2]]["lt_deg"].values[1]
+            points.append([station, second - local_scour - cs_ltd if station == center else second])
+        scour_holes.append(points)
+    for points in scour_holes:
+        left = min(ground_line["Offset Station"], key=lambda x: abs(x - points[0][0]))
+        right = min(ground_line["Offset Station"], key=lambda x: abs(x - points[2][0]))
+        left_index = ground_line.index[ground_line["Offset Station"] == left][0]
+        right_index = ground_line.index[ground_line["Offset Station"] == right][0]
+        ground_line.loc[left_index:right_index, ["contract_scour", "lt_deg", "abut_scour"]] = np.nan
+        ground_line.loc[left_index, ["lt_deg", "abut_scour", "contract_scour"]] = points[0][1]
+        ground_line.loc[right_index, ["lt_deg", "abut_scour", "contract_scour"]] = points[2][1]
+    return ground_line, np.array(scour_holes)
+
+
+GROUND_LINES = {
+    # scour hole edges fall exactly on, and exactly between, the ground line stations
+    "2 ft": np.arange(0, 301, 2.0),
+    "2.5 ft": np.arange(0, 301, 2.5),
+    "uneven": np.sort(np.random.default_rng(3).uniform(0, 300, 180)),
+}
+
+
+@pytest.mark.parametrize("year_index", [0, 1])
+@pytest.mark.parametrize("ground_line", list(GROUND_LINES))
+def test_scour_profile_matches_the_baseline(make_scour_data, ground_line, year_index):
+    year = recurrence_txt()[year_index]
+    bridge_data = make_scour_data(stations=GROUND_LINES[ground_line])
+    expected_profile, expected_holes = baseline_scour_profile(bridge_data, year)
+
+    profile, scour_holes = calculate_scour_profile(parse_bridge_section(bridge_data), year)
+    np.testing.assert_array_equal(scour_holes, expected_holes)
+    np.testing.assert_array_equal(profile["station"], bridge_data["Offset Station"])
+    for line in ("lt_deg", "contract_scour", "abut_scour"):
+        np.testing.assert_array_equal(profile[line], expected_profile[line].to_numpy(), err_msg=line)
+
+
+@pytest.mark.parametrize("year_index", [0, 1])
+def test_summary_of_the_scour_profile(make_scour_data, year_index):
+    year = recurrence_txt()[year_index]
+    bridge_data = make_scour_data()
+    expected_profile, expected_holes = baseline_scour_profile(bridge_data, year)
+
+    summary = summarize_scour_profile(parse_bridge_section(bridge_data), year)
+    assert summary["Bent ID"].tolist() == ["Pier 1", "Pier 2", "Pier 3"]
+    np.testing.assert_array_equal(summary["Scour Elev"], expected_holes[:, 1, 1])
+    assert summary["Min Total Scour Elev"].unique().tolist() == [min(np.nanmin(expected_profile["lt_deg"]), expected_holes[:, 1, 1].min())]
+    assert (summary["Recurrence"] == year[-1]).all()
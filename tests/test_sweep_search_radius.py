@@ -0,0 +1,62 @@
+import h5py
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.dxv_utils.find_pier_nodes import read_map_file, read_geom_file, find_mesh_points, sweep_search_radius
+
+
+@pytest.fixture
+def model(srh_model):
+    pier_data, arc_node_mapping = read_map_file(srh_model["map"], "Bridge Scour")
+    model_nodes = read_geom_file(srh_model["srhgeom"])
+    depth_file, velocity_file = srh_model["100yr"]
+    return pier_data, model_nodes, arc_node_mapping, depth_file, velocity_file
+
+
+def _brute_force_dxv(pier_data, model_nodes, depth_file, velocity_file, radius) -> list:
+    # maximum DxV of each pier node over the wet nodes within the radius, from the full result arrays
+    with h5py.File(depth_file) as file:
+        depth = file["Datasets/100yr/Water_Depth_ft/Values"][:].max(axis=0).astype(np.float64)
+    with h5py.File(velocity_file) as file:
+        velocity = file["Datasets/100yr/Vel_Mag_ft_p_s/Values"][:].max(axis=0).astype(np.float64)
+    dxv = np.where((depth > 0) & (velocity > 0), np.round(depth * velocity, 2), np.nan)
+    maxima = []
+    for x, y in zip(pier_data["lat"], pier_data["long"]):
+        within = np.hypot(model_nodes["lat"] - x, model_nodes["long"] - y).to_numpy() <= radius
+        maxima.append(np.nanmax(dxv[within]) if np.isfinite(dxv[within]).any() else np.nan)
+    return maxima
+
+
+def test_sweep_matches_brute_force(model):
+    pier_data, model_nodes, arc_node_mapping, depth_file, velocity_file = model
+    radii = [40, 0.5, 3, 5, 7.5, 12, 25]
+    sweep = sweep_search_radius(pier_data, model_nodes, arc_node_mapping, depth_file, "100yr_Water_Depth_ft.h5", velocity_file, radii)
+
+    assert len(sweep) == len(pier_data) * len(radii)
+    assert sweep.groupby("Pier Node", sort=False)["Search Radius"].apply(list).tolist() == [sorted(radii)] * len(pier_data)
+    for radius, at_radius in sweep.groupby("Search Radius"):
+        expected = _brute_force_dxv(pier_data, model_nodes, depth_file, velocity_file, radius)
+        np.testing.assert_array_equal(at_radius["DxV"].to_numpy(), expected)
+    # the depth and velocity are those of the node the maximum was found at
+    wet = sweep.dropna()
+    np.testing.assert_allclose(np.round(wet["Depth"] * wet["Velocity"], 2), wet["DxV"], atol=0.011)
+
+
+@pytest.mark.parametrize("radius", [5, 15])
+def test_sweep_matches_find_mesh_points(model, radius):
+    pier_data, model_nodes, arc_node_mapping, depth_file, velocity_file = model
+    sweep = sweep_search_radius(pier_data, model_nodes, arc_node_mapping, depth_file, "100yr_Water_Depth_ft.h5", velocity_file, [radius])
+    expected = find_mesh_points(pier_data, model_nodes, arc_node_mapping, depth_file, "100yr_Water_Depth_ft.h5", velocity_file, radius)
+    pd.testing.assert_series_equal(sweep["DxV"], expected["DxV"])
+    pd.testing.assert_series_equal(sweep["Pier Arc ID"], expected["Pier Arc ID"])
+
+
+def test_sweep_of_a_dry_radius(model):
+    pier_data, model_nodes, arc_node_mapping, depth_file, velocity_file = model
+    # the first pier node is moved onto a dry node of the mesh, the only node within a tenth of a foot of it
+    dry = pier_data.copy()
+    dry.loc[0, ["lat", "long"]] = model_nodes.loc[0, ["lat", "long"]].to_numpy()
+    sweep = sweep_search_radius(dry, model_nodes, arc_node_mapping, depth_file, "100yr_Water_Depth_ft.h5", velocity_file, [0.1])
+    assert sweep["DxV"].isna().tolist() == [True] + [False] * (len(dry) - 1)
+    assert sweep.loc[0, "Pier Arc ID"] == "ArcID 1"
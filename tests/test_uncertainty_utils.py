@@ -0,0 +1,72 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+from utils.plotting_utils.bridge_section import parse_bridge_section
+from utils.plotting_utils.scour_plotting_utils import calculate_scour_data, recurrence_txt
+from utils.plotting_utils.uncertainty_utils import UNCERTAIN_PARAMETERS, sample_factors, scour_envelope
+
+
+def brute_force_envelope(bridge_section, year, parameters, n_samples, percentiles, seed):
+    # draws the total scour line of every realization on its own, with its scour holes from calculate_scour_data
+    parameters = {**UNCERTAIN_PARAMETERS, **(parameters or {})}
+    rng = np.random.default_rng(seed)
+    factors = np.hstack([sample_factors(rng, *parameters[name], n_samples) for name in UNCERTAIN_PARAMETERS])
+    stations = bridge_section.ground_station
+    channel = (stations > bridge_section.bank_stations[0]) & (stations < bridge_section.bank_stations[1])
+    abutment = (stations < bridge_section.abut_toe_left_sta) | (stations > bridge_section.abut_toe_right_sta)
+    channel = channel & ~abutment
+
+    lines = []
+    for local_factor, cs_ltd_factor, lt_deg_factor in factors:
+        sample = dataclasses.replace(
+            bridge_section,
+            local_scour_depth={column: depth * local_factor for column, depth in bridge_section.local_scour_depth.items()},
+            cs_ltd_depth={column: depth * cs_ltd_factor for column, depth in bridge_section.cs_ltd_depth.items()},
+            long_term_deg=bridge_section.long_term_deg * lt_deg_factor)
+        contraction_elev = sample.ground_elev - sample.cs_ltd_depth[year[0]]
+        line = np.where(abutment, sample.abut_scour_elev[year[4]],
+                        np.where(channel, contraction_elev - sample.long_term_deg, contraction_elev))
+        hole = np.full(len(stations), np.inf)
+        for points in calculate_scour_data(sample, {"station": stations, "lt_deg": line}, year):
+            inside = (stations >= points[0, 0]) & (stations <= points[2, 0])
+            hole[inside] = np.minimum(hole[inside], np.interp(stations[inside], points[:, 0], points[:, 1]))
+        lines.append(np.where(hole < np.inf, hole, line))
+    return np.percentile(np.array(lines), [percentiles[0], 50, percentiles[1]], axis=0)
+
+
+@pytest.mark.parametrize("year_index", [0, 1])
+@pytest.mark.parametrize("parameters, percentiles", [
+    (None, (5, 95)),
+    ({"Local Scour Depth": ("Lognormal", 0.4), "Long Term Deg": ("Triangular", 0.3)}, (0, 100)),
+])
+def test_envelope_matches_per_realization_lines(make_scour_data, year_index, parameters, percentiles):
+    scour_data = make_scour_data()
+    # the scour holes of the first two piers overlap
+    scour_data.loc[2, "Bent CL Sta"] = 100
+    bridge_section = parse_bridge_section(scour_data)
+    year = recurrence_txt()[year_index]
+    envelope = scour_envelope(bridge_section, year, parameters, n_samples=300, percentiles=percentiles, seed=3)
+    expected = brute_force_envelope(bridge_section, year, parameters, 300, percentiles, 3)
+    np.testing.assert_array_equal(envelope["station"], bridge_section.ground_station)
+    for name, band in zip(["low", "median", "high"], expected):
+        np.testing.assert_allclose(envelope[name], band, rtol=0, atol=1e-9)
+
+
+def test_band_is_ordered_and_reproducible(make_scour_data):
+    bridge_section = parse_bridge_section(make_scour_data())
+    year = recurrence_txt()[0]
+    envelope = scour_envelope(bridge_section, year, n_samples=1000)
+    assert np.all(envelope["low"] <= envelope["median"]) and np.all(envelope["median"] <= envelope["high"])
+    again = scour_envelope(bridge_section, year, n_samples=1000)
+    for name in ["low", "median", "high"]:
+        np.testing.assert_array_equal(envelope[name], again[name])
+
+
+def test_unstable_channel_is_a_flat_band(make_scour_data):
+    bridge_section = parse_bridge_section(make_scour_data(laterally_stable="No"))
+    envelope = scour_envelope(bridge_section, recurrence_txt()[0], n_samples=1000)
+    np.testing.assert_array_equal(envelope["station"], [20, 280])
+    assert envelope["low"][0] == envelope["low"][1] and envelope["high"][0] == envelope["high"][1]
+    assert envelope["low"][0] < bridge_section.scour_datum_elev - 2.5 < envelope["high"][0]